@@ -0,0 +1,119 @@
+import sys
+sys.path.append("../")
+
+class Node:
+    """
+    语法树节点基类。每种语法成分对应一个子类：
+    - kind: 整数类型标记，用于按表分派（见 build_dispatch）
+    - fields: 子节点字段名，同时就是子类的 __slots__
+    - lineno: 该语法成分第一个单词所在的源程序行号，空产生式为 0
+    叶子（标识符、常数、运算符）直接以 str/int 存放在字段中；
+    语句、声明、参数等序列在语法分析时就收集成 Python 列表，不再是右递归的嵌套节点。
+    """
+    __slots__ = ('lineno',)
+    kind = -1
+    name = 'Node'
+    fields = ()
+
+    def __iter__(self):
+        # 按产生式顺序依次给出各子节点
+        for field in self.fields:
+            yield getattr(self, field)
+
+    def __repr__(self):
+        args = ", ".join(repr(child) for child in self)
+        return f"{self.name}({args})"
+
+    def __reduce__(self):
+        # 供编译缓存 pickle 使用
+        return (_rebuild, (self.kind, tuple(self), self.lineno))
+
+NODE_TYPES = []  # kind -> 节点类
+KIND_NAMES = []  # kind -> 语法成分名
+
+def _node(name, *fields):
+    # 与 namedtuple/dataclasses 一样生成专用的 __init__，逐字段直接赋值，避免构造时循环 setattr
+    params = "".join(f"{field}=None, " for field in fields)
+    body = "".join(f"    self.{field} = {field}\n" for field in fields)
+    namespace = {}
+    exec(f"def __init__(self, {params}lineno=0):\n{body}    self.lineno = lineno\n", namespace)
+    cls = type(name + 'Node', (Node,), {
+        '__slots__': fields,
+        '__init__': namespace['__init__'],
+        'kind': len(NODE_TYPES),
+        'name': name,
+        'fields': fields,
+    })
+    NODE_TYPES.append(cls)
+    KIND_NAMES.append(name)
+    return cls
+
+def _rebuild(kind, children, lineno):
+    return NODE_TYPES[kind](*children, lineno=lineno)
+
+def build_dispatch(cls, prefix='visit_'):
+    """
+    为访问者类预先计算分派表：下标为节点 kind，值为对应的 visit_<成分名> 方法（未定义则为 None）。
+    遍历时用 table[node.kind](self, node) 调用，不再每个节点拼接方法名再反射查找。
+    """
+    return [getattr(cls, prefix + name, None) for name in KIND_NAMES]
+
+# 程序结构
+ProgramNode = _node('Program', 'head', 'declare', 'body')
+ProgramHeadNode = _node('ProgramHead', 'program_name')
+ProgramNameNode = _node('ProgramName', 'id')
+DeclarePartNode = _node('DeclarePart', 'type_dec', 'var_dec', 'proc_dec')
+
+# 类型声明
+TypeDecNode = _node('TypeDec', 'declaration')
+TypeDeclarationNode = _node('TypeDeclaration', 'dec_list')  # [TypeDecItem]
+TypeDecItemNode = _node('TypeDecItem', 'type_id', 'type_name')
+TypeIdNode = _node('TypeId', 'id')
+TypeNameNode = _node('TypeName', 'type')  # BaseType / StructureType / 类型标识符
+BaseTypeNode = _node('BaseType', 'type')  # 'integer' / 'char'
+StructureTypeNode = _node('StructureType', 'type')
+ArrayTypeNode = _node('ArrayType', 'low', 'high', 'base')
+RecTypeNode = _node('RecType', 'field_list')  # [FieldDecItem]
+FieldDecItemNode = _node('FieldDecItem', 'type', 'ids')  # ids: [标识符]
+
+# 变量声明
+VarDecNode = _node('VarDec', 'declaration')
+VarDeclarationNode = _node('VarDeclaration', 'dec_list')  # [VarDecItem]
+VarDecItemNode = _node('VarDecItem', 'type_name', 'ids')  # ids: [标识符]
+
+# 过程声明
+ProcDecNode = _node('ProcDec', 'procs')  # [ProcDeclaration]
+ProcDeclarationNode = _node('ProcDeclaration', 'proc_name', 'params', 'dec_part', 'body')  # params: [Param]
+ProcNameNode = _node('ProcName', 'id')
+ParamNode = _node('Param', 'var', 'type_name', 'forms')  # var 为 None 表示值传递；forms: [标识符]
+ProcDecPartNode = _node('ProcDecPart', 'declare')
+ProcBodyNode = _node('ProcBody', 'body')
+
+# 语句
+ProgramBodyNode = _node('ProgramBody', 'stm_list')  # [Stm]
+StmNode = _node('Stm', 'stm', 'ass_call')  # ID AssCall 时 stm 为标识符
+AssCallNode = _node('AssCall', 'rest')
+AssignmentRestNode = _node('AssignmentRest', 'vari_more', 'exp')
+ConditionalStmNode = _node('ConditionalStm', 'cond', 'then_stms', 'else_stms')  # 两个分支均为 [Stm]
+LoopStmNode = _node('LoopStm', 'cond', 'stm_list')  # [Stm]
+InputStmNode = _node('InputStm', 'invar')
+InvarNode = _node('Invar', 'id')
+OutputStmNode = _node('OutputStm', 'exp')
+ReturnStmNode = _node('ReturnStm', 'exp')
+CallStmRestNode = _node('CallStmRest', 'params')  # [Exp]
+
+# 表达式
+RelExpNode = _node('RelExp', 'exp', 'other')
+OtherRelENode = _node('OtherRelE', 'op', 'exp')
+ExpNode = _node('Exp', 'term', 'other')
+OtherTermNode = _node('OtherTerm', 'op', 'exp')
+TermNode = _node('Term', 'factor', 'other')
+OtherFactorNode = _node('OtherFactor', 'op', 'term')
+FactorNode = _node('Factor', 'value')  # Exp / 整数常量 / Variable
+VariableNode = _node('Variable', 'id', 'more')
+VariMoreNode = _node('VariMore', 'access')  # 下标 Exp / FieldVar / None
+FieldVarNode = _node('FieldVar', 'id', 'more')
+FieldVarMoreNode = _node('FieldVarMore', 'exp')
+CmpOpNode = _node('CmpOp', 'op')
+AddOpNode = _node('AddOp', 'op')
+MultOpNode = _node('MultOp', 'op')
@@ -1,115 +1,307 @@
 import sys
 sys.path.append("../")
+import heapq
 from lexer import *
 from Quad import *
+from prettytable import PrettyTable
+from cfg import ControlFlowGraph
+from diagnostic import *
+
+ARITH_OPS = ('+', '-', '*', '/', '<', '=')
+# 后端可以直接用立即数的第二操作数位置：addi / slti（16 位有符号立即数），减法被生成为 addi -b
+IMMEDIATE_RANGES = {'+': (-32768, 32767), '-': (0, 32768), '<': (-32768, 32767)}
+
+def fits_immediate(op, value):
+    """后端能否把常数 value 直接作为 op 的第二操作数：上表中的立即数，以及乘以 2 的幂（生成为 sll）"""
+    if op == '*':
+        return 0 < value <= 0x40000000 and value & (value - 1) == 0
+    bounds = IMMEDIATE_RANGES.get(op)
+    return bounds is not None and bounds[0] <= value <= bounds[1]
+
+def wrap32(value):
+    """回绕到 32 位有符号整数，与寄存器中的结果一致"""
+    return ((value + 0x80000000) & 0xFFFFFFFF) - 0x80000000
 
 class ConstantFolder:
-    def __init__(self, quad_list):
+    """
+    全局常量传播与常量折叠。
+    在 cfg.ControlFlowGraph 上对每个过程做前向数据流分析（有条件的常量传播）：
+    每个名字的格值为 32 位整数常量 / 非常量（const_table 中不存在即非常量），只沿可执行的边传播，
+    条件为常量的分支只有一条出边可执行，循环回边在第一次到达前不参与交汇（乐观假设）。
+    改写规则：
+    - 两个操作数都是常量的运算改为常量赋值
+    - 条件为常量的 if 只保留执行的分支；条件恒假的 while 整个删去
+    - 只在一个基本块内出现的临时变量若为常量，删去其定义，在需要寄存器的使用处紧挨着重新赋值
+      （临时变量只存在于寄存器中，后端在使用处释放寄存器，这样每个寄存器仍是一次定义一次使用）
+    - 用户变量的常量赋值保留（变量仍在内存中），读取处在后端支持立即数的位置直接换成常数
+    过程调用可能通过引用参数或外层变量修改任何用户变量，调用之后所有用户变量都视为非常量；
+    引用形参可能与外层变量互为别名，始终视为非常量，对它赋值同样使所有用户变量失效。
+    """
+    def __init__(self, quad_list, diagnostics=None):
         self.quad_list = quad_list
-        self.optimized_quads = []
+        self.optimized_quads = QuadBuffer()
         self.const_table = {}  # 记录变量的常量值，如 {'t1': 7, 'x': 3}
+        self.diagnostics = diagnostics if diagnostics is not None else DiagnosticCollector()
+        self.proc = None  # 当前所在的过程，用于诊断信息
 
     def is_constant(self, operand):
         # 是常数字面量，或之前已经是常量表达式的变量
         return self.is_immediate_constant(operand) or operand in self.const_table
 
     def is_immediate_constant(self, operand):
-        try:
-            float(operand)
-            return True
-        except:
-            return False
+        # 语义分析把整数常量直接以 int 放进四元式，名字一律是 str；按类型判断，不做任何转换
+        return operand.__class__ is int
 
     def get_constant_value(self, operand):
-        if self.is_immediate_constant(operand):
-            return float(operand)
-        elif operand in self.const_table:
-            return self.const_table[operand]
+        if operand.__class__ is int:
+            return wrap32(operand)
+        return self.const_table.get(operand)
+
+    def evaluate(self, op, arg1, arg2):
+        """
+        两个操作数都是常量时按目标机的语义计算运算结果，无法在编译时确定时返回 None：
+        结果回绕到 32 位有符号整数，除法向零取整（MIPS div 的商），除数为 0 不折叠。
+        """
+        val1 = self.get_constant_value(arg1)
+        val2 = self.get_constant_value(arg2)
+        if val1 is None or val2 is None:
+            return None
+        if op == '+':
+            return wrap32(val1 + val2)
+        elif op == '-':
+            return wrap32(val1 - val2)
+        elif op == '*':
+            return wrap32(val1 * val2)
+        elif op == '/':
+            if val2 == 0:
+                return None
+            quotient = abs(val1) // abs(val2)
+            return wrap32(quotient if (val1 < 0) == (val2 < 0) else -quotient)
+        elif op == '<':
+            return 1 if val1 < val2 else 0
+        else:
+            return 1 if val1 == val2 else 0
+
+    def _classify(self, cfg):
+        """区分用户变量、引用形参和只在一个基本块内出现的临时变量"""
+        self.variables = set()   # DECLARE / get 声明过的名字
+        self.ref_params = set()
+        for op, arg1, _, res in self.quad_list:
+            if op == 'DECLARE':
+                self.variables.add(res)
+            elif op == 'get':
+                self.variables.add(res)
+                if arg1:
+                    self.ref_params.add(res)
+        block_of = cfg.block_of
+        home = {}  # 临时变量 -> 唯一出现的基本块，出现在多个块中为 -1
+        for i, (op, arg1, arg2, res) in enumerate(self.quad_list):
+            if op not in DEFINING_OPS and op not in ('THEN', 'DO', 'OUT', 'param', 'RETURN', ':=:'):
+                continue
+            block = block_of[i]
+            for name in (arg1, arg2, res):
+                if name.__class__ is str and name not in self.variables:
+                    if home.setdefault(name, block) != block:
+                        home[name] = -1
+        self.local_temps = {name for name, block in home.items() if block >= 0}
+
+    def _define(self, name, value):
+        if value is None or name in self.ref_params or (name not in self.variables and name not in self.local_temps):
+            self.const_table.pop(name, None)
+        else:
+            self.const_table[name] = value
+
+    def _kill_variables(self):
+        table = self.const_table
+        for name in [name for name in table if name in self.variables]:
+            del table[name]
+
+    def _transfer(self, op, arg1, arg2, res):
+        """一条四元式对 const_table 的影响，返回运算/赋值得到的常量（没有则为 None）"""
+        if op in ARITH_OPS:
+            value = self.evaluate(op, arg1, arg2)
+        elif op == ':=':
+            value = self.get_constant_value(arg1)
+        elif op == '[]' or op == 'load':
+            value = None
+        elif op == 'IN':
+            if arg1 in self.ref_params:
+                self._kill_variables()  # 读入引用形参可能改写它所指向的任何变量
+            self.const_table.pop(arg1, None)
+            return None
+        elif op == 'call':
+            self._kill_variables()
+            return None
         else:
             return None
+        if res in self.ref_params:
+            self._kill_variables()
+        self._define(res, value)
+        return value
 
-    def fold_constants(self):
-        for quad in self.quad_list:
-            op = quad.operator
-            arg1 = quad.operand1
-            arg2 = quad.operand2
-            res = quad.result
+    def _analyze(self, cfg, proc):
+        """工作表算法求每个可达基本块入口处的常量表，以及常量条件决定的分支"""
+        quads = self.quad_list
+        targets = cfg.targets
+        blocks = cfg.blocks
+        rank = {block.index: n for n, block in enumerate(proc.rpo)}
+        in_states = {proc.entry.index: {}}
+        out_states = {}
+        taken = {}  # 基本块下标 -> 可执行的出边目标
+        local_temps = self.local_temps
+        worklist = [(0, proc.entry.index)]
+        queued = {proc.entry.index}
+        while worklist:
+            _, index = heapq.heappop(worklist)
+            queued.discard(index)
+            block = blocks[index]
+            self.const_table = dict(in_states[index])
+            for i in block.range:
+                self._transfer(*quads[i])
+            succs = block.succs
+            if len(block):
+                op, cond = quads[block.end - 1][:2]
+                if op == 'THEN' or op == 'DO':
+                    value = self.get_constant_value(cond)
+                    if value is not None:
+                        tail = block.end - 1
+                        succs = (blocks[cfg.block_of[tail + 1]],) if value else (blocks[cfg.block_of[targets[tail]]],)
+            # 临时变量只在本块内有意义，不带出基本块，块间传播的状态只与用户变量个数有关
+            out_states[index] = {name: value for name, value in self.const_table.items() if name not in local_temps}
+            taken[index] = succs
+            for succ in succs:
+                state = None
+                for pred in succ.preds:
+                    if pred.index in out_states and succ in taken[pred.index]:
+                        out = out_states[pred.index]
+                        if state is None:
+                            state = dict(out)
+                        else:
+                            for name in [name for name, value in state.items() if out.get(name) != value]:
+                                del state[name]
+                if state != in_states.get(succ.index) and succ.index in rank:
+                    in_states[succ.index] = state
+                    if succ.index not in queued:
+                        queued.add(succ.index)
+                        heapq.heappush(worklist, (rank[succ.index], succ.index))
+        return in_states, taken
 
-            if op in ['WHILE', 'ENDWHILE', 'DO', 'THEN', 'ELSE', 'PROCEDURE', 'ENDIF', 'ENDPROCEDURE']:
-                self.const_table = {}
-                self.optimized_quads.append(quad)
+    def _dead_regions(self, cfg, in_states, taken, dead):
+        """把条件为常量的 if 的另一分支、条件恒假的 while 整体标记为删除"""
+        quads = self.quad_list
+        targets = cfg.targets
+        for index in in_states:
+            block = cfg.blocks[index]
+            if not len(block):
                 continue
-            if op in ['+', '-', '*', '/']:
-                if self.is_constant(arg1) and self.is_constant(arg2):
-                    val1 = self.get_constant_value(arg1)
-                    val2 = self.get_constant_value(arg2)
-                    try:
-                        if op == '+':
-                            result = val1 + val2
-                        elif op == '-':
-                            result = val1 - val2
-                        elif op == '*':
-                            result = val1 * val2
-                        elif op == '/':
-                            result = val1 / val2
-                        if result == int(result):
-                            result = int(result)
-                        self.const_table[res] = result
-                        if res[0] != 't':
-                            self.optimized_quads.append(Quadruple(':=', result, None, res))
-                    except ZeroDivisionError:
-                        print(f"Warning: division by zero in quad {quad}")
-                        self.optimized_quads.append(quad)
-                else:
-                    if arg1 in self.const_table:
-                        self.optimized_quads.append(Quadruple(':=', self.const_table[arg1], None, arg1)) 
-                    if arg2 in self.const_table:
-                        self.optimized_quads.append(Quadruple(':=', self.const_table[arg2], None, arg2))
-                    new_arg1 = str(self.const_table[arg1]) if arg1 in self.const_table else arg1
-                    new_arg2 = str(self.const_table[arg2]) if arg2 in self.const_table else arg2
-                    self.optimized_quads.append(Quadruple(op, arg1, arg2, res))
-                    # 运算结果未知，移除res的常量记录
-                    if res in self.const_table:
-                        del self.const_table[res]
-
-            elif op == ':=':
-                # 赋值语句，尝试更新 const_table
-                if self.is_constant(arg1):
-                    value = self.get_constant_value(arg1)
-                    if value == int(value):
-                        value = int(value)
-                    self.const_table[res] = value
-                    if res[0] != 't':
-                        self.optimized_quads.append(Quadruple(':=', value, None, res))
+            tail = block.end - 1
+            op = quads[tail][0]
+            if (op != 'THEN' and op != 'DO') or len(taken[index]) != 1 or len(block.succs) != 2:
+                continue
+            if op == 'THEN':
+                else_index = targets[tail] - 1
+                endif = targets[else_index]
+                if taken[index][0].start == tail + 1:
+                    dead[tail] = 1
+                    dead[else_index:endif + 1] = b'\x01' * (endif + 1 - else_index)
                 else:
-                    self.optimized_quads.append(Quadruple(op, arg1, None, res))
-                    if res in self.const_table:
-                        del self.const_table[res]
+                    dead[tail:else_index + 1] = b'\x01' * (else_index + 1 - tail)
+                    dead[endif] = 1
+            elif taken[index][0].start != tail + 1:
+                endwhile = targets[tail] - 1
+                start = targets[endwhile]
+                dead[start:endwhile + 1] = b'\x01' * (endwhile + 1 - start)
+
+    def _use(self, name, emit):
+        """在需要寄存器的位置使用 name：删去了定义的常量临时变量在这里重新赋值"""
+        if name in self.local_temps and name in self.const_table:
+            emit(':=', self.const_table[name], None, name)
+
+    def _immediate(self, op, name, emit):
+        """第二操作数：用户变量的常量在后端支持立即数时换成常数，否则按寄存器使用"""
+        value = self.const_table.get(name) if name.__class__ is str else None
+        if value is not None and fits_immediate(op, value):
+            return value
+        self._use(name, emit)
+        return name
+
+    def _rewrite(self, cfg, in_states, dead):
+        emit = self.optimized_quads.append
+        block_of = cfg.block_of
+        local_temps = self.local_temps
+        current = -1
+        for i, (op, arg1, arg2, res) in enumerate(self.quad_list):
+            if block_of[i] != current:
+                current = block_of[i]
+                self.const_table = dict(in_states.get(current, {}))
+            if op == 'PROCEDURE':
+                self.proc = arg1
+            if dead[i]:
+                continue
+            if op in ARITH_OPS or op == ':=':
+                value = self.get_constant_value(arg1) if op == ':=' else self.evaluate(op, arg1, arg2)
+                if value is not None:
+                    self._transfer(op, arg1, arg2, res)
+                    if res not in local_temps or res not in self.const_table:
+                        emit(':=', value, None, res)
+                    continue
+                if op != ':=':
+                    if op == '/' and self.get_constant_value(arg2) == 0:
+                        self.diagnostics.warning("div-by-zero", f"常量除数为 0，保留原四元式 {(op, arg1, arg2, res)}", scope=self.proc)
+                    self._use(arg1, emit)
+                    arg2 = self._immediate(op, arg2, emit)
+                self._transfer(op, arg1, arg2, res)
+                emit(op, arg1, arg2, res)
+            elif op == ':=:':
+                value = self.const_table.get(arg1) if arg1.__class__ is str else None
+                if value is not None:
+                    arg1 = value
+                self._use(res, emit)
+                emit(op, arg1, arg2, res)
+            elif op == 'THEN' or op == 'DO' or op == 'OUT' or op == 'RETURN':
+                self._use(arg1, emit)
+                emit(op, arg1, arg2, res)
+            elif op == 'param':
+                if not res:
+                    self._use(arg1, emit)
+                emit(op, arg1, arg2, res)
+            elif op == '[]':
+                self._use(arg2, emit)
+                emit(op, arg1, arg2, res)
+                self._transfer(op, arg1, arg2, res)
             else:
-                # 其他操作，不处理，原样加入
-                self.optimized_quads.append(quad)
-        table = PrettyTable(field_names=["operator", "exp1", "exp2", "result"])
-        for i in self.optimized_quads:
-            table.add_row([i.operator, i.operand1, i.operand2, i.result])
-        with open("../result/中间代码优化.txt", "w", encoding="utf-8") as w:
-            w.write(table.get_string())
-        return self.quad_list
+                emit(op, arg1, arg2, res)
+                self._transfer(op, arg1, arg2, res)
+
+    def fold_constants(self, output_file="../result/中间代码优化.txt"):
+        cfg = ControlFlowGraph(self.quad_list)
+        self._classify(cfg)
+        in_states = {}
+        dead = bytearray(len(self.quad_list))
+        for proc in cfg.procedures:
+            states, taken = self._analyze(cfg, proc)
+            in_states.update(states)
+            self._dead_regions(cfg, states, taken, dead)
+        self._rewrite(cfg, in_states, dead)
+        if output_file:
+            table = PrettyTable(field_names=["operator", "exp1", "exp2", "result"])
+            for row in self.optimized_quads:
+                table.add_row(list(row))
+            with open(output_file, "w", encoding="utf-8") as w:
+                w.write(table.get_string())
+        return self.optimized_quads
 
 if __name__ == '__main__':
-    parser = SNLParser()
-    parse_tree = parser.parse_file("../data/9-constOpt.txt")
-    print(parse_tree)
-
-    if parse_tree:
-        print("\n语法分析成功！")
-        semantic_analyzer = SemanticAnalyzer()
-        semantic_analyzer.analyze(parse_tree)
-        print("\n语义分析完成！")
-        print(len(semantic_analyzer.quadruples))
-        folder = ConstantFolder(semantic_analyzer.quadruples)
-        optimized_quads = folder.fold_constants()
-        print(len(optimized_quads))
-        for i in optimized_quads:
+    from session import CompilerSession
+    session = CompilerSession()
+    result = session.compile_file("../data/9-constOpt.txt")
+    print(result.tree)
+
+    if result.ok:
+        print(len(result.quadruples))
+        print(len(result.optimized_quads))
+        for i in result.optimized_quads:
             print(i)
     else:
-        print("\n语法分析失败！")
+        for error in result.errors:
+            print(error)
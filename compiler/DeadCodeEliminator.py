@@ -0,0 +1,237 @@
+import sys
+sys.path.append("../")
+from lexer import *
+from Quad import *
+from prettytable import PrettyTable
+from cfg import ControlFlowGraph
+
+# 维持结构的四元式：即使所在基本块不可达也必须保留，否则 THEN/ELSE/ENDIF 等标记不再配对
+STRUCTURE_OPS = frozenset(('PROCEDURE', 'ENDPROCEDURE', 'THEN', 'ELSE', 'ENDIF', 'WHILE', 'DO', 'ENDWHILE',
+                           'label', 'Go', 'DECLARE', 'get'))
+
+class DeadCodeEliminator:
+    """
+    基于活跃变量分析的死代码删除。
+    - 每个过程在 cfg.ControlFlowGraph 上做后向数据流分析，活跃集合用整数位图表示
+    - 结果不再被使用的赋值、运算、取地址和取值四元式被删除；删除后可能产生新的死定义，反复进行直到不变
+    - 从入口不可达的基本块中的普通四元式被删除（结构化标记保留）；从主程序出发调用不到的过程整个删除
+    变量与临时变量一视同仁，只看定义和使用，不依赖名字的写法。
+    过程调用可能读取任何变量；过程出口处外层变量和引用形参是活跃的；
+    读引用形参时它可能是任何外层变量或其他引用形参的别名，这些变量都算被使用；
+    反过来读外层变量时，它可能刚通过某个引用形参被赋值，所有引用形参也算被使用。
+    """
+    def __init__(self, quad_list):
+        self.quad_list = list(quad_list)
+        self.optimized_quads = QuadBuffer()
+        self.removed = 0
+
+    def _assign_bits(self, cfg):
+        """
+        给名字分配位。变量和跨基本块的临时变量占用固定的位；
+        只出现在一个基本块内的临时变量在各块内从同一起点重新编号，
+        这样位图的宽度只和变量数加单个块内的临时变量数有关，不随程序长度增长。
+        """
+        quads = self.quad_list
+        block_of = cfg.block_of
+        declared = set()
+        for op, _, _, res in quads:
+            if op == 'DECLARE' or op == 'get':
+                declared.add(res)
+        home = {}
+        names = []
+        for i, quad in enumerate(quads):
+            uses, target = quad_names(*quad)
+            if target is not None:
+                uses = uses + [target]
+            names.append(uses)
+            block = block_of[i]
+            for name in uses:
+                if home.setdefault(name, block) != block:
+                    home[name] = -1
+        self.bits = {}
+        for name in declared:
+            self.bits[name] = 1 << len(self.bits)
+        for name, block in home.items():
+            if block < 0 and name not in self.bits:
+                self.bits[name] = 1 << len(self.bits)
+        self.global_mask = (1 << len(self.bits)) - 1
+        local_base = len(self.bits)
+        bits = []  # 每条四元式中各名字对应的位
+        current = -1
+        local = {}
+        for i, quad_operands in enumerate(names):
+            if block_of[i] != current:
+                current = block_of[i]
+                local = {}
+            quad_bits = {}
+            for name in quad_operands:
+                bit = self.bits.get(name)
+                if bit is None:
+                    bit = local.get(name)
+                    if bit is None:
+                        bit = local[name] = 1 << (local_base + len(local))
+                quad_bits[name] = bit
+            bits.append(quad_bits)
+        return declared, bits
+
+    def _scopes(self, cfg, declared):
+        """每个过程出口处活跃的变量（外层变量与引用形参）和读引用形参时视为被读取的变量"""
+        self.all_variables = 0
+        own = {}        # 过程 -> 自己的局部变量和值形参
+        ref_params = 0
+        for proc in cfg.procedures:
+            own[proc] = 0
+        for i, (op, arg1, _, res) in enumerate(self.quad_list):
+            if op == 'DECLARE' or op == 'get':
+                bit = self.bits[res]
+                self.all_variables |= bit
+                if op == 'get' and arg1:
+                    ref_params |= bit
+                else:
+                    own[cfg.procedure_of(i)] |= bit
+        self.ref_params = ref_params
+        self.escaped = {}
+        for proc in cfg.procedures:
+            # 主程序结束后不再有任何读取
+            self.escaped[proc] = 0 if proc.parent is None else self.all_variables & ~own[proc]
+
+    def _masks(self, cfg, bits):
+        """预先算好每条四元式读取和写入的位图 (use, def)"""
+        masks = []
+        for i, quad in enumerate(self.quad_list):
+            op = quad[0]
+            uses, target = quad_names(*quad)
+            quad_bits = bits[i]
+            use = 0
+            for name in uses:
+                use |= quad_bits[name]
+            if op == 'call':
+                use |= self.all_variables
+            escaped = self.escaped[cfg.procedure_of(i)]
+            if use & self.ref_params:
+                use |= escaped
+            elif use & escaped:
+                use |= self.ref_params
+            masks.append((use, quad_bits[target] if target is not None else 0))
+        return masks
+
+    def _liveness(self, proc, masks, dead):
+        """求每个基本块出口处的活跃变量位图（只含固定位，块内临时变量不出块）"""
+        global_mask = self.global_mask
+        gen = {}
+        kill = {}
+        for block in proc.rpo:
+            block_gen = block_kill = 0
+            for i in reversed(block.range):
+                if dead[i]:
+                    continue
+                use, defs = masks[i]
+                block_gen = (block_gen & ~defs) | use
+                block_kill |= defs
+            gen[block.index] = block_gen & global_mask
+            kill[block.index] = block_kill & global_mask
+        live_in = {}
+        live_out = {}
+        escaped = self.escaped[proc]
+        exit_index = proc.exit.index
+        changed = True
+        while changed:
+            changed = False
+            for block in reversed(proc.rpo):  # 后序，后继大多先于前驱算好
+                out = escaped if block.index == exit_index else 0
+                for succ in block.succs:
+                    out |= live_in.get(succ.index, 0)
+                live_out[block.index] = out
+                value = gen[block.index] | (out & ~kill[block.index])
+                if live_in.get(block.index) != value:
+                    live_in[block.index] = value
+                    changed = True
+        return live_out
+
+    def _sweep(self, proc, masks, live_out, dead):
+        """在每个基本块内从后往前删除结果不再活跃的定义，返回删除的条数"""
+        quads = self.quad_list
+        removed = 0
+        for block in proc.rpo:
+            live = live_out[block.index]
+            for i in reversed(block.range):
+                if dead[i]:
+                    continue
+                use, defs = masks[i]
+                if not (live & defs) and quads[i][0] in DEFINING_OPS:
+                    dead[i] = 1
+                    removed += 1
+                    continue
+                live = (live & ~defs) | use
+        return removed
+
+    def _unreachable(self, cfg, dead):
+        """删除不可达基本块中的普通四元式，以及从主程序出发调用不到的过程"""
+        quads = self.quad_list
+        reachable = set()
+        for proc in cfg.procedures:
+            reachable.update(block.index for block in proc.rpo)
+        for block in cfg.blocks:
+            if block.index not in reachable:
+                for i in block.range:
+                    if quads[i][0] not in STRUCTURE_OPS:
+                        dead[i] = 1
+        # 过程调用图：从主程序可达的代码里出现的 call
+        called = {}
+        for i, (op, arg1, _, _) in enumerate(quads):
+            if op == 'call' and not dead[i]:
+                called.setdefault(cfg.procedure_of(i), set()).add(arg1)
+        main = cfg.procedures[0]
+        live_procs = {main}
+        stack = [main]
+        while stack:
+            proc = stack.pop()
+            names = called.get(proc, ())
+            # 同名过程（不同作用域中）一律视为可能被调用
+            for candidate in cfg.procedures:
+                if candidate.name in names and candidate not in live_procs:
+                    live_procs.add(candidate)
+                    stack.append(candidate)
+        for proc in cfg.procedures:
+            if proc not in live_procs:
+                dead[proc.start:proc.end + 1] = b'\x01' * (proc.end + 1 - proc.start)
+
+    def eliminate(self, output_file="../result/中间代码优化.txt"):
+        cfg = ControlFlowGraph(self.quad_list)
+        declared, bits = self._assign_bits(cfg)
+        self._scopes(cfg, declared)
+        masks = self._masks(cfg, bits)
+        dead = bytearray(len(self.quad_list))
+        self._unreachable(cfg, dead)
+        for proc in cfg.procedures:
+            while True:
+                live_out = self._liveness(proc, masks, dead)
+                removed = self._sweep(proc, masks, live_out, dead)
+                if not removed:
+                    break
+        emit = self.optimized_quads.append
+        for i, quad in enumerate(self.quad_list):
+            if dead[i]:
+                self.removed += 1
+            else:
+                emit(*quad)
+        if output_file:
+            table = PrettyTable(field_names=["operator", "exp1", "exp2", "result"])
+            for row in self.optimized_quads:
+                table.add_row(list(row))
+            with open(output_file, "w", encoding="utf-8") as w:
+                w.write(table.get_string())
+        return self.optimized_quads
+
+if __name__ == '__main__':
+    from session import CompilerSession
+    session = CompilerSession()
+    result = session.compile_file("../data/9-constOpt.txt")
+    if result.ok:
+        print(len(result.quadruples))
+        print(len(result.optimized_quads))
+        for i in result.optimized_quads:
+            print(i)
+    else:
+        for error in result.errors:
+            print(error)
@@ -0,0 +1,169 @@
+import sys
+sys.path.append("../")
+import io
+import re
+
+LABEL = 'label'  # 标号定义的 op
+BUFFER_SIZE = 1 << 16  # BufferedSink 攒够这么多个字符才写一次
+LABEL_DEFINITION = re.compile(r'([A-Za-z_.][\w.]*)\s*:\s*')  # 行首的标号定义，后面可以跟同一行的指令或伪指令
+
+class Label:
+    """
+    符号标号。生成代码时跳转指令直接引用 Label 对象，可以先引用、后定义，不需要回填；
+    name 为 None 的标号在 render 输出文本时才按第一次出现的顺序命名为 labelN。
+    过程名、main 等有固定名字的标号在创建时给出 name。
+    """
+    __slots__ = ('name',)
+
+    def __init__(self, name=None):
+        self.name = name
+
+    def __repr__(self):
+        return f"Label({self.name!r})"
+
+class Instruction:
+    """
+    一条结构化的 MIPS 指令：op 为操作码，args 为操作数元组。操作数可以是
+    - 寄存器名字符串，如 '$t0'
+    - 整数立即数
+    - Label：跳转目标或 la 装入的地址
+    - (偏移, 基址寄存器) 元组：内存单元，输出为 偏移(基址寄存器)
+    op 为 LABEL 时是标号定义，args 为 (Label,)；op 以 '.' 开头的是汇编伪指令。
+    """
+    __slots__ = ('op', 'args')
+
+    def __init__(self, op, *args):
+        self.op = op
+        self.args = args
+
+    def __repr__(self):
+        return f"Instruction({self.op!r}, {', '.join(repr(arg) for arg in self.args)})"
+
+def is_instruction(ins):
+    """是否为真正的指令（标号定义和伪指令不算）"""
+    return ins.op != LABEL and ins.op[0] != '.'
+
+def count_instructions(code):
+    return sum(1 for ins in code if is_instruction(ins))
+
+class Renderer:
+    """
+    把结构化指令序列输出为 MIPS 汇编文本行，一遍完成：
+    没有名字的标号在第一次出现（定义或引用）时依次命名为 label0、label1……
+    编号保存在 Renderer 中，所以代码可以分成若干段依次输出，结果与整体输出相同。
+    """
+    def __init__(self):
+        self.count = 0
+
+    def _name(self, label):
+        if label.name is None:
+            label.name = f"label{self.count}"
+            self.count += 1
+        return label.name
+
+    def lines(self, code):
+        lines = []
+        append = lines.append
+        for ins in code:
+            op = ins.op
+            args = ins.args
+            if op == LABEL:
+                append(self._name(args[0]) + ":")
+                continue
+            if not args:
+                append(op)
+                continue
+            texts = []
+            for arg in args:
+                kind = arg.__class__
+                if kind is str:
+                    texts.append(arg)
+                elif kind is int:
+                    texts.append(str(arg))
+                elif kind is tuple:
+                    texts.append(f"{arg[0]}({arg[1]})")
+                else:
+                    texts.append(self._name(arg))
+            append(op + " " + ", ".join(texts))
+        return lines
+
+def render(code):
+    """把整个结构化指令序列输出为 MIPS 汇编文本"""
+    return "\n".join(Renderer().lines(code))
+
+def _operand(text, labels):
+    if text[0] == '$':
+        return text
+    if text[-1] == ')':
+        offset, _, base = text[:-1].partition('(')
+        return int(offset or 0, 0), base
+    try:
+        return int(text, 0)
+    except ValueError:
+        return labels.setdefault(text, Label(text))
+
+def _strip_comment(line):
+    """去掉 # 开始的注释，字符串常量中的 # 不算"""
+    if '"' not in line:
+        return line.split("#", 1)[0]
+    quoted = False
+    for i, ch in enumerate(line):
+        if ch == '"' and (i == 0 or line[i - 1] != '\\'):
+            quoted = not quoted
+        elif ch == '#' and not quoted:
+            return line[:i]
+    return line
+
+def parse(text):
+    """
+    render 的逆过程：把 MIPS 汇编文本（如 CompileResult.mips、.mips 文件）解析为结构化指令，同名标号共用一个 Label。
+    标号可以单独占一行，也可以像 MARS 程序中常见的那样后跟同一行的指令或伪指令，如 newline: .asciiz "\\n"
+    """
+    code = []
+    labels = {}
+    for line in text.split("\n"):
+        line = _strip_comment(line).strip()
+        match = LABEL_DEFINITION.match(line)
+        while match:
+            name = match.group(1)
+            code.append(Instruction(LABEL, labels.setdefault(name, Label(name))))
+            line = line[match.end():]
+            match = LABEL_DEFINITION.match(line)
+        if not line:
+            continue
+        op, _, rest = line.replace("\t", " ").partition(" ")  # 手写的程序常用制表符分隔操作码
+        rest = rest.strip()
+        if op[0] == '.':
+            code.append(Instruction(op, *((rest,) if rest else ())))
+            continue
+        code.append(Instruction(op, *(_operand(arg.strip(), labels) for arg in rest.split(",") if arg.strip())))
+    return code
+
+class BufferedSink:
+    """
+    带缓冲的输出：文本先攒在列表中，超过 buffer_size 个字符时才调用一次 sink.write。
+    sink 可以是任何有 write 方法的对象：文本流（io.TextIOBase，如 open(..., "w")、StringIO）写入 str，
+    其余（open(..., "wb")、BytesIO、socket 文件等）写入 UTF-8 编码的 bytes。
+    """
+    def __init__(self, sink, buffer_size=BUFFER_SIZE):
+        self.sink = sink
+        self.binary = not isinstance(sink, io.TextIOBase)
+        self.buffer_size = buffer_size
+        self.pending = []
+        self.size = 0
+        self.writes = 0  # 调用 sink.write 的次数
+
+    def write(self, text):
+        self.pending.append(text)
+        self.size += len(text)
+        if self.size >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        text = "".join(self.pending)
+        self.sink.write(text.encode("utf-8") if self.binary else text)
+        self.writes += 1
+        self.pending = []
+        self.size = 0
@@ -0,0 +1,244 @@
+import sys
+sys.path.append("../")
+from lexer import *
+from Quad import *
+from prettytable import PrettyTable
+from cfg import ControlFlowGraph, register_pressure
+from ConstantFolder import fits_immediate
+
+HOISTABLE_OPS = frozenset((':=', '+', '-', '*', '<', '=', '[]'))  # 没有副作用、提前执行也不会出错（除法可能除以 0）
+REGISTER_COUNT = 10  # 后端可分配的 $t 寄存器个数
+
+class LoopOptimizer:
+    """
+    while 循环的优化，由内层循环到外层循环逐个处理 WHILE ... ENDWHILE 区间：
+    - 循环不变量外提：操作数都是常数、循环中没有被赋值的变量或循环外定义的临时变量的运算，
+      移到 WHILE 之前（循环头之前只执行一次）；外提到内层循环之前的四元式在处理外层循环时还可以继续外提
+    - 强度削弱：循环中只有一次形如 v := v ± c 赋值的本过程变量 v 是归纳变量，
+      (v + d) * s 改为一个随 v 同步增加 s*c 的临时变量 p 加上常数 s*d，省去每次读 v、加偏移和乘法
+    乘以 2 的幂本身由 ConstantFolder 换成立即数，后端生成 sll。
+    循环中有过程调用时不做任何外提和强度削弱：被调用者可能改写任何变量，也会改写保存外提结果的 $t 寄存器。
+    引用形参可能是任何变量的别名：循环中对它赋值时不认为任何变量不变，循环中对任何变量赋值时也不认为它不变。
+    外提的值和 p 在整个循环期间占用寄存器，某个过程中同时占用的寄存器超过 REGISTER_COUNT 时该过程保持不变。
+    """
+    def __init__(self, quad_list):
+        self.quad_list = list(quad_list)
+        self.optimized_quads = QuadBuffer()
+        self.hoisted = 0
+        self.reduced = 0
+
+    def _classify(self, cfg):
+        self.variables = set()
+        self.ref_params = set()
+        self.own = {}         # 过程 -> 局部变量和值形参
+        self.def_count = {}   # 临时变量 -> 定义的次数
+        self.constants = {}   # 只定义一次、值为常数的临时变量 -> 常数
+        for i, quad in enumerate(self.quad_list):
+            op, arg1, _, res = quad
+            if op == 'DECLARE' or op == 'get':
+                self.variables.add(res)
+                if op == 'get' and arg1:
+                    self.ref_params.add(res)
+                else:
+                    self.own.setdefault(cfg.procedure_of(i), set()).add(res)
+                continue
+            _, target = quad_names(*quad)
+            if target is not None and target not in self.variables:
+                self.def_count[target] = self.def_count.get(target, 0) + 1
+                if op == ':=' and arg1.__class__ is int:
+                    self.constants[target] = arg1
+        for name, count in self.def_count.items():
+            if count > 1:
+                self.constants.pop(name, None)
+        self.temps = fresh_temps(self.quad_list)
+
+    def _loops(self):
+        """所有循环 (WHILE 下标, ENDWHILE 下标)，内层循环先于外层循环"""
+        loops = []
+        stack = []
+        for i, (op, _, _, _) in enumerate(self.quad_list):
+            if op == 'WHILE':
+                stack.append(i)
+            elif op == 'ENDWHILE':
+                loops.append((stack.pop(), i))
+        return loops
+
+    def _rows(self, start, end, out):
+        """循环体中当前的四元式 [(位置, quad)]，位置 (原下标, 序号) 按程序顺序递增"""
+        return [((i, k), quad) for i in range(start + 1, end) for k, quad in enumerate(out[i])]
+
+    def _hoist(self, start, end, out):
+        rows = self._rows(start, end, out)
+        if any(quad[0] == 'call' for _, quad in rows):
+            return
+        written = set()
+        defined = set()
+        unsafe = False
+        for _, quad in rows:
+            uses, target = quad_names(*quad)
+            if target is None:
+                continue
+            if target in self.variables:
+                written.add(target)
+                if target in self.ref_params:
+                    unsafe = True
+            else:
+                defined.add(target)
+        hoisted = []
+        moved = set()
+        invariant = set()
+        for position, quad in rows:
+            op, arg1, arg2, res = quad
+            if op not in HOISTABLE_OPS or res in self.variables or self.def_count.get(res) != 1:
+                continue
+            uses, _ = quad_names(*quad)
+            if op == '[]':
+                uses = uses[1:]  # 数组的基址不会改变
+            if all((name in invariant or name not in defined) if name not in self.variables
+                   else not unsafe and name not in written and not (written and name in self.ref_params)
+                   for name in uses):
+                hoisted.append(quad)
+                moved.add(position)
+                invariant.add(res)
+        if not hoisted:
+            return
+        for i in range(start + 1, end):
+            if any((i, k) in moved for k in range(len(out[i]))):
+                out[i] = [quad for k, quad in enumerate(out[i]) if (i, k) not in moved]
+        out[start][-1:-1] = hoisted  # out[start] 的最后一条是 WHILE
+        self.hoisted += len(hoisted)
+
+    def _reduce(self, cfg, start, end, out):
+        rows = self._rows(start, end, out)
+        if any(quad[0] == 'call' for _, quad in rows):
+            return
+        own = self.own.get(cfg.procedure_of(start), set())
+        writes = {}       # 变量 -> 循环中对它赋值的位置
+        definition = {}   # 循环中定义的临时变量 -> (位置, quad)
+        for position, quad in rows:
+            _, target = quad_names(*quad)
+            if target is None:
+                continue
+            if target in self.variables:
+                writes.setdefault(target, []).append((position, quad))
+            else:
+                definition[target] = (position, quad)
+        steps = {}  # 归纳变量 -> (每轮的增量, 赋值的位置)
+        for var, places in writes.items():
+            if var not in own or len(places) != 1:
+                continue
+            position, (op, src, _, _) = places[0]
+            if op != ':=' or src not in definition or self.def_count.get(src) != 1:
+                continue
+            _, (src_op, base, amount, _) = definition[src]
+            if (src_op == '+' or src_op == '-') and base == var and amount.__class__ is int:
+                steps[var] = (amount if src_op == '+' else -amount, position)
+        if not steps:
+            return
+        block_of = cfg.block_of
+        pointers = {}     # (归纳变量, 倍数) -> p
+        replaced = {}     # 位置 -> 新四元式
+        for position, (op, arg1, arg2, res) in rows:
+            if op != '*' or self.def_count.get(res) != 1:
+                continue
+            scale = arg2 if arg2.__class__ is int else self.constants.get(arg2)
+            if scale is None or (arg2.__class__ is not int and arg2 in definition):
+                continue
+            form = self._form(arg1, position, steps, definition, block_of)
+            if form is None:
+                continue
+            var, offset = form
+            step = steps[var][0] * scale
+            if not (fits_immediate('+', step) if step >= 0 else fits_immediate('-', -step)):
+                continue
+            quad = self._offset_quad(pointers.get((var, arg2)), scale * offset, res)
+            if quad is None:
+                continue
+            if (var, arg2) not in pointers:
+                pointers[(var, arg2)] = next(self.temps)
+                quad = self._offset_quad(pointers[(var, arg2)], scale * offset, res)
+            replaced[position] = quad
+        if not replaced:
+            return
+        increments = {}
+        for (var, arg2), pointer in pointers.items():
+            step = steps[var][0] * (arg2 if arg2.__class__ is int else self.constants[arg2])
+            increments.setdefault(steps[var][1], []).append(
+                ('+', pointer, step, pointer) if step >= 0 else ('-', pointer, -step, pointer))
+            out[start].insert(len(out[start]) - 1, ('*', var, arg2, pointer))
+            self.def_count[pointer] = 2
+        for i in range(start + 1, end):
+            rows_i = []
+            for k, quad in enumerate(out[i]):
+                rows_i.append(replaced.get((i, k), quad))
+                rows_i.extend(increments.get((i, k), ()))
+            out[i] = rows_i
+        self.reduced += len(replaced)
+
+    def _form(self, name, position, steps, definition, block_of):
+        """name 在 position 处的值若等于归纳变量 v 当前的值加常数 d，返回 (v, d)"""
+        if name in steps:
+            return name, 0
+        if name not in definition:
+            return None
+        def_position, (op, base, amount, _) = definition[name]
+        if base not in steps or block_of[def_position[0]] != block_of[position[0]]:
+            return None
+        # 定义与使用之间 v 不能被赋值（否则两处的 v 不是同一个值）
+        if def_position < steps[base][1] < position:
+            return None
+        if op == ':=':
+            return base, 0
+        if (op == '+' or op == '-') and amount.__class__ is int:
+            return base, amount if op == '+' else -amount
+        return None
+
+    def _offset_quad(self, pointer, offset, res):
+        """res := pointer + offset；pointer 为 None 时只检查偏移能否用立即数表示"""
+        if offset == 0:
+            return (':=', pointer, None, res)
+        if offset > 0 and fits_immediate('+', offset):
+            return ('+', pointer, offset, res)
+        if offset < 0 and fits_immediate('-', -offset):
+            return ('-', pointer, -offset, res)
+        return None
+
+    def optimize(self, output_file="../result/中间代码优化.txt"):
+        cfg = ControlFlowGraph(self.quad_list)
+        self._classify(cfg)
+        out = [[quad] for quad in self.quad_list]
+        for start, end in self._loops():
+            self._hoist(start, end, out)
+            self._reduce(cfg, start, end, out)
+        quads = []
+        origin = []
+        for i, rows in enumerate(out):
+            for quad in rows:
+                quads.append(quad)
+                origin.append(i)
+        crowded = {cfg.procedure_of(origin[n]) for n, count in enumerate(register_pressure(quads)) if count > REGISTER_COUNT}
+        emit = self.optimized_quads.append
+        for i, rows in enumerate(out):
+            # 寄存器不够用的过程保持原样
+            for quad in ((self.quad_list[i],) if cfg.procedure_of(i) in crowded else rows):
+                emit(*quad)
+        if output_file:
+            table = PrettyTable(field_names=["operator", "exp1", "exp2", "result"])
+            for row in self.optimized_quads:
+                table.add_row(list(row))
+            with open(output_file, "w", encoding="utf-8") as w:
+                w.write(table.get_string())
+        return self.optimized_quads
+
+if __name__ == '__main__':
+    from session import CompilerSession
+    session = CompilerSession()
+    result = session.compile_file("../data/7-bubbleSort.txt")
+    if result.ok:
+        print(len(result.quadruples))
+        print(len(result.optimized_quads))
+        for i in result.optimized_quads:
+            print(i)
+    else:
+        for error in result.errors:
+            print(error)
@@ -1,23 +1,73 @@
 import sys
 sys.path.append("..")
+import io
 from lexer import *
 from Quad import *
+from cfg import temp_intervals
+from Peephole import MIPSPeephole
+from Instruction import *
+from RegisterAllocator import RegisterAllocator, SAVED_REGISTERS
+from diagnostic import *
+
+OUTPUT_FILE = "../result/target.mips"  # generate 默认写入的文件
+TEMP_REGISTERS = ['$t%d' % i for i in range(10)]
+
+class Slot:
+    """
+    帧布局表中的一项。
+    - level: 名字所在过程的静态嵌套层数（主程序为 0），与当前层数之差就是要沿静态链走的步数
+    - offset: 在该过程局部变量区中的偏移（相对于该过程执行时的 $sp）；过程名为 None
+    - is_ref: 是否为引用形参（单元中保存的是实参的地址）
+    """
+    __slots__ = ('level', 'offset', 'is_ref')
+
+    def __init__(self, level, offset, is_ref=False):
+        self.level = level
+        self.offset = offset
+        self.is_ref = is_ref
+
+    def __repr__(self):
+        return f"Slot({self.level}, {self.offset}, {self.is_ref})"
 
 class MIPSGenerator:
-    def __init__(self, quadruples):
+    def __init__(self, quadruples, diagnostics=None, peephole=False, allocate=False):
         self.quads = quadruples
-        self.code = []
-        self.label_count = 0
+        self.use_peephole = peephole
+        self.peephole = None  # 启用窥孔优化时为 MIPSPeephole，其中有各模式的统计
+        self.use_allocator = allocate  # 为变量分配 $s 寄存器
+        self.allocator = None
+        self.diagnostics = diagnostics if diagnostics is not None else DiagnosticCollector()
+        self.code = []  # 结构化指令 Instruction，每个过程生成完毕后输出为文本
+        self.flushed = 0  # code 中已经输出的指令条数
+        self.renderer = Renderer()
+        self.outputs = []  # generate 期间写入的 BufferedSink
+        self.chunks = None  # 已输出的各段文本，generate 返回时拼接；流式输出到 sink 时为 None
+        self.separator = ""  # 输出第一段之后，各段之间用换行分隔
+        self.labels = {}  # 有名字的标号（过程名、Go/label 的标号）-> Label
         self.reg_map = {}
-        self.reg_pool = ['$t%d' % i for i in range(10)]  # 可用的临时寄存器
+        self.reg_pool = list(TEMP_REGISTERS)  # 可用的临时寄存器
         self.param_regs = ['$a%d' % i for i in range(4)] # 参数寄存器
         self.current_proc = None
-        self.stack_offset1 = {}
-        self.stack_list = []
+        self.layout = {}  # 帧布局表：当前过程中可见的变量和过程名 -> Slot，内层的名字遮盖外层的
+        self.level = -1   # 当前过程的静态嵌套层数
+        self.links = []   # 各层过程的帧中保存静态链的单元的偏移（主程序没有静态链，为 None）
         self.stack_offset = 0 # 当前栈帧大小
-        self.target_stack = []# 目标指令地址栈 (存储需要回填的跳转指令索引)
-        self.label_stack = []
+        self.target_stack = []# 条件跳转的目标标号栈（ELSE 之后、ENDIF、ENDWHILE 之后）
+        self.label_stack = []  # 循环开始的标号栈
         self.size = 4 # 每个变量的大小
+        self.expiry = []  # (最后使用处, 临时变量)，按下标排序
+        self.expired = 0  # expiry 中已经释放寄存器的个数
+        self.last_use = {}  # 临时变量 -> 最后使用处
+        self.pinned = set()  # 当前四元式已经取到寄存器中的名字，溢出时不能选它们
+        self.allocation = None  # 当前过程的 RegisterAllocator.Allocation
+        self.homes = {}  # 当前过程中常驻 $s 寄存器的变量
+        self.saved_slots = []  # 当前过程保存 $s 寄存器的 (寄存器, 偏移)
+        self.spill_free = []  # 当前栈帧中空闲的溢出单元偏移
+        self.spilled = {}  # 溢出到栈帧中的临时变量 -> 偏移
+        self.frames = []  # 外层过程的上述状态以及帧布局表
+        self.bodies = {}  # 含嵌套过程的过程体第一条四元式的下标 -> Label
+        self.proc_ends = {}  # PROCEDURE 四元式的下标 -> 对应 ENDPROCEDURE 的下标
+        self.arg_count = 0  # 下一次调用已经传递的实参个数（param 之间可能夹着计算实参的四元式）
         #self.label_definitions = {} # 存储标号定义的位置 (标号: 指令索引)
 
     def get_reg(self, var):
@@ -28,6 +78,7 @@ class MIPSGenerator:
             self._handle_register_overflow()  # 处理寄存器溢出
         reg = self.reg_pool.pop(0)
         self.reg_map[var] = reg
+        self.pinned.add(var)
         return reg
     
     def has_reg(self, var):
@@ -38,141 +89,291 @@ class MIPSGenerator:
         if var in self.reg_map:
             reg = self.reg_map.pop(var)
             self.reg_pool.insert(0, reg)
-
-    def emit(self, instruction):
-        """添加指令到代码列表"""
-        self.code.append(instruction)
-        return len(self.code) - 1 # 返回指令的索引
+        slot = self.spilled.pop(var, None)
+        if slot is not None:
+            self.spill_free.append(slot)
+
+    def _release_variables(self):
+        """
+        每条四元式之后释放变量占用的 $t 寄存器。写变量的四元式已经由 free_regs 写回并释放，
+        剩下的只是读取过的变量，寄存器中的值与内存中的相同，直接释放即可。
+        这样同时占用的寄存器不超过 register_pressure，RegisterAllocator 据此预留的溢出单元总是够用。
+        """
+        for name in [name for name in self.reg_map if self.variable(name) is not None]:
+            self.free_reg(name)
+
+    def _reset_registers(self):
+        """过程边界：本过程的临时变量都已用完，外层过程体还没有开始，$t 寄存器全部归还"""
+        self.reg_map.clear()
+        self.reg_pool = list(TEMP_REGISTERS)
+
+    def _release(self, idx):
+        """释放最后一次使用在 idx 之前的临时变量的寄存器"""
+        expiry = self.expiry
+        while self.expired < len(expiry) and expiry[self.expired][0] < idx:
+            self.free_reg(expiry[self.expired][1])
+            self.expired += 1
+
+    def emit(self, op, *args):
+        """添加一条指令到代码列表"""
+        self.code.append(Instruction(op, *args))
+
+    def label(self, name):
+        """名字为 name 的标号，同一个名字总是同一个 Label"""
+        label = self.labels.get(name)
+        if label is None:
+            label = self.labels[name] = Label(name)
+        return label
+
+    def define(self, label):
+        """在当前位置定义标号"""
+        self.code.append(Instruction(LABEL, label))
     
-    def get_offset(self, var):
-        if var in self.stack_offset1:
-            off = self.stack_offset1.get(var, 0) 
-            if isinstance(off, tuple):
-                return off[0]
-            else:
-                return off
+    def variable(self, name):
+        """变量在帧布局表中的 Slot；临时变量和过程名返回 None"""
+        slot = self.layout.get(name)
+        if slot is None or slot.offset is None:
+            return None
+        return slot
+
+    def _base(self, level, reg='$v0'):
+        """
+        层数为 level 的过程的局部变量区起点：本过程就是 $sp，主程序的在 $gp 中（主程序的帧不会移动），
+        其他外层过程沿静态链逐层装入 reg
+        """
+        if level == self.level:
+            return '$sp'
+        if level == 0:
+            return '$gp'
+        self.emit("lw", reg, (self.links[self.level], '$sp'))
+        for outer in range(self.level - 1, level, -1):
+            self.emit("lw", reg, (self.links[outer], reg))
+        return reg
+
+    def _address(self, slot, reg):
+        """把变量的地址装入 reg；引用形参的单元中本来就是地址"""
+        base = self._base(slot.level, reg)
+        if slot.is_ref:
+            self.emit("lw", reg, (slot.offset, base))
         else:
-            offset = self.stack_offset1['size'] + 8
-            for i in range(len(self.stack_list)-1, -1, -1):
-                if var in self.stack_list[i]:
-                    off = self.stack_list[i].get(var, 0)
-                    if isinstance(off, tuple):
-                        return offset + off[0]
-                    else:
-                        return offset + off
-                else:
-                    offset += self.stack_list[i]['size'] + 8
-    
-    def is_var(self, var):
-        if var in self.stack_offset1:
-            if isinstance(self.stack_offset1[var], tuple):
-                return self.stack_offset1[var]
-            else:
-                return True
+            self.emit("addi", reg, base, slot.offset)
+
+    def generate(self, output_file=OUTPUT_FILE, sink=None):
+        """
+        生成目标代码。每个过程的代码生成完毕（遇到下一个过程或程序结束）就做窥孔优化并输出为文本，
+        经过缓冲写入 output_file（为 None 时不写文件）和 sink（任何有 write 方法的对象，见 BufferedSink）。
+        返回完整的汇编文本；给出 sink 时由调用者消费输出，不在内存中拼接整个程序，返回 None，
+        输出过的指令也不再保留在 self.code 中。
+        """
+        self.chunks = [] if sink is None else None
+        files = []
+        try:
+            if output_file:
+                files.append(open(output_file, "w", encoding="utf-8"))
+                self.outputs.append(BufferedSink(files[-1]))
+            if sink is not None:
+                self.outputs.append(BufferedSink(sink))
+            self._generate()
+            for output in self.outputs:
+                output.flush()
+        finally:
+            for f in files:
+                f.close()
+        return "".join(self.chunks) if self.chunks is not None else None
+
+    def generate_bytes(self):
+        """生成目标代码并以 UTF-8 编码的 bytes 返回，不写文件"""
+        buffer = io.BytesIO()
+        self.generate(None, buffer)
+        return buffer.getvalue()
+
+    def _flush(self):
+        """上次输出以来的代码已经完整（一个过程或主程序），做窥孔优化后输出为文本"""
+        code = self.code[self.flushed:]
+        if self.peephole is not None:
+            code = self.peephole.optimize(code)
+        lines = self.renderer.lines(code)
+        if self.chunks is None:
+            del self.code[:]
         else:
-            for i in range(len(self.stack_list)-1, -1, -1):
-                if var in self.stack_list[i]:
-                    return self.stack_list[i].get(var, 0)
-            return False
-
-    def generate(self):
-        self.code.append(".data")
+            self.code[self.flushed:] = code
+        self.flushed = len(self.code)
+        if not lines:
+            return
+        text = self.separator + "\n".join(lines)
+        self.separator = "\n"
+        if self.chunks is not None:
+            self.chunks.append(text)
+        for output in self.outputs:
+            output.write(text)
+
+    def _generate(self):
+        if self.use_peephole:
+            self.peephole = MIPSPeephole(())
+        self.emit(".data")
         # global var but not necessary
         # for quad in self.quads:
         #     if quad.operator == ''
-        self.code.append("newline: .asciiz \"\\n\"")
-        self.code.append(".text")
-        self.code.append(".globl main")  # 声明main函数为全局
-        self.code.append("main:")
+        self.define(self.label("newline"))
+        self.emit(".asciiz", '"\\n"')
+        self.emit(".text")
+        self.emit(".globl", "main")  # 声明main函数为全局
+        self.define(self.label("main"))
         # not defined whether to li $sp 0x7FFFF...
-        self.emit("li $sp, 0x7FFFFFFC")
+        self.emit("li", "$sp", 0x7FFFFFFC)
+        self.allocator = RegisterAllocator(self.quads, SAVED_REGISTERS if self.use_allocator else ())
+        self.allocator.allocate()
+        self._enter_frame(0)
         pq = self._resolve_sp(0)
+        # 临时变量可能被多次使用（公共子表达式），寄存器在最后一次使用之后才释放
+        self.last_use = {name: end for name, (_, end) in temp_intervals(self.quads).items()}
+        self.expiry = sorted((end, name) for name, end in self.last_use.items())
+        self.expired = 0
         jk = 0
         for idx in range(pq, len(self.quads)):
             if idx < jk:
                 continue
-            op, arg1, arg2, res = self.quads[idx].operator, self.quads[idx].operand1, self.quads[idx].operand2, self.quads[idx].result
-            if self.quads[idx].operator == 'PROCEDURE':
+            self._release(idx)
+            self.pinned.clear()
+            if idx in self.bodies:
+                self.define(self.bodies.pop(idx))
+            op, arg1, arg2, res = self.quads[idx]
+            if op == 'PROCEDURE':
+                self._flush()
+                self._reset_registers()
+                self.layout[arg1] = Slot(self.level, None)
                 self._gen_procedure(op, arg1, arg2, res)
+                self._enter_frame(idx)
                 num = res
                 self._resolve_sp(idx + 1)
                 idx += 1
                 for i in range(num):
-                    op, arg1, arg2, res = self.quads[idx].operator, self.quads[idx].operand1, self.quads[idx].operand2, self.quads[idx].result
-                    off_set = self.get_offset(res)
-                    self.emit(f'sw $a{i}, {off_set}($sp)')
+                    op, arg1, arg2, res = self.quads[idx]
+                    if res in self.homes:
+                        self.emit("move", self.homes[res], f"$a{i}")
+                    else:
+                        self.emit("sw", f"$a{i}", (self.layout[res].offset, '$sp'))
                     idx += 1
-                while(self.quads[idx].operator == 'DECLARE'):
+                while(self.quads[idx][0] == 'DECLARE'):
                     idx += 1
+                if self.quads[idx][0] == 'PROCEDURE':
+                    # 嵌套过程的代码紧跟在声明之后，跳过它们到过程体
+                    label = Label()
+                    self.emit("j", label)
+                    self.bodies[self._skip_procedures(idx)] = label
                 jk = idx
                 #print(idx, "duhaonjsdhyagwid")
-            elif self.quads[idx].operator == 'param':
-                num = 0
-                while self.quads[idx].operator == 'param':
-                    if not self.quads[idx].result:
-                        #print("--------", self.quads[idx].operand1)
-                        arg_reg = self.get_regs(self.quads[idx].operand1)
-                        self.emit(f'move $a{num}, {arg_reg}')
-                        self.free_regs(self.quads[idx].operand1, arg_reg)
-                    else:
-                        offset = self.get_offset(self.quads[idx].operand1)
-                        self.emit(f'li $v0, {offset}')
-                        self.emit(f'add $v0, $sp, $v0')
-                        self.emit(f'move $a{num}, $v0')
-                    num += 1
-                    idx += 1
-                jk = idx
             else:
                 self._gen_instruction(op, arg1, arg2, res)
+                self._release_variables()
 
         # 结束程序
-        self.code.append("li $v0, 10")
-        self.code.append("syscall")
-        mips_code = '\n'.join(self.code) 
-        with open("../result/target.mips", "w") as f:
-            for line in mips_code:
-                f.write(line)
-        return mips_code
+        self.emit("li", "$v0", 10)
+        self.emit("syscall")
+        self._flush()
 
     def _resolve_sp(self, idx):
+        """排定当前过程的栈帧，把局部变量和形参记入帧布局表"""
         self.stack_offset = 0
-        while self.quads[idx].operator in ('DECLARE', 'get'):
-            if self.quads[idx].operator == 'get' and self.quads[idx].operand1:
-                self.stack_offset1[self.quads[idx].result] = (self.stack_offset, True)
-            else:
-                self.stack_offset1[self.quads[idx].result] = self.stack_offset 
-            self.stack_offset += self.quads[idx].operand2 * self.size
+        layout = self.layout
+        while self.quads[idx][0] in ('DECLARE', 'get'):
+            op, arg1, length, name = self.quads[idx]
+            layout[name] = Slot(self.level, self.stack_offset, op == 'get' and bool(arg1))
+            self.stack_offset += length * self.size
             idx += 1
-        self.stack_offset1["size"] = self.stack_offset
-        self.code.append(f"addi $sp, $sp, -{self.stack_offset}")
+        # 过程的帧中有一个单元保存静态链，即外层过程的局部变量区起点，由调用者放在 $v1 中传入
+        del self.links[self.level:]
+        if self.level:
+            self.links.append(self.stack_offset)
+            self.stack_offset += self.size
+        else:
+            self.links.append(None)
+        # 之后依次是保存 $s 寄存器的单元和溢出单元
+        self.saved_slots = []
+        for reg in self.allocation.saved:
+            self.saved_slots.append((reg, self.stack_offset))
+            self.stack_offset += self.size
+        self.spill_free = [self.stack_offset + self.size * k for k in range(self.allocation.spill_slots)]
+        self.stack_offset += self.size * self.allocation.spill_slots
+        self.emit("addi", "$sp", "$sp", -self.stack_offset)
+        if self.level:
+            self.emit("sw", "$v1", (self.links[self.level], '$sp'))
+        else:
+            self.emit("move", "$gp", "$sp")
+        for reg, offset in self.saved_slots:
+            self.emit("sw", reg, (offset, '$sp'))
+        return idx
+
+    def _skip_procedures(self, idx):
+        """从下标 idx 开始跳过连续的过程声明，返回之后第一条四元式的下标"""
+        if not self.proc_ends:
+            stack = []
+            for i, (op, _, _, _) in enumerate(self.quads):
+                if op == 'PROCEDURE':
+                    stack.append(i)
+                elif op == 'ENDPROCEDURE':
+                    self.proc_ends[stack.pop()] = i
+        while self.quads[idx][0] == 'PROCEDURE':
+            idx = self.proc_ends[idx] + 1
         return idx
 
+    def _enter_frame(self, idx):
+        """进入主程序（idx 为 0）或下标为 idx 的 PROCEDURE，外层过程的分配状态和帧布局表入栈"""
+        self.frames.append((self.allocation, self.homes, self.saved_slots, self.spill_free, self.spilled,
+                            self.layout, self.level))
+        self.layout = dict(self.layout)
+        self.level += 1
+        self.allocation = self.allocator.procedures[idx]
+        self.homes = self.allocation.homes
+        self.spilled = {}
+
+    def _leave_frame(self):
+        (self.allocation, self.homes, self.saved_slots, self.spill_free, self.spilled,
+         self.layout, self.level) = self.frames.pop()
+
     def get_regs(self, operator):
+        home = self.homes.get(operator)
+        if home is not None:
+            return home
         reg = self.get_reg(operator)
-        flag = self.is_var(operator)
-        #print(flag, operator)
-        if isinstance(flag, tuple):
-            offset = flag[0]
-            self.emit(f"lw $v0, {offset}($sp)")
-            self.emit(f"lw {reg}, 0($v0)")
-        elif flag:
-            offset = self.get_offset(operator)
-            self.emit(f"lw {reg}, {offset}($sp)")
+        slot = self.spilled.pop(operator, None)
+        if slot is not None:
+            self.emit("lw", reg, (slot, '$sp'))
+            self.spill_free.append(slot)
+            return reg
+        slot = self.variable(operator)
+        if slot is not None:
+            base = self._base(slot.level)
+            if slot.is_ref:
+                self.emit("lw", "$v0", (slot.offset, base))
+                self.emit("lw", reg, (0, "$v0"))
+            else:
+                self.emit("lw", reg, (slot.offset, base))
         return reg
+
+    def target_reg(self, operator):
+        """取一个寄存器用来给 operator 赋值：与 get_regs 相同，但不装入原来的值"""
+        home = self.homes.get(operator)
+        if home is not None:
+            return home
+        slot = self.spilled.pop(operator, None)
+        if slot is not None:
+            self.spill_free.append(slot)
+        return self.get_reg(operator)
     
     def free_regs(self, operator, reg):
-        flag = self.is_var(operator)
-        if isinstance(flag, tuple):
-            offset = flag[0]
-            self.emit(f"lw $v0, {offset}($sp)")
-            self.emit(f"sw {reg}, 0($v0)")
-            self.free_reg(operator)
-        elif flag:
-            offset = self.get_offset(operator)
-            self.emit(f"sw {reg}, {offset}($sp)")
-            self.free_reg(operator)
-        else:
+        if operator in self.homes:
+            return
+        slot = self.variable(operator)
+        if slot is not None:
+            base = self._base(slot.level)
+            if slot.is_ref:
+                self.emit("lw", "$v0", (slot.offset, base))
+                self.emit("sw", reg, (0, "$v0"))
+            else:
+                self.emit("sw", reg, (slot.offset, base))
             self.free_reg(operator)
+        # 临时变量由 _release 在最后一次使用之后释放
 
     def _gen_instruction(self, op, arg1, arg2, res):
         handler = {
@@ -193,6 +394,7 @@ class MIPSGenerator:
             'OUT': self._gen_output,
             'PROCEDURE': self._gen_procedure,
             'ENDPROCEDURE': self._gen_endprocedure,
+            'param': self._gen_param,
             'call': self._gen_call,
             'load': self._gen_load,
             ':=:': self._addr_assign,
@@ -203,59 +405,67 @@ class MIPSGenerator:
         handler(op, arg1, arg2, res)
 
     def _gen_label(self, op, label, _, __):
-        self.emit(f'{label}:')
+        self.define(self.label(label))
 
     def _gen_goto(self, op, label, _, __):
-        self.emit(f'j {label}')
+        self.emit("j", self.label(label))
 
     def _gen_load(self, op, addr, _, dest):
+        # addr 是 [] 算出的绝对地址
+        addr_reg = self.get_regs(addr)
         dest_reg = self.get_regs(dest)
-        self.emit(f'add {dest_reg}, {dest_reg}, $sp')
-        self.emit(f"lw {dest_reg}, 0({dest_reg})")
+        self.emit("lw", dest_reg, (0, addr_reg))
 
     def _addr_assign(self, op, src, _, dest):
+        # 地址寄存器保持不变，之后还可能用同一个地址
         dest_reg = self.get_regs(dest)
-        self.emit(f'add {dest_reg}, {dest_reg}, $sp')
         if isinstance(src, int):
-            self.emit(f"li $v0, {src}") 
-            self.emit(f"sw $v0, 0({dest_reg})")
-        else: 
+            self.emit("li", "$v1", src)
+            src_reg = "$v1"
+        else:
             src_reg = self.get_regs(src)
-            self.emit(f"sw {src_reg}, 0({dest_reg})")
+        self.emit("sw", src_reg, (0, dest_reg))
+        if not isinstance(src, int):
             self.free_regs(src, src_reg)
-        self.free_regs(dest, dest_reg) 
+        self.free_regs(dest, dest_reg)
 
     def _gen_address(self, op, addr, src, dest):
+        # 数组元素或记录域的绝对地址：addr 的起始地址加上偏移 src
         dest_reg = self.get_regs(dest)
         src_reg = self.get_regs(src)
-        
-        if self.has_reg(addr):
-            self.emit(f'add, {dest_reg}, {src_reg}, {self.get_reg(addr)}')
+        slot = self.variable(addr)
+        if slot is None:  # 记录中的数组，起始地址是上一次 [] 的结果
+            self.emit("add", dest_reg, src_reg, self.get_regs(addr))
+        elif slot.is_ref:
+            base = self._base(slot.level)
+            self.emit("lw", "$v0", (slot.offset, base))
+            self.emit("add", dest_reg, src_reg, "$v0")
         else:
-            offset = self.get_offset(addr)
-            self.emit(f'addi {dest_reg}, {src_reg}, {offset}')
+            base = self._base(slot.level)
+            self.emit("add", dest_reg, src_reg, base)
+            if slot.offset:
+                self.emit("addi", dest_reg, dest_reg, slot.offset)
         self.free_regs(src, src_reg)
 
     def _gen_assign(self, op, src, _, dest):
-        dest_reg = self.get_regs(dest)
         if isinstance(src, int):  # 如果是数字，则直接加载到寄存器中
-            self.emit(f"li {dest_reg}, {src}")
+            dest_reg = self.target_reg(dest)
+            self.emit("li", dest_reg, src)
         else: 
             src_reg = self.get_regs(src)
-            self.emit(f"move {dest_reg}, {src_reg}")
+            dest_reg = self.target_reg(dest)
+            self.emit("move", dest_reg, src_reg)
             self.free_regs(src, src_reg)
-
-        if dest in self.stack_offset1:
-            self.free_regs(dest, dest_reg)
+        self.free_regs(dest, dest_reg)
 
     def _gen_lt(self, op, a, b, res):
         res_reg = self.get_regs(res)
         a_reg = self.get_regs(a)
         if isinstance(b, int):
-            self.emit(f"slti {res_reg}, {a_reg}, {b}")
+            self.emit("slti", res_reg, a_reg, b)
         else:
             b_reg = self.get_regs(b)
-            self.emit(f"slt {res_reg}, {a_reg}, {b_reg}")
+            self.emit("slt", res_reg, a_reg, b_reg)
             self.free_regs(b, b_reg)
         self.free_regs(a, a_reg)
 
@@ -263,8 +473,8 @@ class MIPSGenerator:
         res_reg = self.get_regs(res)
         a_reg = self.get_regs(a)
         b_reg = self.get_regs(b)
-        self.emit(f"sub {res_reg}, {a_reg}, {b_reg}")
-        self.emit(f"slti {res_reg}, {res_reg}, 1")
+        self.emit("sub", res_reg, a_reg, b_reg)
+        self.emit("sltiu", res_reg, res_reg, 1)  # 差为 0 才为真，无符号比较排除负数
         self.free_regs(a, a_reg)
         self.free_regs(b, b_reg)
 
@@ -272,10 +482,10 @@ class MIPSGenerator:
         res_reg = self.get_regs(res)
         a_reg = self.get_regs(a)
         if isinstance(b, int):
-            self.emit(f"addi {res_reg}, {a_reg}, {b}")
+            self.emit("addi", res_reg, a_reg, b)
         else:
             b_reg = self.get_regs(b)
-            self.emit(f"add {res_reg}, {a_reg}, {b_reg}")
+            self.emit("add", res_reg, a_reg, b_reg)
             self.free_regs(b, b_reg)
         self.free_regs(a, a_reg)
 
@@ -283,159 +493,172 @@ class MIPSGenerator:
         res_reg = self.get_regs(res)
         a_reg = self.get_regs(a)
         if isinstance(b, int):
-            self.emit(f"addi {res_reg}, {a_reg}, -{b}")
+            self.emit("addi", res_reg, a_reg, -b)
         else:
             b_reg = self.get_regs(b)
-            self.emit(f"sub {res_reg}, {a_reg}, {b_reg}")
+            self.emit("sub", res_reg, a_reg, b_reg)
             self.free_regs(b, b_reg)
         self.free_regs(a, a_reg)
 
     def _gen_mul(self, op, a, b, res):
         res_reg = self.get_regs(res)
         a_reg = self.get_regs(a)
-        b_reg = self.get_regs(b)
-        self.emit(f"mul {res_reg}, {a_reg}, {b_reg}")
+        if isinstance(b, int):  # 常数只会是 2 的幂（见 ConstantFolder.fits_immediate），乘法改为移位
+            self.emit("sll", res_reg, a_reg, b.bit_length() - 1)
+        else:
+            b_reg = self.get_regs(b)
+            self.emit("mul", res_reg, a_reg, b_reg)
+            self.free_regs(b, b_reg)
         self.free_regs(a, a_reg)
-        self.free_regs(b, b_reg)
 
     def _gen_div(self, op, a, b, res):
         res_reg = self.get_regs(res)
         a_reg = self.get_regs(a)
         b_reg = self.get_regs(b)
-        self.emit(f"div {a_reg}, {b_reg}")
-        self.emit(f"mflo {res_reg}")
+        self.emit("div", a_reg, b_reg)
+        self.emit("mflo", res_reg)
         self.free_regs(a, a_reg)
         self.free_regs(b, b_reg)
 
     def _gen_then(self, op, cond, _, __):
-        cond_reg = self.get_reg(cond)
-        jump_index = self.emit(f"beqz {cond_reg}, else_label")
+        cond_reg = self.get_regs(cond)
+        else_label = Label()
+        self.emit("beqz", cond_reg, else_label)
         self.emit("nop")
-        self.target_stack.append((jump_index, "else_label"))
+        self.target_stack.append(else_label)
 
     def _gen_else(self, op, _, __, ___):
-        jump_index = self.emit(f"j endif_label")
-        self.emit("nop")
-        # 回填 THEN 语句的跳转目标
-        if self.target_stack:
-            then_jump_index, then_label = self.target_stack.pop()
-            self.code[then_jump_index] = self.code[then_jump_index].replace(then_label, f"label{self.label_count}")
-            #self.label_definitions[f"label{self.label_count}"] = len(self.code)
-            self.emit(f"label{self.label_count}:")
-            self.label_count += 1
-        else:
+        if not self.target_stack:
             raise RuntimeError(f"找不到与 ELSE 对应的 THEN 标签:")
-                # 将需要回填的跳转指令索引和目标标号压入栈
-        self.target_stack.append((jump_index, 'endif_label'))
+        endif_label = Label()
+        self.emit("j", endif_label)
+        self.emit("nop")
+        # THEN 条件为假时跳到这里
+        self.define(self.target_stack.pop())
+        self.target_stack.append(endif_label)
 
     def _gen_endif(self, op, ___, _, __):
-        if self.target_stack:
-            #print(self.target_stack)
-            else_jump_index, else_label = self.target_stack.pop()
-            self.code[else_jump_index] = self.code[else_jump_index].replace(else_label, f"label{self.label_count}")
-        else:
+        if not self.target_stack:
             raise RuntimeError(f"找不到与 ENDIF 对应的 THEN 或 ELSE 标签:")
-        # 定义 ENDIF 标号的位置
-        #self.label_definitions[f"label{self.label_count}"] = len(self.code)
-        self.emit(f"label{self.label_count}:")
-        self.label_count += 1
+        self.define(self.target_stack.pop())
 
     def _gen_while(self, op, _, __, ___):
         # 定义循环开始的标号
-        #self.label_definitions[f"label{self.label_count}"] = len(self.code)
-        self.emit(f"label{self.label_count}:")
-        self.label_count += 1
-        self.label_stack.append(f"label{self.label_count - 1}")
+        start_label = Label()
+        self.define(start_label)
+        self.label_stack.append(start_label)
 
     def _gen_do(self, op, cond, _, __):
-        cond_reg = self.get_reg(cond)
-        jump_index = self.emit(f"beqz {cond_reg}, endwh")
+        cond_reg = self.get_regs(cond)
+        end_label = Label()
+        self.emit("beqz", cond_reg, end_label)
         self.emit("nop")
-        self.target_stack.append((jump_index, "endwh"))
+        self.target_stack.append(end_label)
 
     def _gen_endwhile(self, op, __, _, ___):
-        start_label = self.label_stack.pop()
-        self.emit(f"j {start_label}")
-        self.emit("nop")
-        if self.target_stack:
-            do_jump_index, do_label = self.target_stack.pop()
-            self.code[do_jump_index] = self.code[do_jump_index].replace(do_label, f"label{self.label_count}")
-        else:
+        if not self.target_stack:
             raise RuntimeError(f"找不到与 ENDWHILE 对应的 DO 标签:")
-        self.emit(f"label{self.label_count}:")
-        self.label_count += 1
+        self.emit("j", self.label_stack.pop())
+        self.emit("nop")
+        self.define(self.target_stack.pop())
 
     def _gen_input(self, op, var, _, __):
-        self.emit("li $v0, 5")
+        reg = self.target_reg(var)  # 写回引用形参和外层变量时要用 $v0，先取寄存器
+        self.emit("li", "$v0", 5)
         self.emit("syscall")
-        reg = self.get_regs(var)
-        self.emit(f"move {reg}, $v0")
+        self.emit("move", reg, "$v0")
         self.free_regs(var, reg)
 
     def _gen_output(self, op, val, _, __):
         reg = self.get_regs(val)
-        self.emit("li $v0, 1")
-        self.emit(f"move $a0, {reg}")
+        self.emit("li", "$v0", 1)
+        self.emit("move", "$a0", reg)
         self.emit("syscall")
+        if self.variable(val) is not None:
+            self.free_reg(val)  # 只读取了变量，不用写回
         # 打印换行
-        self.emit("li $v0, 4")
-        self.emit("la $a0, newline")
+        self.emit("li", "$v0", 4)
+        self.emit("la", "$a0", self.label("newline"))
         self.emit("syscall")
 
     def _gen_procedure(self, op, name, _, num):
-        self.stack_list.append(self.stack_offset1)
-        self.stack_offset1 = {}
-        self.emit(f"{name}:")
+        self.define(self.label(name))
         self.current_proc = name
         self.stack_offset = 0
         # 保存返回地址和帧指针
-        self.emit("subu $sp, $sp, 8")
-        self.emit("sw $ra, 4($sp)")
-        self.emit("sw $fp, 0($sp)")
-        self.emit("move $fp, $sp")
+        self.emit("subu", "$sp", "$sp", 8)
+        self.emit("sw", "$ra", (4, "$sp"))
+        self.emit("sw", "$fp", (0, "$sp"))
+        self.emit("move", "$fp", "$sp")
 
 
     def _gen_endprocedure(self, op, _, __, ___):
+        for reg, offset in self.saved_slots:
+            self.emit("lw", reg, (offset, "$sp"))
         # 恢复帧指针和返回地址
-        self.emit("move $sp, $fp")
-        self.emit("lw $fp, 0($sp)")
-        self.emit("lw $ra, 4($sp)")
-        self.emit("addu $sp, $sp, 8")
-        self.emit("jr $ra")
-        #print(self.stack_offset1)
-        self.stack_offset1 = self.stack_list.pop()
-        #print(self.stack_offset1)
+        self.emit("move", "$sp", "$fp")
+        self.emit("lw", "$fp", (0, "$sp"))
+        self.emit("lw", "$ra", (4, "$sp"))
+        self.emit("addu", "$sp", "$sp", 8)
+        self.emit("jr", "$ra")
+        self._leave_frame()
+        self._reset_registers()
         self.current_proc = None
 
+    def _gen_param(self, op, arg, _, is_ref):
+        num = self.arg_count
+        self.arg_count += 1
+        if not is_ref:
+            arg_reg = self.get_regs(arg)
+            self.emit("move", f"$a{num}", arg_reg)
+            self.free_regs(arg, arg_reg)
+        else:
+            self._address(self.variable(arg), f'$a{num}')
+
     def _gen_call(self, op, proc, _, __):
-        self.emit(f"jal {proc}")
+        self.arg_count = 0
+        # 静态链：被调用过程声明所在的过程的局部变量区起点
+        base = self._base(self.layout[proc].level, '$v1')
+        if base == '$sp':
+            self.emit("move", "$v1", "$sp")
+        self.emit("jal", self.label(proc))
         # 参数寄存器在被调用函数中处理，这里不需要重置
 
     def _gen_unknown(self, op, *args):
         raise RuntimeError(f"未知操作符: {op}, 参数: {args}")
 
     def _handle_register_overflow(self):
-        """处理寄存器溢出 (简单实现，实际需要更完善的策略)"""
-        if not self.reg_map:
-            raise RuntimeError("寄存器严重不足")
-        var, reg = self.reg_map.popitem()
+        """
+        没有空闲的 $t 寄存器时腾出一个，当前四元式已经取到的名字不动：
+        优先把变量写回它在栈帧中的位置；否则把最晚才再用到的临时变量存进溢出单元，再次使用时由 get_regs 装回
+        """
+        candidates = [name for name in self.reg_map if name not in self.pinned]
+        if not candidates:
+            raise RuntimeError("一条四元式用到的寄存器超过 $t 寄存器的个数")
+        for name in candidates:
+            if self.variable(name) is not None:
+                self.free_regs(name, self.reg_map[name])
+                return
+        if not self.spill_free:
+            raise RuntimeError("溢出单元不够：同时占用的寄存器超过了 register_pressure 的估计")
+        var = max(candidates, key=lambda name: self.last_use.get(name, 0))
+        reg = self.reg_map.pop(var)
+        slot = self.spill_free.pop()
+        self.emit("sw", reg, (slot, '$sp'))
+        self.spilled[var] = slot
         self.reg_pool.insert(0, reg)
-        # 这里需要将寄存器的值写回内存，但没有栈帧管理，暂时省略
-        print(f"警告: 寄存器溢出，变量 '{var}' 的值可能丢失。需要实现栈帧管理。")
+        self.diagnostics.report(SEVERITY_NOTE, "register-spill", f"临时变量 '{var}' 溢出到栈帧偏移 {slot} 处",
+                                scope=self.current_proc)
 
 
 if __name__ == '__main__':
-    parser = SNLParser()
-    parse_tree = parser.parse_file("../data/demo.txt")
-    print(parse_tree)
-
-    if parse_tree:
-        print("\n语法分析成功！")
-        semantic_analyzer = SemanticAnalyzer()
-        semantic_analyzer.analyze(parse_tree)
-        print("\n语义分析完成！")
-        mips_gen = MIPSGenerator(semantic_analyzer.quadruples)
-        mips_code = mips_gen.generate()
-        print(mips_code)
+    from session import CompilerSession
+    session = CompilerSession(result_dir="../result")
+    result = session.compile_file("../data/demo.txt")
+    print(result.tree)
+
+    if result.ok:
+        print(result.mips)
     else:
-        print("\n语法分析失败！")
+        for error in result.errors:
+            print(error)
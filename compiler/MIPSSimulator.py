@@ -0,0 +1,277 @@
+import sys
+sys.path.append("../")
+from array import array
+from Instruction import *
+
+REGISTERS = ['$zero', '$at', '$v0', '$v1', '$a0', '$a1', '$a2', '$a3'] + ['$t%d' % i for i in range(8)] + \
+            ['$s%d' % i for i in range(8)] + ['$t8', '$t9', '$k0', '$k1', '$gp', '$sp', '$fp', '$ra']
+REGISTER_NUMBERS = {name: i for i, name in enumerate(REGISTERS)}
+V0, A0, SP, RA = 2, 4, 29, 31
+DISCARD = 32  # 写 $zero 的指令改为写这个多出来的寄存器，$zero 始终为 0
+STACK_TOP = 0x7FFFFFFC  # 栈区最高的字，与 MIPSGenerator 设置的初始 $sp 相同
+STACK_WORDS = 1 << 18   # 栈区的字数（1 MB），栈向低地址增长
+DATA_BASE = 0x10010000  # .data 段的起始地址（与 MARS 相同）
+MAX_STEPS = 10000000    # 默认最多执行的指令条数
+
+# 运行结束的原因
+STATUS_EXIT = "exit"              # syscall 10
+STATUS_END = "end"                # 执行到代码段末尾
+STATUS_STEP_LIMIT = "step-limit"  # 超过 max_steps，可能是死循环
+STATUS_ERROR = "error"            # 访问栈区以外的内存、除以 0、输入不够等
+
+# 预解码后的操作码，大致按执行频率排列
+(LW, SW, ADDI, MOVE, LI, ADD, SUB, BEQZ, J, SLT, SLTI, SLTIU, MUL, SLL, DIV, MFLO, JAL, JR, NOP, SYSCALL) = range(20)
+READ_ONLY_OPS = frozenset((SW, BEQZ, J, JAL, JR, NOP, SYSCALL, DIV))  # 第一个操作数不是被写入的寄存器
+DECODE = {'lw': LW, 'sw': SW, 'addi': ADDI, 'addiu': ADDI, 'move': MOVE, 'li': LI, 'add': ADD, 'addu': ADD,
+          'sub': SUB, 'subu': SUB, 'beqz': BEQZ, 'j': J, 'slt': SLT, 'slti': SLTI, 'sltiu': SLTIU, 'mul': MUL,
+          'sll': SLL, 'div': DIV, 'mflo': MFLO, 'jal': JAL, 'jr': JR, 'nop': NOP, 'syscall': SYSCALL}
+
+def _word(value):
+    """截断为 32 位有符号整数"""
+    return (value + 0x80000000) % 0x100000000 - 0x80000000
+
+class RunResult:
+    """一次运行的结果"""
+    def __init__(self, output, steps, status, error=None, profile=None):
+        self.output = output    # 程序输出的文本
+        self.steps = steps      # 执行的指令条数
+        self.status = status    # STATUS_*
+        self.error = error      # status 为 STATUS_ERROR 时的说明
+        self.profile = profile  # 每种指令执行的条数，只在 run(profile=True) 时记录
+
+    @property
+    def ok(self):
+        return self.status == STATUS_EXIT
+
+    def values(self):
+        """输出中的整数（write 语句每次输出一个整数和一个换行）"""
+        return [int(item) for item in self.output.split()]
+
+    def __repr__(self):
+        return f"RunResult({self.status!r}, steps={self.steps}, output={self.output!r})"
+
+class MIPSSimulator:
+    """
+    MIPSGenerator 生成的 MIPS 子集的模拟器，用来在没有 MARS 的环境中运行目标代码、统计执行的指令条数。
+    program 可以是结构化指令（MIPSGenerator.code）或汇编文本（CompileResult.mips、.mips 文件）。
+    载入时预解码：每条指令变成 (操作码, 操作数...) 元组，寄存器换成编号，标号换成指令下标或数据段地址，
+    add/sub 的立即数形式换成 addi，运行时不再查字典或解析文本。
+    - 寄存器是 32 个整数的列表（另加一个接收写 $zero 的结果）；运算结果截断为 32 位，溢出时回绕而不是像 MARS 的 add 那样产生异常
+    - 内存只有栈区：STACK_TOP 向下 stack_words 个字，放在一个 array 中，lw/sw 必须按字对齐；
+      .data 段的 .asciiz 字符串放在 DATA_BASE 开始的 bytearray 中，只供 syscall 4 读取
+    - syscall 1（输出整数）、4（输出字符串）、5（读整数）、10（退出）
+    - 没有延迟槽，分支后的 nop 也算一条指令，与 MARS 的默认设置相同
+    """
+    def __init__(self, program, stack_words=STACK_WORDS):
+        self.stack_words = stack_words
+        code = parse(program) if isinstance(program, str) else program
+        self.ops = []   # 每条指令的操作码文本，用于 profile
+        self.text = []  # 预解码的指令
+        self.data = bytearray()
+        self._decode(code)
+
+    def _decode(self, code):
+        addresses = {}  # Label -> 指令下标（代码段）或地址（数据段）
+        in_data = False
+        count = 0
+        for ins in code:
+            op = ins.op
+            if op == LABEL:
+                addresses[ins.args[0]] = DATA_BASE + len(self.data) if in_data else count
+            elif op == '.data' or op == '.text':
+                in_data = op == '.data'
+            elif op == '.asciiz':
+                self.data += ins.args[0][1:-1].encode().decode('unicode_escape').encode() + b'\0'
+            elif op[0] != '.':
+                count += 1
+        self.entry = next((index for label, index in addresses.items() if label.name == 'main'), 0)
+        for ins in code:
+            op = ins.op
+            if not is_instruction(ins):
+                continue
+            if op not in DECODE and op != 'la':
+                raise RuntimeError(f"模拟器不支持的指令: {op}")
+            args = []
+            for arg in ins.args:
+                kind = arg.__class__
+                if kind is str:
+                    if arg not in REGISTER_NUMBERS:
+                        raise RuntimeError(f"未知寄存器: {arg}")
+                    args.append(REGISTER_NUMBERS[arg])
+                elif kind is int:
+                    args.append(_word(arg))
+                elif kind is tuple:
+                    args.extend((arg[0], REGISTER_NUMBERS[arg[1]]))
+                else:
+                    if arg not in addresses:
+                        raise RuntimeError(f"未定义的标号: {arg.name}")
+                    args.append(addresses[arg])
+            code_op = LI if op == 'la' else DECODE[op]
+            if (code_op == ADD or code_op == SUB) and ins.args[-1].__class__ is int:
+                # add/sub 寄存器, 寄存器, 立即数
+                if code_op == SUB:
+                    args[-1] = -args[-1]
+                code_op = ADDI
+            if code_op not in READ_ONLY_OPS and args[0] == 0:
+                args[0] = DISCARD
+            self.ops.append(op)
+            self.text.append((code_op, *args))
+
+    def _read(self, address):
+        """syscall 4：数据段中以 0 结尾的字符串"""
+        start = address - DATA_BASE
+        if not 0 <= start < len(self.data):
+            raise RuntimeError(f"syscall 4 的地址不在数据段中: {address:#x}")
+        return self.data[start:self.data.index(0, start)].decode()
+
+    def run(self, stdin=(), max_steps=MAX_STEPS, profile=False):
+        """
+        从 main 开始运行，返回 RunResult。stdin 是 syscall 5 依次读取的整数，可以是整数序列或空白分隔的文本。
+        max_steps 在跳转时检查，所以实际执行的条数最多再多出一段顺序代码的长度。
+        """
+        if isinstance(stdin, str):
+            stdin = stdin.split()
+        inputs = iter([int(value) for value in stdin])
+        text = self.text
+        size = len(text)
+        regs = [0] * (DISCARD + 1)
+        regs[SP] = STACK_TOP
+        limit = self.stack_words
+        memory = array('i', bytes(4 * limit))
+        output = []
+        counts = [0] * size if profile else None
+        lo = 0
+        pc = self.entry
+        steps = 0
+        status = STATUS_END
+        error = None
+        try:
+            while pc < size:
+                ins = text[pc]
+                op = ins[0]
+                if counts is not None:
+                    counts[pc] += 1
+                pc += 1
+                steps += 1
+                if op == LW:
+                    offset = STACK_TOP - ins[2] - regs[ins[3]]
+                    if offset & 3 or not 0 <= offset < limit << 2:
+                        raise RuntimeError(f"lw 的地址不在栈区中或没有对齐: {ins[2] + regs[ins[3]]:#x}")
+                    regs[ins[1]] = memory[offset >> 2]
+                elif op == SW:
+                    offset = STACK_TOP - ins[2] - regs[ins[3]]
+                    if offset & 3 or not 0 <= offset < limit << 2:
+                        raise RuntimeError(f"sw 的地址不在栈区中或没有对齐: {ins[2] + regs[ins[3]]:#x}")
+                    memory[offset >> 2] = regs[ins[1]]
+                elif op == ADDI:
+                    value = regs[ins[2]] + ins[3]
+                    regs[ins[1]] = value if -0x80000000 <= value <= 0x7FFFFFFF else _word(value)
+                elif op == MOVE:
+                    regs[ins[1]] = regs[ins[2]]
+                elif op == LI:
+                    regs[ins[1]] = ins[2]
+                elif op == ADD:
+                    value = regs[ins[2]] + regs[ins[3]]
+                    regs[ins[1]] = value if -0x80000000 <= value <= 0x7FFFFFFF else _word(value)
+                elif op == SUB:
+                    value = regs[ins[2]] - regs[ins[3]]
+                    regs[ins[1]] = value if -0x80000000 <= value <= 0x7FFFFFFF else _word(value)
+                elif op == BEQZ:
+                    if regs[ins[1]] == 0:
+                        pc = ins[2]
+                        if steps > max_steps:
+                            status = STATUS_STEP_LIMIT
+                            break
+                elif op == J:
+                    pc = ins[1]
+                    if steps > max_steps:
+                        status = STATUS_STEP_LIMIT
+                        break
+                elif op == SLT:
+                    regs[ins[1]] = 1 if regs[ins[2]] < regs[ins[3]] else 0
+                elif op == SLTI:
+                    regs[ins[1]] = 1 if regs[ins[2]] < ins[3] else 0
+                elif op == SLTIU:
+                    regs[ins[1]] = 1 if regs[ins[2]] & 0xFFFFFFFF < ins[3] & 0xFFFFFFFF else 0
+                elif op == MUL:
+                    regs[ins[1]] = _word(regs[ins[2]] * regs[ins[3]])
+                elif op == SLL:
+                    regs[ins[1]] = _word(regs[ins[2]] << ins[3])
+                elif op == DIV:
+                    dividend, divisor = regs[ins[1]], regs[ins[2]]
+                    if divisor == 0:
+                        raise RuntimeError("除以 0")
+                    quotient = abs(dividend) // abs(divisor)
+                    lo = _word(quotient if (dividend < 0) == (divisor < 0) else -quotient)  # 向 0 取整
+                elif op == MFLO:
+                    regs[ins[1]] = lo
+                elif op == JAL:
+                    regs[RA] = pc
+                    pc = ins[1]
+                    if steps > max_steps:
+                        status = STATUS_STEP_LIMIT
+                        break
+                elif op == JR:
+                    pc = regs[ins[1]]
+                    if not 0 <= pc <= size:
+                        raise RuntimeError(f"jr 的目标不是代码段中的指令: {pc}")
+                    if steps > max_steps:
+                        status = STATUS_STEP_LIMIT
+                        break
+                elif op == SYSCALL:
+                    service = regs[V0]
+                    if service == 1:
+                        output.append(str(regs[A0]))
+                    elif service == 4:
+                        output.append(self._read(regs[A0]))
+                    elif service == 5:
+                        value = next(inputs, None)
+                        if value is None:
+                            raise RuntimeError("输入不够：syscall 5 没有可读的整数")
+                        regs[V0] = _word(value)
+                    elif service == 10:
+                        status = STATUS_EXIT
+                        break
+                    else:
+                        raise RuntimeError(f"不支持的系统调用: {service}")
+        except RuntimeError as e:
+            status = STATUS_ERROR
+            error = f"{e}（第 {pc - 1} 条指令）"
+        result = RunResult("".join(output), steps, status, error)
+        if profile:
+            result.profile = {}
+            for index, count in enumerate(counts):
+                if count:
+                    result.profile[self.ops[index]] = result.profile.get(self.ops[index], 0) + count
+        return result
+
+def run_program(program, stdin=(), max_steps=MAX_STEPS, profile=False):
+    """载入并运行一段目标代码（结构化指令或汇编文本）"""
+    return MIPSSimulator(program).run(stdin, max_steps, profile)
+
+if __name__ == '__main__':
+    import argparse
+    from session import CompilerSession
+    arg_parser = argparse.ArgumentParser(description="编译 SNL 源程序（或读入 .mips 文件）并在模拟器中运行")
+    arg_parser.add_argument("source", help="SNL 源程序或 .mips 文件")
+    arg_parser.add_argument("-i", "--input", default="", help="read 语句依次读取的整数，空白分隔")
+    arg_parser.add_argument("-O", "--optimize", type=int, default=1, help="是否优化 (0/1)")
+    arg_parser.add_argument("--max-steps", type=int, default=MAX_STEPS, help="最多执行的指令条数")
+    arg_parser.add_argument("--profile", action="store_true", help="按指令统计执行条数")
+    args = arg_parser.parse_args()
+    if args.source.endswith(".mips"):
+        with open(args.source, encoding="utf-8") as f:
+            program = f.read()
+    else:
+        result = CompilerSession(optimize=bool(args.optimize)).compile_file(args.source)
+        if not result.ok:
+            for error in result.errors:
+                print(error)
+            sys.exit(1)
+        program = result.mips
+    run = run_program(program, args.input, args.max_steps, args.profile)
+    print(run.output, end="")
+    print(f"-- {run.status}, 执行 {run.steps} 条指令" + (f": {run.error}" if run.error else ""))
+    if run.profile:
+        for op, count in sorted(run.profile.items(), key=lambda item: -item[1]):
+            print(f"   {op:8s} {count:10d}")
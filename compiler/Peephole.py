@@ -0,0 +1,244 @@
+import sys
+sys.path.append("../")
+from Instruction import *
+
+# 第一个操作数是被写入的寄存器的指令
+DEST_OPS = frozenset(('li', 'la', 'move', 'add', 'addu', 'addi', 'addiu', 'sub', 'subu', 'mul', 'sll',
+                      'slt', 'slti', 'sltiu', 'lw', 'mflo'))
+BRANCH_OPS = frozenset(('beqz', 'j', 'jr'))  # 后端在这些指令之后放一个 nop
+PATTERNS = ('self-move', 'redundant-load', 'store-reload', 'redundant-store', 'dead-load',
+            'redundant-li', 'li-add', 'jump-next', 'nop', 'delay-fill')
+
+def written(op, args):
+    """指令写入的寄存器（没有则为 None）"""
+    if op in DEST_OPS:
+        return args[0]
+    if op == 'syscall':
+        return '$v0'
+    return None
+
+def read(op, args):
+    """指令读取的寄存器（包括内存操作数的基址寄存器）"""
+    if op == 'syscall':
+        return ['$v0', '$a0']
+    regs = []
+    for arg in (args[1:] if op in DEST_OPS else args):
+        kind = arg.__class__
+        if kind is str:
+            regs.append(arg)
+        elif kind is tuple:
+            regs.append(arg[1])
+    return regs
+
+class MIPSPeephole:
+    """
+    MIPSGenerator 生成的结构化指令（Instruction）上的窥孔优化，反复扫描直到没有可以改写的地方：
+    - self-move: move $a, $a
+    - redundant-load / store-reload: lw 的内存单元的值已经在同一个 / 另一个寄存器中（刚 sw 或 lw 过），删去或改为 move
+    - redundant-store: sw 写回的值与内存单元中已有的值相同（刚从这里 lw 出来且寄存器没有变）
+    - dead-load: lw 装入的寄存器紧接着被改写而没有被读取
+    - redundant-li: 寄存器中已经是这个常数（如重复的 li $v0, 1）
+    - li-add: li $r, c 后接 add $r, $a, $r，合并为 addi $r, $a, c
+    - jump-next: 跳转到紧跟其后的标号
+    - nop / delay-fill: 分支之后的 nop。MARS 默认不模拟延迟槽，nop 不起作用，直接删去；
+      delay_slots=True 时按有延迟槽的语义，把分支前一条与分支条件无关的指令移进延迟槽
+    寄存器与内存单元的对应关系只在一段顺序执行的代码内有效，遇到标号、跳转和过程调用全部作废；
+    通过 $sp 以外的寄存器寻址的写入可能是任何单元（引用形参、数组元素），同样作废所有内存单元。
+    stats 记录每种模式删去的指令条数（改写而不删去的记为 0 条，但仍计入 rewrites）。
+    """
+    def __init__(self, code, delay_slots=False):
+        self.code = list(code)
+        self.delay_slots = delay_slots
+        self.stats = dict.fromkeys(PATTERNS, 0)
+        self.rewrites = dict.fromkeys(PATTERNS, 0)
+
+    def _hit(self, pattern, removed=1):
+        self.stats[pattern] += removed
+        self.rewrites[pattern] += 1
+
+    def _forget(self, slots, consts, reg):
+        """寄存器 reg 被改写：与它有关的内存单元对应关系和常数都失效"""
+        consts.pop(reg, None)
+        for slot in [slot for slot, holder in slots.items() if holder == reg or slot[1] == reg]:
+            del slots[slot]
+
+    def _values(self):
+        """顺序代码内跟踪“内存单元 -> 保存其值的寄存器”和“寄存器 -> 常数”，删去多余的 lw/sw/li"""
+        out = []
+        slots = {}   # (偏移, 基址寄存器) -> 寄存器
+        consts = {}
+        for ins in self.code:
+            op = ins.op
+            if not is_instruction(ins):
+                if op == LABEL:
+                    slots.clear()
+                    consts.clear()
+                out.append(ins)
+                continue
+            args = ins.args
+            if op == 'lw':
+                reg, slot = args
+                holder = slots.get(slot)
+                if holder == reg:
+                    self._hit('redundant-load')
+                    continue
+                self._forget(slots, consts, reg)
+                if holder is not None:
+                    self._hit('store-reload', 0)
+                    out.append(Instruction('move', reg, holder))
+                else:
+                    out.append(ins)
+                if slot[1] != reg:
+                    slots[slot] = reg
+                continue
+            if op == 'sw':
+                reg, slot = args
+                if slots.get(slot) == reg:
+                    self._hit('redundant-store')
+                    continue
+                if slot[1] == '$sp':
+                    for other in [other for other in slots if other == slot or other[1] != '$sp']:
+                        del slots[other]
+                else:
+                    slots.clear()
+                slots[slot] = reg
+                out.append(ins)
+                continue
+            if op == 'li' and consts.get(args[0]) == args[1]:
+                self._hit('redundant-li')
+                continue
+            if op == 'jal' or op in BRANCH_OPS:
+                slots.clear()
+                consts.clear()
+                out.append(ins)
+                continue
+            if op == 'syscall' and consts.get('$v0') not in (None, 5):
+                # 读整数以外的系统调用不改变 $v0
+                out.append(ins)
+                continue
+            reg = written(op, args)
+            if reg is not None:
+                if reg == '$sp':
+                    slots.clear()
+                self._forget(slots, consts, reg)
+                if op == 'li':
+                    consts[reg] = args[1]
+            out.append(ins)
+        self.code = out
+
+    def _local(self):
+        """相邻两条指令的模式：self-move、dead-load、li-add"""
+        out = []
+        code = self.code
+        n = len(code)
+        i = 0
+        while i < n:
+            ins = code[i]
+            if not is_instruction(ins):
+                out.append(ins)
+                i += 1
+                continue
+            op, args = ins.op, ins.args
+            if op == 'move' and args[0] == args[1]:
+                self._hit('self-move')
+                i += 1
+                continue
+            following = code[i + 1] if i + 1 < n else None
+            if following is not None and is_instruction(following):
+                next_op, next_args = following.op, following.args
+                if op == 'lw' and written(next_op, next_args) == args[0] and args[0] not in read(next_op, next_args) \
+                        and next_op != 'syscall':
+                    self._hit('dead-load')
+                    i += 1
+                    continue
+                if op == 'li' and next_op == 'add' and next_args[0] == args[0] and args[0] != '$sp' \
+                        and -32768 <= args[1] <= 32767:
+                    reg = args[0]
+                    others = [arg for arg in next_args[1:] if arg != reg]
+                    if len(others) == 1:
+                        self._hit('li-add')
+                        out.append(Instruction('addi', reg, others[0], args[1]))
+                        i += 2
+                        continue
+            out.append(ins)
+            i += 1
+        self.code = out
+
+    def _jumps(self):
+        """跳转到紧跟其后的标号，以及分支之后的 nop"""
+        out = []
+        code = self.code
+        n = len(code)
+        i = 0
+        while i < n:
+            ins = code[i]
+            op = ins.op
+            if op == 'j' or op == 'beqz':
+                target = ins.args[-1]
+                j = i + 1
+                if j < n and code[j].op == 'nop':
+                    j += 1
+                labels = set()
+                while j < n and code[j].op == LABEL:
+                    labels.add(code[j].args[0])
+                    j += 1
+                if target in labels:
+                    count = 2 if i + 1 < n and code[i + 1].op == 'nop' else 1
+                    self._hit('jump-next', count)
+                    i += count
+                    continue
+            if op == 'nop' and out and out[-1].op in BRANCH_OPS:
+                if not self.delay_slots:
+                    self._hit('nop')
+                    i += 1
+                    continue
+                if self._fill(out, out[-1]):
+                    self._hit('delay-fill')
+                    i += 1
+                    continue
+            out.append(ins)
+            i += 1
+        self.code = out
+
+    def _fill(self, out, branch):
+        """有延迟槽时把分支前一条指令移到分支之后，代替 nop"""
+        if len(out) < 2:
+            return False
+        candidate = out[-2]
+        if not is_instruction(candidate) or candidate.op in BRANCH_OPS or candidate.op in ('jal', 'syscall', 'nop'):
+            return False
+        if len(out) >= 3 and out[-3].op in BRANCH_OPS | {'jal'}:
+            return False  # 已经在另一个延迟槽里
+        if written(candidate.op, candidate.args) in read(branch.op, branch.args):
+            return False
+        out[-2], out[-1] = out[-1], out[-2]
+        return True
+
+    def optimize(self, code=None):
+        """优化到没有可以改写的地方；给出 code 时改为优化这一段代码（如一个过程），统计在各段之间累加"""
+        if code is not None:
+            self.code = list(code)
+        while True:
+            before = len(self.code), sum(self.rewrites.values())
+            self._values()
+            self._local()
+            self._jumps()
+            if (len(self.code), sum(self.rewrites.values())) == before:
+                return self.code
+
+    def report(self):
+        """每种模式删去的指令条数"""
+        lines = [f"{pattern:16s} {self.stats[pattern]:6d} 条 ({self.rewrites[pattern]} 处)"
+                 for pattern in PATTERNS if self.rewrites[pattern]]
+        lines.append(f"{'合计':16s} {sum(self.stats.values()):6d} 条")
+        return "\n".join(lines)
+
+if __name__ == '__main__':
+    from session import CompilerSession
+    from MIPSGenerator import MIPSGenerator
+    result = CompilerSession(optimize=False).compile_file("../data/7-bubbleSort.txt")
+    generator = MIPSGenerator(result.optimized_quads)
+    generator.generate(None)
+    peephole = MIPSPeephole(generator.code)
+    peephole.optimize()
+    print(peephole.report())
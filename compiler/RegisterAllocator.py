@@ -0,0 +1,165 @@
+import sys
+sys.path.append("../")
+from Quad import *
+from cfg import ControlFlowGraph, register_pressure
+
+SAVED_REGISTERS = ['$s%d' % i for i in range(8)]  # 被调用者保存的寄存器，过程调用前后保持不变
+REGISTER_COUNT = 10  # 后端可分配的 $t 寄存器个数
+LOOP_WEIGHT = 10     # 循环中的一次访问按循环外的 LOOP_WEIGHT 次计算，嵌套时相乘
+SAVE_COST = 2        # 过程中用到一个 $s 寄存器，入口保存、出口恢复各需一次内存访问
+
+class Allocation:
+    """
+    一个过程（或主程序）的分配结果：
+    - homes: 常驻 $s 寄存器的变量 -> 寄存器
+    - saved: 过程入口要保存、出口要恢复的 $s 寄存器（主程序没有调用者，不需要保存）
+    - spill_slots: 栈帧中为溢出的临时变量预留的单元个数
+    """
+    __slots__ = ('name', 'homes', 'saved', 'spill_slots')
+
+    def __init__(self, name):
+        self.name = name
+        self.homes = {}
+        self.saved = []
+        self.spill_slots = 0
+
+    def __repr__(self):
+        return f"Allocation({self.name!r}, {self.homes}, spill_slots={self.spill_slots})"
+
+class RegisterAllocator:
+    """
+    变量的线性扫描寄存器分配。
+    每个过程中的标量局部变量和值形参有一个活跃区间 [第一次出现, 最后一次出现]，
+    出现在循环中时区间扩展到整个（最外层）循环，因为下一轮还要用到它。
+    区间按起点排序后依次扫描：有空闲的 $s 寄存器就分配；没有时与已分配的区间比较权重
+    （每次访问按所在循环的层数乘以 LOOP_WEIGHT），权重最低的留在内存里。
+    区间不相交的变量可以共用同一个寄存器。$s 寄存器由被调用者保存，过程调用之后值不变，
+    所以循环里的变量在整个循环期间都不必再 lw/sw。
+    以下变量不分配：数组和记录；引用形参（其中是地址）；被嵌套过程访问的变量和作为引用实参的变量，
+    它们要通过栈帧中的地址被别处读写。在过程中（主程序除外）权重不超过 SAVE_COST 的变量也不分配。
+    $t 寄存器仍由后端按四元式分配，这里按 register_pressure 为每个过程预留溢出单元。register_pressure
+    计入活跃的临时变量和当前四元式读写的变量；后端在每条四元式之后释放变量的寄存器（_release_variables）、
+    在过程边界归还全部 $t 寄存器，所以同时占用的寄存器不会超过它，超出 REGISTER_COUNT 的部分都有溢出单元。
+    """
+    def __init__(self, quads, registers=SAVED_REGISTERS):
+        self.quads = quads
+        self.registers = list(registers)
+        self.procedures = {}  # PROCEDURE 四元式下标（主程序为 0）-> Allocation
+        self.homed = 0
+
+    def _loops(self):
+        """每条四元式所在的循环层数，以及最外层循环的区间 (WHILE 下标, ENDWHILE 下标)"""
+        depth = []
+        outermost = []
+        spans = {}
+        stack = []
+        for i, (op, _, _, _) in enumerate(self.quads):
+            if op == 'WHILE':
+                stack.append(i)
+            depth.append(len(stack))
+            outermost.append(stack[0] if stack else -1)
+            if op == 'ENDWHILE':
+                start = stack.pop()
+                if not stack:
+                    spans[start] = i
+        return depth, [(start, spans[start]) if start >= 0 else None for start in outermost]
+
+    def _intervals(self, cfg):
+        """每个过程中可以分配的变量的 [起点, 终点, 权重]"""
+        quads = self.quads
+        declared = {proc: {} for proc in cfg.procedures}  # 过程 -> {名字: 是否可以放进寄存器}
+        intervals = {}
+        for i, (op, arg1, length, res) in enumerate(quads):
+            if op == 'DECLARE' or op == 'get':
+                proc = cfg.procedure_of(i)
+                declared[proc][res] = length == 1 and not (op == 'get' and arg1)
+                if op == 'get' and not arg1 and length == 1:
+                    intervals[(proc, res)] = [proc.start, proc.start, 0]  # 值形参在入口处已有值
+        depth, loops = self._loops()
+        escaped = set()
+        for i, quad in enumerate(quads):
+            uses, target = quad_names(*quad)
+            if target is not None:
+                uses = uses + [target]
+            if not uses:
+                continue
+            proc = cfg.procedure_of(i)
+            for name in uses:
+                owner = proc
+                while owner is not None and name not in declared[owner]:
+                    owner = owner.parent
+                if owner is None or not declared[owner][name]:
+                    continue  # 临时变量、数组、记录和引用形参
+                if owner is not proc or quad[0] == 'param' and quad[3]:
+                    escaped.add((owner, name))
+                    continue
+                start = end = i
+                if loops[i] is not None:
+                    start, end = loops[i]
+                interval = intervals.get((proc, name))
+                if interval is None:
+                    intervals[(proc, name)] = [start, end, LOOP_WEIGHT ** depth[i]]
+                    continue
+                interval[0] = min(interval[0], start)
+                interval[1] = max(interval[1], end)
+                interval[2] += LOOP_WEIGHT ** depth[i]
+        for key in escaped:
+            intervals.pop(key, None)
+        return intervals
+
+    def _scan(self, allocation, candidates):
+        """candidates: [(起点, 终点, 权重, 名字)]，按起点做线性扫描"""
+        homes = allocation.homes
+        free = list(self.registers)
+        active = []  # [(终点, 权重, 名字)]
+        for start, end, weight, name in sorted(candidates):
+            for item in [item for item in active if item[0] < start]:
+                active.remove(item)
+                free.append(homes[item[2]])
+            if free:
+                free.sort()
+                homes[name] = free.pop(0)
+                active.append((end, weight, name))
+                continue
+            victim = min(active, key=lambda item: item[1])
+            if victim[1] < weight:
+                homes[name] = homes.pop(victim[2])
+                active.remove(victim)
+                active.append((end, weight, name))
+
+    def allocate(self):
+        cfg = ControlFlowGraph(self.quads)
+        candidates = {proc: [] for proc in cfg.procedures}
+        for (proc, name), (start, end, weight) in self._intervals(cfg).items():
+            if proc.parent is None or weight > SAVE_COST:
+                candidates[proc].append((start, end, weight, name))
+        pressure = {}
+        for i, count in enumerate(register_pressure(self.quads)):
+            proc = cfg.procedure_of(i)
+            if count > pressure.get(proc, 0):
+                pressure[proc] = count
+        for proc in cfg.procedures:
+            allocation = Allocation(proc.name)
+            if self.registers:
+                self._scan(allocation, candidates[proc])
+            if proc.parent is not None:
+                allocation.saved = sorted(set(allocation.homes.values()))
+            allocation.spill_slots = max(0, pressure.get(proc, 0) - REGISTER_COUNT)
+            self.homed += len(allocation.homes)
+            self.procedures[proc.start] = allocation
+        return self.procedures
+
+    def report(self):
+        """每个过程中分配到 $s 寄存器的变量"""
+        lines = []
+        for allocation in self.procedures.values():
+            homes = ", ".join(f"{name} -> {reg}" for name, reg in allocation.homes.items()) or "无"
+            lines.append(f"{allocation.name}: {homes}")
+        return "\n".join(lines)
+
+if __name__ == '__main__':
+    from session import CompilerSession
+    result = CompilerSession().compile_file("../data/7-bubbleSort.txt")
+    allocator = RegisterAllocator(result.optimized_quads)
+    allocator.allocate()
+    print(allocator.report())
@@ -0,0 +1,223 @@
+import sys
+sys.path.append("../")
+from lexer import *
+from Quad import *
+from prettytable import PrettyTable
+from cfg import ControlFlowGraph, register_pressure
+from ConstantFolder import fits_immediate
+
+COMMUTATIVE_OPS = ('+', '*', '=')
+VALUE_OPS = frozenset(('+', '-', '*', '/', '<', '=', ':=', '[]', 'load'))
+AVAILABLE_LIMIT = 32  # 每个程序点最多记住的可用表达式个数，超出时丢弃最早的
+REGISTER_COUNT = 10   # 后端可分配的 $t 寄存器个数
+
+class ValueNumbering:
+    """
+    局部与全局值编号（公共子表达式删除）。
+    在每个过程的控制流图上按逆后序处理基本块，维护“表达式 -> 保存其值的临时变量”的可用表：
+    - 局部：基本块内重复的运算、常量、数组地址 ([]) 和数组元素的读取 (load) 直接使用之前的临时变量
+    - 全局：基本块入口的可用表是所有前驱出口可用表的交集（保存值的临时变量也要相同）；
+      有回边的前驱（循环头）尚未处理，这时入口可用表为空，循环外的值留给循环优化处理
+    - x+c、x-c 以及它们的组合化为 (x, 偏移) 的线性形式，(k+1)-1 与 k 的副本是同一个值
+    表达式中出现的变量被赋值时相关表达式失效；对引用形参赋值时它可能是任何变量的别名，所有含变量的表达式失效；
+    数组元素的写入 (:=:) 使所有 load 失效；过程调用使全部失效（被调用者会改写内存和 $t 寄存器）。
+    临时变量只有一次定义，所以用临时变量表示的表达式不会因为赋值而失效。
+    load 原来把结果写回地址所在的临时变量，这里为结果起一个新名字，使地址也能被重复使用。
+    复用会让临时变量占用寄存器的时间变长，某个过程中同时占用的寄存器超过 REGISTER_COUNT 时，
+    该过程退回只做局部值编号，仍然超出则保持不变。
+    """
+    def __init__(self, quad_list):
+        self.quad_list = list(quad_list)
+        self.optimized_quads = QuadBuffer()
+        self.reused = 0
+
+    def _classify(self):
+        self.variables = set()
+        self.ref_params = set()
+        for op, arg1, _, res in self.quad_list:
+            if op == 'DECLARE' or op == 'get':
+                self.variables.add(res)
+                if op == 'get' and arg1:
+                    self.ref_params.add(res)
+        self.temps = fresh_temps(self.quad_list)
+
+    def _is_temp(self, name):
+        return name.__class__ is str and name not in self.variables
+
+    def _kill(self, available, forms, var):
+        """变量 var 被赋值：删除与它有关的表达式和线性形式"""
+        if var in self.ref_params:
+            names = self.variables
+        else:
+            names = {var} | self.ref_params
+        for key in [key for key in available if any(part in names for part in key[1:] if part.__class__ is str)]:
+            del available[key]
+        for temp in [temp for temp, (base, _) in forms.items() if base in names]:
+            del forms[temp]
+
+    def _remember(self, available, key, holder):
+        available[key] = holder
+        if len(available) > AVAILABLE_LIMIT:
+            del available[next(iter(available))]
+
+    def _linear(self, forms, op, arg1, arg2):
+        """x+c / x-c / x 的线性形式 (基, 偏移)，不是线性形式时返回 None"""
+        if op == ':=':
+            if arg1.__class__ is not str:
+                return None
+            offset = 0
+        elif (op == '+' or op == '-') and arg2.__class__ is int and arg1.__class__ is str:
+            offset = arg2 if op == '+' else -arg2
+        else:
+            return None
+        base, base_offset = forms.get(arg1, (arg1, 0))
+        return base, base_offset + offset
+
+    def _linear_quad(self, base, offset, res):
+        """按线性形式重新生成四元式，偏移超出立即数范围时返回 None"""
+        if offset == 0:
+            return (':=', base, None, res)
+        if offset > 0 and fits_immediate('+', offset):
+            return ('+', base, offset, res)
+        if offset < 0 and fits_immediate('-', -offset):
+            return ('-', base, -offset, res)
+        return None
+
+    def _block(self, block, available, forms, out):
+        """处理一个基本块，改写结果放进 out[下标]；返回出口的可用表"""
+        rename = self.rename
+        for i in block.range:
+            op, arg1, arg2, res = self.quad_list[i]
+            arg1 = rename.get(arg1, arg1) if arg1.__class__ is str else arg1
+            arg2 = rename.get(arg2, arg2) if arg2.__class__ is str else arg2
+            if op == ':=:' or op == 'THEN' or op == 'DO' or op == 'OUT' or op == 'RETURN' or op == 'param':
+                res = rename.get(res, res) if op == ':=:' else res
+                out[i] = ((op, arg1, arg2, res),)
+                if op == ':=:':
+                    for key in [key for key in available if key[0] == 'load']:
+                        del available[key]
+                continue
+            if op == 'call':
+                available.clear()
+                forms.clear()
+                out[i] = ((op, arg1, arg2, res),)
+                continue
+            if op == 'IN':
+                self._kill(available, forms, arg1)
+                out[i] = ((op, arg1, arg2, res),)
+                continue
+            if op not in VALUE_OPS:
+                out[i] = ((op, arg1, arg2, res),)
+                continue
+            if not self._is_temp(res):
+                # 给变量赋值
+                out[i] = ((op, arg1, arg2, res),)
+                self._kill(available, forms, res)
+                continue
+            quad = (op, arg1, arg2, res)
+            linear = self._linear(forms, op, arg1, arg2)
+            if linear is not None:
+                key = ('lin',) + linear
+                if linear[0] != arg1:
+                    quad = self._linear_quad(linear[0], linear[1], res) or quad
+            elif op == ':=':
+                key = ('const', arg1)
+            elif op in COMMUTATIVE_OPS and arg2.__class__ is str and arg2 < arg1:
+                key = (op, arg2, arg1)
+            elif op == 'load':
+                key = (op, arg1)
+            else:
+                key = (op, arg1, arg2)
+            holder = available.get(key)
+            if holder is not None:
+                rename[res] = holder
+                self.reused += 1
+                out[i] = ()
+                continue
+            if op == 'load' and res == self.quad_list[i][1]:
+                # 结果不再覆盖地址所在的临时变量
+                rename[res] = res = next(self.temps)
+                quad = (op, arg1, arg2, res)
+            out[i] = (quad,)
+            self._remember(available, key, res)
+            if linear is not None and self._is_temp(res):
+                forms[res] = linear
+        return available, forms
+
+    def _number(self, cfg, proc, out, global_=True):
+        self.rename = {}  # 被删除的定义的结果 -> 保存同一个值的临时变量；临时变量不会跨过程
+        states = {}
+        done = set()
+        for block in proc.rpo:
+            available, forms = {}, {}
+            preds = block.preds
+            if global_ and preds and all(pred.index in done for pred in preds):
+                available, forms = dict(states[preds[0].index][0]), dict(states[preds[0].index][1])
+                for pred in preds[1:]:
+                    pred_available, pred_forms = states[pred.index]
+                    for key in [key for key, holder in available.items() if pred_available.get(key) != holder]:
+                        del available[key]
+                    for temp in [temp for temp, form in forms.items() if pred_forms.get(temp) != form]:
+                        del forms[temp]
+            states[block.index] = self._block(block, available, forms, out)
+            done.add(block.index)
+        reachable = {block.index for block in proc.rpo}
+        for block in proc.blocks:
+            if block.index not in reachable:
+                self._block(block, {}, {}, out)
+
+    def _pressure(self, cfg, out):
+        """改写后每个过程中同时占用的寄存器数的最大值"""
+        quads = []
+        origin = []
+        for i, rows in enumerate(out):
+            for quad in rows:
+                quads.append(quad)
+                origin.append(i)
+        worst = {}
+        for n, count in enumerate(register_pressure(quads)):
+            proc = cfg.procedure_of(origin[n])
+            if count > worst.get(proc, 0):
+                worst[proc] = count
+        return worst
+
+    def eliminate(self, output_file="../result/中间代码优化.txt"):
+        cfg = ControlFlowGraph(self.quad_list)
+        self._classify()
+        out = [(quad,) for quad in self.quad_list]
+        for proc in cfg.procedures:
+            self._number(cfg, proc, out)
+        worst = self._pressure(cfg, out)
+        for proc in cfg.procedures:
+            if worst.get(proc, 0) <= REGISTER_COUNT:
+                continue
+            # 临时变量都在过程内部，重新处理这个过程不影响其他过程的改名
+            self._number(cfg, proc, out, global_=False)
+            if self._pressure(cfg, out).get(proc, 0) > REGISTER_COUNT:
+                for block in proc.blocks:
+                    for i in block.range:
+                        out[i] = (self.quad_list[i],)
+        emit = self.optimized_quads.append
+        for rows in out:
+            for quad in rows:
+                emit(*quad)
+        if output_file:
+            table = PrettyTable(field_names=["operator", "exp1", "exp2", "result"])
+            for row in self.optimized_quads:
+                table.add_row(list(row))
+            with open(output_file, "w", encoding="utf-8") as w:
+                w.write(table.get_string())
+        return self.optimized_quads
+
+if __name__ == '__main__':
+    from session import CompilerSession
+    session = CompilerSession()
+    result = session.compile_file("../data/7-bubbleSort.txt")
+    if result.ok:
+        print(len(result.quadruples))
+        print(len(result.optimized_quads))
+        for i in result.optimized_quads:
+            print(i)
+    else:
+        for error in result.errors:
+            print(error)
@@ -0,0 +1,127 @@
+import sys
+sys.path.append("../")
+import os
+import glob
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from lexer import DIAG_NONE
+from session import CompilerSession
+from cache import CompileCache
+
+SOURCE_SUFFIXES = ('.txt', '.snl')
+
+_session = None  # 每个工作进程各自持有一个已经构建好分析表的编译会话
+_check_only = False
+
+
+def collect_sources(patterns):
+    """把目录或通配符展开成 .txt/.snl 源文件列表（保持顺序，去重）"""
+    sources = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            names = sorted(os.listdir(pattern))
+            matches = [os.path.join(pattern, name) for name in names]
+        else:
+            matches = sorted(glob.glob(pattern))
+        for path in matches:
+            if os.path.isfile(path) and path.endswith(SOURCE_SUFFIXES) and path not in sources:
+                sources.append(path)
+    return sources
+
+
+def plan_outputs(sources, out_root):
+    """每个源文件一个独立的输出目录 out_root/<文件名>/，重名时追加序号"""
+    jobs = []
+    used = set()
+    for src_file in sources:
+        stem = os.path.splitext(os.path.basename(src_file))[0]
+        name, n = stem, 1
+        while name in used:
+            n += 1
+            name = f"{stem}_{n}"
+        used.add(name)
+        jobs.append((src_file, os.path.join(out_root, name)))
+    return jobs
+
+
+def _init_worker(diagnostics, cache_dir=None, cache_bytes=None, check_only=False):
+    global _session, _check_only
+    cache = CompileCache(cache_dir, cache_bytes) if cache_dir else None
+    _session = CompilerSession(diagnostics, cache=cache)
+    _check_only = check_only
+
+
+def _compile_one(job):
+    src_file, out_dir = job
+    start = time.perf_counter()
+    with open(src_file, "r", encoding="utf-8") as f:
+        source = f.read()
+    os.makedirs(out_dir, exist_ok=True)
+    cached = False
+    try:
+        if _check_only:
+            result = _session.check(source)
+        else:
+            result = _session.compile(source, out_dir)
+        errors = result.errors
+        cached = result.cached
+    except Exception as e:  # 单个文件的内部错误不应中断整个批处理
+        errors = [f"{type(e).__name__}: {e}"]
+    return src_file, not errors, len(source.encode("utf-8")), source.count("\n") + 1, time.perf_counter() - start, errors, cached
+
+
+def compile_batch(sources, out_root, workers=None, diagnostics=DIAG_NONE, cache_dir=None, cache_bytes=64 * 1024 * 1024,
+                  check_only=False):
+    """用进程池编译一批源文件，按输入顺序返回每个文件的结果。check_only 时只做语法和语义检查"""
+    jobs = plan_outputs(sources, out_root)
+    init_args = (diagnostics, cache_dir, cache_bytes, check_only)
+    if workers == 1:
+        _init_worker(*init_args)
+        return [_compile_one(job) for job in jobs]
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(jobs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=init_args) as pool:
+        return list(pool.map(_compile_one, jobs, chunksize=chunksize))
+
+
+def print_summary(results, elapsed, out=sys.stdout):
+    ok = sum(1 for r in results if r[1])
+    total_bytes = sum(r[2] for r in results)
+    total_lines = sum(r[3] for r in results)
+    cpu_time = sum(r[4] for r in results)
+    hits = sum(1 for r in results if r[6])
+    print(f"编译文件: {len(results)}  成功: {ok}  失败: {len(results) - ok}  缓存命中: {hits}", file=out)
+    print(f"源代码: {total_lines} 行, {total_bytes / 1024:.1f} KB", file=out)
+    if elapsed > 0:
+        print(f"耗时: {elapsed:.3f} s (各文件累计 {cpu_time:.3f} s)  吞吐: {len(results) / elapsed:.1f} 文件/s, "
+              f"{total_lines / elapsed:.0f} 行/s, {total_bytes / 1024 / elapsed:.1f} KB/s", file=out)
+    for src_file, success, _, _, _, errors, _ in results:
+        if not success:
+            print(f"  失败 {src_file}: {errors[0] if errors else ''}", file=out)
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="并行批量编译 SNL 源程序")
+    arg_parser.add_argument("inputs", nargs="+", help="源文件目录或通配符，如 ../data 或 '../data/*.txt'")
+    arg_parser.add_argument("-o", "--out", default="../result/batch", help="输出根目录，每个源文件一个子目录")
+    arg_parser.add_argument("-j", "--jobs", type=int, default=None, help="工作进程数，默认为 CPU 核数")
+    arg_parser.add_argument("-d", "--diagnostics", type=int, default=DIAG_NONE, help="诊断输出级别 (0/1/2)")
+    arg_parser.add_argument("--cache", default=None, help="编译缓存目录，不指定则不使用缓存")
+    arg_parser.add_argument("--cache-size", type=int, default=64, help="编译缓存大小上限 (MB)")
+    arg_parser.add_argument("--check", action="store_true", help="只做语法和语义检查，不生成中间代码和目标代码")
+    args = arg_parser.parse_args(argv)
+
+    sources = collect_sources(args.inputs)
+    if not sources:
+        print("没有找到源文件")
+        return 1
+    start = time.perf_counter()
+    results = compile_batch(sources, args.out, args.jobs, args.diagnostics, args.cache, args.cache_size * 1024 * 1024,
+                            args.check)
+    print_summary(results, time.perf_counter() - start)
+    return 0 if all(r[1] for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
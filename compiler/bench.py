@@ -0,0 +1,342 @@
+import sys
+sys.path.append("../")
+import io
+import os
+import time
+import timeit
+import glob
+import contextlib
+import tracemalloc
+from Quad import *
+from semantic import *
+
+
+def make_program(statements=1000, array_size=20):
+    """生成一个包含 statements 条语句（赋值、数组访问、循环、条件）的 SNL 程序，用于性能测量"""
+    body = []
+    for n in range(statements // 4):
+        body.append(f"x := x + {n % 7 + 1}")
+        body.append(f"a[{n % array_size + 1}] := x * 2")
+        body.append("while i < 3 do i := i + 1; y := a[i] endwh")
+        body.append("if x < y then x := x - 1 else y := y - 1 fi")
+    lines = [
+        "program bench",
+        f"var integer x, y, i; array [1..{array_size}] of integer a;",
+        "begin",
+        "  x := 0; y := 0; i := 1;",
+        "  " + ";\n  ".join(body),
+        "end.",
+    ]
+    return "\n".join(lines)
+
+
+def make_nested_program(depth=30, variables=50, statements=400):
+    """生成 depth 层嵌套过程、每层 variables 个变量的程序，最内层过程体反复引用最外层的变量和类型"""
+    lines = ["program nested", "type t0 = integer;",
+             "var " + " ".join(f"t0 g{i};" for i in range(variables))]
+    for level in range(1, depth + 1):
+        lines.append(f"procedure p{level}(integer a{level});")
+        lines.append("var " + " ".join(f"t0 v{level}_{i};" for i in range(variables)))
+    body = [f"g{n % variables} := g{(n + 1) % variables} + v{depth}_{n % variables}" for n in range(statements)]
+    lines.append("begin\n  " + ";\n  ".join(body) + "\nend")
+    for level in range(depth - 1, 0, -1):
+        lines.append(f"begin p{level + 1}({level}) end")
+    lines.append("begin p1(0) end.")
+    return "\n".join(lines)
+
+
+def make_procedures_program(procedures=300, statements=40):
+    """生成 procedures 个并列过程、每个过程体 statements 条语句的程序，主程序依次调用它们"""
+    lines = ["program procs", "var integer g;"]
+    for p in range(procedures):
+        body = [f"x := x + g * {n % 7 + 2}" if n % 2 else f"g := x - {n}" for n in range(statements)]
+        lines.append(f"procedure p{p}(integer x);")
+        lines.append("begin\n  " + ";\n  ".join(body) + "\nend")
+    lines.append("begin\n  g := 1;\n  " + ";\n  ".join(f"p{p}({p})" for p in range(procedures)) + "\nend.")
+    return "\n".join(lines)
+
+
+def quiet():
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+def generate_quads(statements):
+    from session import CompilerSession
+    with quiet():
+        session = CompilerSession(optimize=False)
+        result = session.compile(make_program(statements))
+    return result.quadruples
+
+
+class _DictQuadruple:
+    """原来的四元式表示：普通类，每个实例带一个 __dict__"""
+    def __init__(self, operator, operand1, operand2, result):
+        self.operator = operator
+        self.operand1 = operand1
+        self.operand2 = operand2
+        self.result = result
+
+
+def _measure(build):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    obj = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return obj, after - before
+
+
+def quad_memory(statements=200, copies=100):
+    """比较三种四元式表示的每条四元式内存占用（字节）"""
+    rows = list(generate_quads(statements)) * copies
+    n = len(rows)
+    report = {}
+    for name, build in (
+        ("dict Quadruple", lambda: [_DictQuadruple(*row) for row in rows]),
+        ("slotted Quadruple", lambda: [Quadruple(*row) for row in rows]),
+        ("QuadBuffer", lambda: QuadBuffer(rows)),
+    ):
+        _, size = _measure(build)
+        report[name] = size / n
+    return n, report
+
+
+def analyze_time(source, repeat=20, emit=True):
+    """语义分析的最短耗时（秒）。emit 为 False 时只做检查，不生成四元式"""
+    parser = SNLParser(warm_start=True)
+    tree = parser.parse(source)
+    best = float("inf")
+    with quiet():
+        for _ in range(repeat):
+            start = time.perf_counter()
+            SemanticAnalyzer(QuadEmitter() if emit else None).analyze(tree, None)
+            best = min(best, time.perf_counter() - start)
+    return best
+
+
+def lookup_cost(depth, variables=50, number=100000):
+    """depth 层嵌套作用域、每层 variables 个名字时，查找最外层名字一次的耗时（秒）"""
+    table = SymbolTable("global")
+    for level in range(depth + 1):
+        if level:
+            table.enter(f"p{level}")
+        for i in range(variables):
+            table.add_symbol(f"v{level}_{i}", "integer")
+    return min(timeit.repeat(lambda: table.lookup("v0_0"), number=number, repeat=5)) / number
+
+
+def check_cost(pattern="../data/*.txt", repeat=20):
+    """对 pattern 匹配的每个程序，比较只检查与完整编译（到 MIPS 文本为止）的最短耗时（秒）"""
+    from session import CompilerSession
+    session = CompilerSession(optimize=True)
+    report = []
+    with quiet():
+        for path in sorted(glob.glob(pattern)):
+            with open(path, "r", encoding="utf-8") as f:
+                source = f.read()
+            if not session.compile(source).ok:
+                continue
+            check = min(timeit.repeat(lambda: session.check(source), number=1, repeat=repeat))
+            full = min(timeit.repeat(lambda: session.compile(source), number=1, repeat=repeat))
+            report.append((os.path.basename(path), check, full))
+    return report
+
+
+def verbosity_cost(source=None, repeat=10):
+    """完整编译一个程序的最短耗时（秒）：默认静默 vs 打印诊断和全部符号表（输出到 os.devnull）"""
+    from session import CompilerSession
+    source = source or make_nested_program(depth=30, variables=200)
+    report = {}
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for verbosity in (VERBOSE_SILENT, VERBOSE_SYMBOLS):
+            session = CompilerSession(verbosity=verbosity)
+            report[verbosity] = min(timeit.repeat(lambda: session.compile(source), number=1, repeat=repeat))
+    return report
+
+
+def cfg_cost(sizes=(2000, 4000, 8000, 16000), repeat=3):
+    """对不同规模的程序，建立控制流图（基本块 + 支配树）的最短耗时：[(四元式条数, 基本块数, 秒)]"""
+    from session import CompilerSession
+    from cfg import ControlFlowGraph
+    session = CompilerSession(optimize=False)
+    report = []
+    for statements in sizes:
+        quads = session.compile(make_program(statements)).quadruples
+        seconds = min(timeit.repeat(lambda: ControlFlowGraph(quads), number=1, repeat=repeat))
+        report.append((len(quads), len(ControlFlowGraph(quads).blocks), seconds))
+    return report
+
+
+# data/ 中有 read 语句的程序在模拟器中运行时的输入
+DATA_INPUTS = {"2-record.txt": "3 4", "3-parallel.txt": "5 15 7", "4-interact.txt": "5",
+               "7-bubbleSort.txt": "5 3 1 4 5 2", "8-factorial.txt": "5", "demo.txt": "5 3 1 4 5 2"}
+
+
+def execution_report(pattern="../data/*.txt", inputs=DATA_INPUTS):
+    """
+    data/ 中每个程序的目标代码在 MIPSSimulator 中执行的指令条数：
+    {程序: (不优化的条数, 优化后的条数, 两者输出是否相同且都正常退出)}
+    """
+    from session import CompilerSession
+    from MIPSSimulator import run_program
+    sessions = (CompilerSession(optimize=False), CompilerSession(optimize=True))
+    report = {}
+    for path in sorted(glob.glob(pattern)):
+        name = os.path.basename(path)
+        with open(path, encoding="utf-8") as f:
+            source = f.read()
+        runs = []
+        for session in sessions:
+            result = session.compile(source)
+            if not result.ok:
+                break
+            runs.append(run_program(result.mips, inputs.get(name, "")))
+        if len(runs) == 2:
+            report[name] = (runs[0].steps, runs[1].steps,
+                            runs[0].ok and runs[1].ok and runs[0].output == runs[1].output)
+    return report
+
+
+def emission_cost(source=None, repeat=3):
+    """
+    生成目标代码并写入文件（os.devnull）的最短耗时、内存峰值和 write 调用次数：
+    {"text": 返回完整文本, "stream": 逐个过程流式写入 sink}，值为 (秒, 字节, 次数)
+    """
+    from session import CompilerSession
+    from MIPSGenerator import MIPSGenerator
+    source = source or make_procedures_program()
+    quads = CompilerSession().compile(source).optimized_quads
+    report = {}
+    for mode in ("text", "stream"):
+        best = float("inf")
+        for _ in range(repeat):
+            generator = MIPSGenerator(quads, peephole=True, allocate=True)
+            with open(os.devnull, "w") as devnull:
+                start = time.perf_counter()
+                if mode == "text":
+                    generator.generate(os.devnull)
+                else:
+                    generator.generate(None, devnull)
+                best = min(best, time.perf_counter() - start)
+        generator = MIPSGenerator(quads, peephole=True, allocate=True)
+        with open(os.devnull, "w") as devnull:
+            tracemalloc.start()
+            if mode == "text":
+                generator.generate(os.devnull)
+            else:
+                generator.generate(None, devnull)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        report[mode] = (best, peak, generator.outputs[-1].writes)
+    return report
+
+
+def count_instructions(mips):
+    """MIPS 文本中的指令条数（不含伪指令、标号和数据定义）"""
+    count = 0
+    for line in mips.split("\n"):
+        line = line.strip()
+        if line and not line.endswith(":") and not line.startswith(".") and not line.startswith("newline"):
+            count += 1
+    return count
+
+
+def optimization_report(names=("9-constOpt", "7-bubbleSort")):
+    """不优化与优化时的四元式条数和 MIPS 指令条数：{程序: ((四元式, 指令), (四元式, 指令))}"""
+    from session import CompilerSession
+    report = {}
+    for name in names:
+        counts = []
+        for optimize in (False, True):
+            result = CompilerSession(optimize=optimize).compile_file(f"../data/{name}.txt")
+            counts.append((len(result.optimized_quads), count_instructions(result.mips)))
+        report[name] = tuple(counts)
+    return report
+
+
+def peephole_report(pattern="../data/*.txt"):
+    """data/ 中所有程序窥孔优化删去的指令条数，按模式合计：({模式: 条数}, 优化前总条数)"""
+    from session import CompilerSession
+    from Peephole import PATTERNS
+    session = CompilerSession()
+    totals = dict.fromkeys(PATTERNS, 0)
+    before = 0
+    for path in sorted(glob.glob(pattern)):
+        with open(path, encoding="utf-8") as f:
+            result = session.compile(f.read())
+        if not result.ok:
+            continue
+        for name, count in result.peephole.items():
+            totals[name] += count
+        before += count_instructions(result.mips) + sum(result.peephole.values())
+    return totals, before
+
+
+def memory_operations(code):
+    """结构化指令（MIPSGenerator.code）中 lw 和 sw 指令的条数"""
+    loads = stores = 0
+    for ins in code:
+        op = ins.op
+        if op == "lw":
+            loads += 1
+        elif op == "sw":
+            stores += 1
+    return loads, stores
+
+
+def memory_report(pattern="../data/*.txt"):
+    """data/ 中每个程序优化后的 MIPS 代码里 lw / sw 的条数：{程序: ((lw, sw) 变量都在内存中, (lw, sw) 分配 $s 寄存器)}"""
+    from session import CompilerSession
+    from MIPSGenerator import MIPSGenerator
+    session = CompilerSession()
+    report = {}
+    for path in sorted(glob.glob(pattern)):
+        with open(path, encoding="utf-8") as f:
+            result = session.compile(f.read())
+        if not result.ok:
+            continue
+        counts = []
+        for allocate in (False, True):
+            generator = MIPSGenerator(result.optimized_quads, peephole=True, allocate=allocate)
+            generator.generate(None)
+            counts.append(memory_operations(generator.code))
+        report[os.path.basename(path)] = tuple(counts)
+    return report
+
+
+def main():
+    n, report = quad_memory()
+    print(f"四元式条数: {n}")
+    for name, per_quad in report.items():
+        print(f"  {name:18s} {per_quad:7.1f} 字节/条")
+    for depth in (1, 10, 30):
+        print(f"嵌套 {depth:2d} 层作用域查找最外层变量: {lookup_cost(depth) * 1e9:.0f} ns")
+    report = check_cost()
+    for name, check, full in report:
+        print(f"  {name:20s} 只检查 {check * 1e3:6.2f} ms  完整编译 {full * 1e3:6.2f} ms")
+    check = sum(r[1] for r in report)
+    full = sum(r[2] for r in report)
+    print(f"data/ 合计: 只检查 {check * 1e3:.2f} ms, 完整编译 {full * 1e3:.2f} ms ({check / full:.0%})")
+    for quads, blocks, seconds in cfg_cost():
+        print(f"控制流图: {quads:6d} 条四元式, {blocks:5d} 个基本块, {seconds * 1e3:6.1f} ms ({seconds / quads * 1e9:.0f} ns/条)")
+    for name, ((quads, instrs), (opt_quads, opt_instrs)) in optimization_report().items():
+        print(f"{name:14s} 四元式 {quads} -> {opt_quads}, MIPS 指令 {instrs} -> {opt_instrs}")
+    totals, before = peephole_report()
+    print(f"窥孔优化: data/ 中的程序共 {before} 条指令，删去 {sum(totals.values())} 条")
+    for name, count in totals.items():
+        if count:
+            print(f"  {name:16s} {count:5d}")
+    print("lw / sw 条数（变量都在内存中 -> 分配 $s 寄存器）:")
+    for name, ((loads, stores), (new_loads, new_stores)) in memory_report().items():
+        print(f"  {name:20s} lw {loads:3d} -> {new_loads:3d}  sw {stores:3d} -> {new_stores:3d}")
+    for mode, (seconds, peak, writes) in emission_cost().items():
+        print(f"生成目标代码 ({mode:6s}): {seconds * 1e3:6.1f} ms, 内存峰值 {peak / 1024:7.0f} KB, write {writes} 次")
+    print("模拟器中执行的指令条数（不优化 -> 优化）:")
+    for name, (plain, optimized, same) in execution_report().items():
+        print(f"  {name:20s} {plain:6d} -> {optimized:6d}" + ("" if same else "  输出不一致"))
+    report = verbosity_cost()
+    print(f"30 层嵌套过程、每层 200 个变量的程序完整编译: 静默 {report[VERBOSE_SILENT] * 1e3:.2f} ms, 打印符号表 {report[VERBOSE_SYMBOLS] * 1e3:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
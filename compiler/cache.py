@@ -0,0 +1,143 @@
+import sys
+sys.path.append("../")
+import os
+import pickle
+import hashlib
+import tempfile
+
+_compiler_version = None
+
+
+def compiler_version():
+    """
+    编译器版本指纹：编译器目录下所有源文件内容的哈希。
+    任何一个阶段的代码发生变化，旧的缓存条目都不会再被命中。
+    """
+    global _compiler_version
+    if _compiler_version is None:
+        digest = hashlib.sha256()
+        here = os.path.dirname(os.path.abspath(__file__))
+        for name in sorted(os.listdir(here)):
+            if name.endswith(".py"):
+                digest.update(name.encode("utf-8"))
+                with open(os.path.join(here, name), "rb") as f:
+                    digest.update(f.read())
+        _compiler_version = digest.hexdigest()[:16]
+    return _compiler_version
+
+
+class CompileCache:
+    """
+    按源程序内容寻址的磁盘编译缓存。
+
+    键是 源程序字节 + 编译器版本 + 编译选项 的 SHA-256，值是一次编译的全部产物
+    （tokens、语法树、四元式、优化后的四元式、目标代码）。
+    - 写入：先写同目录下的临时文件再 os.replace，多个进程同时写同一个键时后写者覆盖，
+      读者永远看不到半个文件；同一个键的内容是确定的，覆盖无害。
+    - 读取：文件缺失、损坏或读取时被其他进程淘汰都当作未命中。
+    - 淘汰：总大小超过 max_bytes 时按最近使用时间（命中时刷新 mtime）删除最旧的条目，
+      直到降到上限的 90% 以下。
+    - 总大小：每个进程各自累计自己写入的字节数，看不到其他进程的写入，所以本进程写入超过
+      上限的 RESCAN_FRACTION 后重新扫描磁盘。多个进程共用一个目录时上限是近似的，
+      最多超出 进程数 × RESCAN_FRACTION × max_bytes。
+    """
+    SUFFIX = ".pickle"
+    RESCAN_FRACTION = 0.1
+
+    def __init__(self, root, max_bytes=64 * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(root, exist_ok=True)
+        self._size = self._scan_size()
+        self._written = 0  # 上次扫描磁盘之后本进程写入的字节数
+
+    def key(self, source, options=None):
+        if isinstance(source, str):
+            source = source.encode("utf-8")
+        digest = hashlib.sha256()
+        digest.update(compiler_version().encode("ascii"))
+        digest.update(repr(sorted((options or {}).items())).encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(source)
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], key + self.SUFFIX)
+
+    def get(self, key):
+        """返回缓存的产物字典，未命中返回 None"""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                artifacts = pickle.load(f)
+            os.utime(path)  # 刷新最近使用时间
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception:
+            # 损坏的条目直接丢弃
+            self.misses += 1
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        self.hits += 1
+        return artifacts
+
+    def put(self, key, artifacts):
+        path = self._path(key)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(artifacts, f, protocol=pickle.HIGHEST_PROTOCOL)
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        self._size += size
+        self._written += size
+        if self._written > self.max_bytes * self.RESCAN_FRACTION:
+            self._size = self._scan_size()  # 加上其他进程写入的条目
+            self._written = 0
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def _entries(self):
+        for sub in os.scandir(self.root):
+            if not sub.is_dir():
+                continue
+            for entry in os.scandir(sub.path):
+                if entry.name.endswith(self.SUFFIX):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue  # 已被其他进程淘汰
+                    yield stat.st_mtime, stat.st_size, entry.path
+
+    def _scan_size(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self):
+        """LRU 淘汰，直到总大小降到上限的 90% 以下"""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        limit = self.max_bytes * 0.9
+        for _, size, path in entries:
+            if total <= limit:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._size = total
+        self._written = 0
@@ -0,0 +1,323 @@
+import sys
+sys.path.append("../")
+from array import array
+from Quad import *
+
+# 结束基本块的四元式：其后的四元式是新基本块的开始
+BLOCK_ENDERS = frozenset(('THEN', 'ELSE', 'DO', 'ENDWHILE', 'Go', 'RETURN', 'ENDPROCEDURE'))
+# 跳转目标：本身是新基本块的第一条四元式
+BLOCK_LEADERS = frozenset(('PROCEDURE', 'ENDPROCEDURE', 'WHILE', 'ENDIF', 'label'))
+
+class BasicBlock:
+    """
+    基本块：四元式序列中的一段连续区间 [start, end)。
+    - succs/preds: 后继和前驱基本块
+    - idom: 直接支配者，入口块为自身，不可达块为 None
+    - dom_children: 支配树上的子结点
+    """
+    __slots__ = ('index', 'start', 'end', 'proc', 'succs', 'preds', 'idom', 'dom_children', '_pre', '_post')
+
+    def __init__(self, index, start, end, proc):
+        self.index = index
+        self.start = start
+        self.end = end
+        self.proc = proc
+        self.succs = []
+        self.preds = []
+        self.idom = None
+        self.dom_children = []
+        self._pre = self._post = -1  # 支配树先序/后序编号，用于 O(1) 判断支配关系
+
+    @property
+    def range(self):
+        return range(self.start, self.end)
+
+    def __len__(self):
+        return self.end - self.start
+
+    def __repr__(self):
+        return f"B{self.index}[{self.start}:{self.end}]"
+
+class Procedure:
+    """
+    一个过程（或最外层的主程序 global）的控制流图。
+    嵌套过程的四元式夹在外层过程中间，但各自单独成图，外层过程的控制流直接越过它们。
+    """
+    __slots__ = ('name', 'start', 'end', 'parent', 'blocks', 'entry', 'exit', 'rpo')
+
+    def __init__(self, name, start, parent=None):
+        self.name = name
+        self.start = start      # PROCEDURE 四元式的下标，主程序为 0
+        self.end = None         # ENDPROCEDURE 四元式的下标，主程序为四元式总数
+        self.parent = parent    # 外层过程
+        self.blocks = []        # 按四元式顺序排列的基本块
+        self.entry = None
+        self.exit = None        # 过程为 ENDPROCEDURE 所在块，主程序为末尾的空块
+        self.rpo = []           # 从入口可达的基本块，逆后序
+
+    def __repr__(self):
+        return f"Procedure({self.name!r}, {len(self.blocks)} blocks)"
+
+class ControlFlowGraph:
+    """
+    把四元式序列划分为基本块，按过程建立控制流图并计算支配树。
+    quads 可以是 QuadBuffer 或 (op, arg1, arg2, result) 序列；构造之后不再引用 quads。
+    结构化标记的含义与 MIPSGenerator 一致：
+    - THEN c / DO c: c 为假时跳到对应 ELSE 之后 / ENDWHILE 之后，否则顺序执行
+    - ELSE: 跳到对应的 ENDIF；ENDWHILE: 跳回对应的 WHILE
+    - Go L: 跳到 label L；RETURN: 跳到过程出口
+    整个构造过程只扫描四元式常数遍，支配树用 Cooper-Harvey-Kennedy 迭代算法，
+    对这种结构化程序生成的可归约流图两三轮即收敛，总体近似线性。
+    """
+    def __init__(self, quads):
+        self.blocks = []
+        self.procedures = []
+        self.block_of = array('i')  # 四元式下标 -> 所在基本块下标
+        ops = [row[0] for row in quads]
+        self.size = len(ops)
+        # 跳转四元式下标 -> 目标四元式下标：THEN -> 对应 ELSE 的下一条，ELSE -> ENDIF，
+        # DO -> 对应 ENDWHILE 的下一条，ENDWHILE -> WHILE，Go -> label
+        self.targets, owner = self._match(quads, ops)
+        self._split(ops, owner)
+        self._connect(ops, self.targets)
+        for proc in self.procedures:
+            self._dominators(proc)
+
+    def _match(self, quads, ops):
+        """配对结构化标记，记录每条跳转的目标四元式下标，并确定每条四元式所属的过程"""
+        n = len(ops)
+        targets = {}  # 跳转四元式下标 -> 目标四元式下标
+        labels = {}
+        gotos = []
+        stack = []
+        main = Procedure("global", 0)
+        self.procedures.append(main)
+        current = main
+        owner = [None] * n
+        for i, op in enumerate(ops):
+            if op == 'PROCEDURE':
+                current = Procedure(quads[i][1], i, current)
+                self.procedures.append(current)
+                owner[i] = current
+                continue
+            owner[i] = current
+            if op == 'ENDPROCEDURE':
+                current.end = i
+                current = current.parent
+            elif op == 'THEN' or op == 'WHILE':
+                stack.append(i)
+            elif op == 'ELSE':
+                then = stack.pop()
+                targets[then] = i + 1
+                stack.append(i)
+            elif op == 'ENDIF':
+                targets[stack.pop()] = i
+            elif op == 'DO':
+                stack.append(i)
+            elif op == 'ENDWHILE':
+                do = stack.pop()
+                targets[i] = stack.pop()
+                targets[do] = i + 1
+            elif op == 'label':
+                labels[quads[i][1]] = i
+            elif op == 'Go':
+                gotos.append((i, quads[i][1]))
+        if stack or current is not main:
+            raise ValueError("四元式中的结构化标记不配对")
+        main.end = n
+        for i, label in gotos:
+            targets[i] = labels[label]
+        return targets, owner
+
+    def _split(self, ops, owner):
+        n = len(ops)
+        blocks = self.blocks
+        block_of = self.block_of
+        block = None
+        leader = True
+        for i, op in enumerate(ops):
+            if leader or op in BLOCK_LEADERS:
+                proc = owner[i]
+                block = BasicBlock(len(blocks), i, i, proc)
+                blocks.append(block)
+                proc.blocks.append(block)
+            block.end = i + 1
+            block_of.append(block.index)
+            leader = op in BLOCK_ENDERS
+        main = self.procedures[0]
+        # 主程序末尾的空块作为出口，也是“跳出最后一个循环”的目标
+        block = BasicBlock(len(blocks), n, n, main)
+        blocks.append(block)
+        main.blocks.append(block)
+        block_of.append(block.index)
+        for proc in self.procedures:
+            proc.entry = proc.blocks[0]
+            proc.exit = proc.blocks[-1]
+
+    def _connect(self, ops, targets):
+        blocks = self.blocks
+        block_of = self.block_of
+        for proc in self.procedures:
+            proc_blocks = proc.blocks
+            last = len(proc_blocks) - 1
+            for pos, block in enumerate(proc_blocks):
+                if block.start == block.end:
+                    continue
+                tail = block.end - 1
+                op = ops[tail]
+                # 顺序执行的后继：本过程中紧随其后的块（中间夹着的嵌套过程被跳过）
+                fall = proc_blocks[pos + 1] if pos < last else None
+                if op == 'THEN' or op == 'DO':
+                    succs = (fall, blocks[block_of[targets[tail]]])
+                elif op == 'ELSE' or op == 'ENDWHILE' or op == 'Go':
+                    succs = (blocks[block_of[targets[tail]]],)
+                elif op == 'RETURN':
+                    succs = (proc.exit,)
+                elif op == 'ENDPROCEDURE':
+                    succs = ()
+                else:
+                    succs = (fall,) if fall is not None else ()
+                for succ in succs:
+                    if succ not in block.succs:
+                        block.succs.append(succ)
+                        succ.preds.append(block)
+
+    def _dominators(self, proc):
+        # 迭代求后序（过程可能嵌套很深，不用递归）
+        order = []
+        visited = {proc.entry.index}
+        stack = [(proc.entry, iter(proc.entry.succs))]
+        while stack:
+            block, succs = stack[-1]
+            for succ in succs:
+                if succ.index not in visited:
+                    visited.add(succ.index)
+                    stack.append((succ, iter(succ.succs)))
+                    break
+            else:
+                stack.pop()
+                order.append(block)
+        rank = {block.index: n for n, block in enumerate(order)}
+        order.reverse()
+        proc.rpo = order
+
+        entry = proc.entry
+        entry.idom = entry
+        changed = True
+        while changed:
+            changed = False
+            for block in order[1:]:
+                new_idom = None
+                for pred in block.preds:
+                    if pred.idom is None:
+                        continue
+                    if new_idom is None:
+                        new_idom = pred
+                        continue
+                    # 两个结点沿支配树向上走到公共祖先
+                    a, b = pred, new_idom
+                    while a is not b:
+                        while rank[a.index] < rank[b.index]:
+                            a = a.idom
+                        while rank[b.index] < rank[a.index]:
+                            b = b.idom
+                    new_idom = a
+                if block.idom is not new_idom:
+                    block.idom = new_idom
+                    changed = True
+
+        for block in order[1:]:
+            block.idom.dom_children.append(block)
+        counter = 0
+        stack = [(entry, iter(entry.dom_children))]
+        entry._pre = counter
+        while stack:
+            block, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                counter += 1
+                block._post = counter
+            else:
+                counter += 1
+                child._pre = counter
+                stack.append((child, iter(child.dom_children)))
+
+    def dominates(self, a, b):
+        """基本块 a 是否支配 b（自身支配自身）；不可达的块不被任何块支配"""
+        return a._pre >= 0 and b._pre >= 0 and a._pre <= b._pre and b._post <= a._post
+
+    def procedure_of(self, index):
+        """四元式下标 index 所在的过程"""
+        return self.blocks[self.block_of[index]].proc
+
+    def format(self):
+        """以文本形式给出各过程的基本块、边和直接支配者，供调试查看"""
+        lines = []
+        for proc in self.procedures:
+            lines.append(f"过程 {proc.name}: 入口 {proc.entry!r}, 出口 {proc.exit!r}")
+            for block in proc.blocks:
+                succs = ", ".join(repr(s) for s in block.succs)
+                idom = repr(block.idom) if block.idom is not None else "不可达"
+                lines.append(f"  {block!r} -> [{succs}]  idom {idom}")
+        return "\n".join(lines)
+
+def temp_intervals(quads):
+    """
+    临时变量（没有经 DECLARE/get 声明的名字）占用寄存器的区间 {名字: [定义处, 最后使用处]}。
+    使用处在某个循环中而定义在该循环之前时，区间延伸到循环的 ENDWHILE，因为下一轮还要读取它。
+    """
+    declared = set()
+    loop_of = []    # 四元式下标 -> 所在最内层循环的 WHILE 下标，不在循环中为 -1
+    loop_end = {}   # WHILE 下标 -> ENDWHILE 下标
+    outer = {}      # WHILE 下标 -> 外层循环的 WHILE 下标
+    stack = [-1]
+    for i, (op, _, _, res) in enumerate(quads):
+        if op == 'WHILE':
+            outer[i] = stack[-1]
+            stack.append(i)
+        loop_of.append(stack[-1])
+        if op == 'ENDWHILE':
+            loop_end[stack.pop()] = i
+        elif op == 'DECLARE' or op == 'get':
+            declared.add(res)
+    intervals = {}
+    for i, quad in enumerate(quads):
+        uses, target = quad_names(*quad)
+        for name in uses:
+            if name in declared:
+                continue
+            interval = intervals.get(name)
+            if interval is None:
+                intervals[name] = [i, i]
+                continue
+            end = i
+            loop = loop_of[i]
+            while loop > interval[0]:
+                end = loop_end[loop]
+                loop = outer[loop]
+            if end > interval[1]:
+                interval[1] = end
+        if target is not None and target not in declared and target not in intervals:
+            intervals[target] = [i, i]
+    return intervals
+
+def register_pressure(quads):
+    """每条四元式处同时要占用的寄存器数：区间覆盖这里的临时变量，加上这条四元式读写的变量（后端逐个装入寄存器）"""
+    declared = {res for op, _, _, res in quads if op == 'DECLARE' or op == 'get'}
+    delta = [0] * (len(quads) + 1)
+    for start, end in temp_intervals(quads).values():
+        delta[start] += 1
+        delta[end + 1] -= 1
+    counts = array('i')
+    live = 0
+    for n, quad in enumerate(quads):
+        live += delta[n]
+        uses, target = quad_names(*quad)
+        counts.append(live + len({name for name in uses + [target] if name in declared}))
+    return counts
+
+if __name__ == '__main__':
+    from session import CompilerSession
+    result = CompilerSession(optimize=False).compile_file("../data/7-bubbleSort.txt")
+    print(ControlFlowGraph(result.quadruples).format())
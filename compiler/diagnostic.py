@@ -0,0 +1,90 @@
+import sys
+sys.path.append("../")
+
+# 诊断信息的严重程度
+SEVERITY_ERROR = "error"
+SEVERITY_WARNING = "warning"
+SEVERITY_NOTE = "note"
+SEVERITY_LABELS = {SEVERITY_ERROR: "错误", SEVERITY_WARNING: "警告", SEVERITY_NOTE: "提示"}
+# 词法/语法阶段产生的诊断类别，未列出的类别都来自语义分析
+STAGE_LABELS = {"illegal-char": "词法错误", "file-not-found": "词法错误", "syntax": "语法错误"}
+
+# 终端输出的详细程度：默认 VERBOSE_SILENT，编译过程不向标准输出写任何内容，诊断只收集不打印
+VERBOSE_SILENT = 0
+VERBOSE_MESSAGES = 1  # 产生诊断时立即打印
+VERBOSE_SYMBOLS = 2   # 另外在退出每个作用域和分析结束时打印符号表
+
+class Diagnostic:
+    """一条诊断记录"""
+    __slots__ = ('severity', 'code', 'line', 'message', 'scope')
+
+    def __init__(self, severity, code, line, message, scope=None):
+        self.severity = severity  # SEVERITY_*
+        self.code = code          # 诊断类别，如 'undefined-var'
+        self.line = line          # 源程序行号，未知时为 None
+        self.message = message
+        self.scope = scope        # 产生诊断时所在的作用域（过程名）
+
+    def format(self, label=None):
+        text = f"{label or SEVERITY_LABELS[self.severity]}: {self.message}"
+        if self.line:
+            text += f" (行号: {self.line})"
+        return text
+
+    def __str__(self):
+        return self.format()
+
+    def __repr__(self):
+        return f"Diagnostic({self.severity!r}, {self.code!r}, {self.line!r}, {self.message!r}, {self.scope!r})"
+
+class DiagnosticCollector:
+    """
+    一次编译中各阶段共享的诊断收集器。
+    各阶段只调用 report/error/warning 记录结构化的 Diagnostic，是否打印由 verbosity 决定；
+    符号表转储也经由这里，只有 verbosity >= VERBOSE_SYMBOLS 时才输出。
+    """
+    def __init__(self, verbosity=VERBOSE_SILENT, out=None):
+        self.verbosity = verbosity
+        self.out = out  # 为 None 时打印到当前的 sys.stdout
+        self.records = []
+
+    def report(self, severity, code, message, line=None, scope=None):
+        diagnostic = Diagnostic(severity, code, line, message, scope)
+        self.records.append(diagnostic)
+        if self.verbosity >= VERBOSE_MESSAGES:
+            print(diagnostic, file=self.out or sys.stdout)
+        return diagnostic
+
+    def error(self, code, message, line=None, scope=None):
+        return self.report(SEVERITY_ERROR, code, message, line, scope)
+
+    def warning(self, code, message, line=None, scope=None):
+        return self.report(SEVERITY_WARNING, code, message, line, scope)
+
+    @property
+    def dump_symbols(self):
+        return self.verbosity >= VERBOSE_SYMBOLS
+
+    def symbol_table(self, title, items):
+        """打印符号表 items: (名字, (类型, 偏移, 类别))。调用前应先检查 dump_symbols，避免无谓地遍历符号表"""
+        out = self.out or sys.stdout
+        print(f"\n{title}", file=out)
+        for name, (type_, offset, category) in items:
+            print(f"  {name}: offset = {offset},类型={type_}, 类别={category}", file=out)
+
+    def select(self, severity):
+        return [d for d in self.records if d.severity == severity]
+
+    @property
+    def errors(self):
+        return self.select(SEVERITY_ERROR)
+
+    @property
+    def warnings(self):
+        return self.select(SEVERITY_WARNING)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __len__(self):
+        return len(self.records)
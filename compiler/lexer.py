@@ -1,7 +1,27 @@
 import sys
 sys.path.append("../")
+import os
+import hashlib
+import importlib.util
 from ply import lex
-from prettytable import PrettyTable
+from diagnostic import DiagnosticCollector, SEVERITY_NOTE, VERBOSE_MESSAGES
+
+# 预生成分析表的缓存目录：固定在包目录下，与当前工作目录无关
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "__snlcache__")
+
+# 诊断输出级别：生产环境默认为 DIAG_NONE，不生成任何转储文件
+DIAG_NONE = 0
+DIAG_TOKENS = 1  # 输出 token 表（result/token.txt）
+DIAG_ALL = 2     # 另外输出语法树与四元式表
+
+TOKEN_DUMP_HEADER = "行\t语义信息\t词法信息\n"
+
+def load_table_module(name, path):
+    """从缓存目录按路径加载 ply 生成的表模块，不依赖 sys.path 和当前工作目录"""
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
 
 class Token:
     def __init__(self, type, value, lineno):
@@ -10,47 +30,95 @@ class Token:
         self.lineno = lineno  # 单词所在的行号
 
 class SNLLexer:
-    def __init__(self):
-        self.tokens = (
-            # 关键字
-            'PROGRAM', 'PROCEDURE', 'TYPE', 'VAR', 'IF', 'THEN', 'ELSE', 'FI',
-            'WHILE', 'DO', 'ENDWH', 'BEGIN', 'END', 'READ', 'WRITE', 'ARRAY', 'OF',
-            'RECORD', 'RETURN',
-            # 类型
-            'INTEGER', 'CHAR',
-            # 标识符和常量
-            'ID', 'INTC', 'CHARC', 
-            # 运算符和符号
-            'ASSIGN', 'EQ', 'LT', 'PLUS', 'MINUS', 'TIMES',
-            'OVER', 'LPAREN', 'RPAREN', 'LMIDPAREN', 'RMIDPAREN', 'UNDERANGE',
-            'SEMI', 'COMMA', 'DOT'
-        )
-
-        self.reserved = {
-            'program': 'PROGRAM',
-            'procedure': 'PROCEDURE',
-            'type': 'TYPE',
-            'var': 'VAR',
-            'if': 'IF',
-            'then': 'THEN',
-            'else': 'ELSE',
-            'fi': 'FI',
-            'while': 'WHILE',
-            'do': 'DO',
-            'endwh': 'ENDWH',
-            'begin': 'BEGIN',
-            'end': 'END',
-            'read': 'READ',
-            'write': 'WRITE',
-            'array': 'ARRAY',
-            'of': 'OF',
-            'record': 'RECORD',
-            'return': 'RETURN',
-            'integer': 'INTEGER',
-            'char': 'CHAR'
-        }
-
-        self.lexer = lex.lex(module=self)  # 指的是让lexer使用本类中的方法
+    tokens = (
+        # 关键字
+        'PROGRAM', 'PROCEDURE', 'TYPE', 'VAR', 'IF', 'THEN', 'ELSE', 'FI',
+        'WHILE', 'DO', 'ENDWH', 'BEGIN', 'END', 'READ', 'WRITE', 'ARRAY', 'OF',
+        'RECORD', 'RETURN',
+        # 类型
+        'INTEGER', 'CHAR',
+        # 标识符和常量
+        'ID', 'INTC', 'CHARC', 
+        # 运算符和符号
+        'ASSIGN', 'EQ', 'LT', 'PLUS', 'MINUS', 'TIMES',
+        'OVER', 'LPAREN', 'RPAREN', 'LMIDPAREN', 'RMIDPAREN', 'UNDERANGE',
+        'SEMI', 'COMMA', 'DOT'
+    )
+
+    reserved = {
+        'program': 'PROGRAM',
+        'procedure': 'PROCEDURE',
+        'type': 'TYPE',
+        'var': 'VAR',
+        'if': 'IF',
+        'then': 'THEN',
+        'else': 'ELSE',
+        'fi': 'FI',
+        'while': 'WHILE',
+        'do': 'DO',
+        'endwh': 'ENDWH',
+        'begin': 'BEGIN',
+        'end': 'END',
+        'read': 'READ',
+        'write': 'WRITE',
+        'array': 'ARRAY',
+        'of': 'OF',
+        'record': 'RECORD',
+        'return': 'RETURN',
+        'integer': 'INTEGER',
+        'char': 'CHAR'
+    }
+
+    _prototypes = {}  # 已编译好主正则表达式的 ply 词法分析器，按是否热启动在进程内共享
+
+    def __init__(self, diagnostics=DIAG_NONE, warm_start=False):
+        self.diagnostics = diagnostics
+        self.collector = DiagnosticCollector()  # 非法字符等诊断记录在这里，由语法分析器每次分析时替换
+        prototype = SNLLexer._prototypes.get(warm_start)
+        if prototype is None:
+            prototype = self._build(warm_start)
+            SNLLexer._prototypes[warm_start] = prototype
+        self.lexer = prototype.clone(self)  # 指的是让lexer使用本类中的方法
+        self.lexer.begin('INITIAL')  # clone 不会重绑当前的 lexerrorf，否则非法字符会记到第一个实例的收集器里
+
+    @classmethod
+    def signature(cls):
+        """词法规则的签名，规则变化后缓存的 lextab 自动失效"""
+        parts = [lex.__version__, repr(cls.tokens), repr(sorted(cls.reserved.items()))]
+        for name in sorted(vars(cls)):
+            if name.startswith('t_'):
+                rule = getattr(cls, name)
+                parts.append(f"{name}={rule if isinstance(rule, str) else rule.__doc__}")
+        return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()[:16]
+
+    def _build(self, warm_start):
+        if not warm_start:
+            return lex.lex(module=self)
+        # 热启动：直接读取优化模式生成的 lextab，跳过规则反射与校验
+        name = f"lextab_{self.signature()}"
+        path = os.path.join(CACHE_DIR, name + ".py")
+        if os.path.exists(path):
+            try:
+                return lex.lex(module=self, optimize=True, lextab=load_table_module(name, path))
+            except Exception:
+                pass  # 缓存损坏，重新生成
+        # 只有缓存缺失时才需要，放在这里以免拖慢热启动的导入时间
+        import shutil
+        import tempfile
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            tmp_dir = tempfile.mkdtemp(dir=CACHE_DIR)
+        except OSError:
+            return lex.lex(module=self)  # 缓存目录不可写，退回普通模式
+        try:
+            # 先写入临时目录再原子替换，并发启动的进程不会读到半个文件
+            lexer = lex.lex(module=self, optimize=True, lextab=name, outputdir=tmp_dir)
+            os.replace(os.path.join(tmp_dir, name + ".py"), path)
+        except OSError:
+            pass
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        return lexer
 
     # 正则表达式规则
     t_ASSIGN = r':='
@@ -94,34 +162,57 @@ class SNLLexer:
         t.lexer.lineno += len(t.value)
 
     def t_error(self, t):
-        print(f"非法字符 '{t.value[0]}' 在行 {t.lineno}")
+        self.collector.error("illegal-char", f"非法字符 '{t.value[0]}'", t.lineno)
         t.lexer.skip(1)
 
-    def analyze_file(self, input_file, output_file):
+    def iter_tokens(self, source, dump=None):
+        """
+        逐个产生 token 的生成器，不再先把全部 token 物化成列表。
+        语法分析器通过 tokenfunc 直接消费它，词法分析与 LALR 分析交替进行。
+
+        Args:
+            source: 源程序文本
+            dump: 可选的可写文本文件，若给出则边扫描边以制表符分隔的格式写出每个 token
+        """
+        lexer = self.lexer
+        lexer.input(source)
+        lexer.lineno = 1  # 同一个词法分析器可以反复分析多个源程序
+        token = lexer.token
+        if dump is None:
+            while True:
+                tok = token()
+                if tok is None:
+                    return
+                yield tok
+        else:
+            write = dump.write
+            while True:
+                tok = token()
+                if tok is None:
+                    return
+                write(f"{tok.lineno}\t{tok.value}\t{tok.type}\n")
+                yield tok
+
+    def analyze_file(self, input_file, output_file, collector=None):
+        """词法分析整个文件；完成提示和错误经由 collector 报告，默认静默"""
+        if collector is not None:
+            self.collector = collector
         try:
             with open(input_file, "r", encoding="utf-8") as r:
                 data = r.read()
-            self.lexer.input(data)
-
-            table = PrettyTable(field_names=["行", "语义信息", "词法信息"])
-            tokens = []
 
-            while True:
-                tok = self.lexer.token()
-                if not tok:
-                    break
-                table.add_row([tok.lineno, tok.value, tok.type])
-                tokens.append(Token(tok.type, tok.value, tok.lineno))
-
-            with open(output_file, "w", encoding="utf-8") as w:
-                w.write(table.get_string())
-            print("词法分析完成！ ")
+            if self.diagnostics >= DIAG_TOKENS:
+                with open(output_file, "w", encoding="utf-8") as w:
+                    w.write(TOKEN_DUMP_HEADER)
+                    tokens = [Token(tok.type, tok.value, tok.lineno) for tok in self.iter_tokens(data, w)]
+            else:
+                tokens = [Token(tok.type, tok.value, tok.lineno) for tok in self.iter_tokens(data)]
+            self.collector.report(SEVERITY_NOTE, "lex-done", "词法分析完成！")
             return tokens
         
         except FileNotFoundError:
-            print(f"错误：文件 '{input_file}' 未找到。")
-
+            self.collector.error("file-not-found", f"文件 '{input_file}' 未找到。")
 
 if __name__ == '__main__':
-    lexer = SNLLexer()
-    lexer.analyze_file("./data/demo.txt", "./data/token.txt")
\ No newline at end of file
+    lexer = SNLLexer(DIAG_TOKENS)
+    lexer.analyze_file("./data/demo.txt", "./data/token.txt", DiagnosticCollector(VERBOSE_MESSAGES))
\ No newline at end of file
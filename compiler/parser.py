@@ -1,294 +1,386 @@
 import sys
 sys.path.append("../")
+import io
+import os
+import gc
+import hashlib
+from functools import partial
 from ply import yacc
-from lexer import SNLLexer
-from graphviz import Digraph
+from lexer import SNLLexer, DIAG_NONE, DIAG_TOKENS, TOKEN_DUMP_HEADER, CACHE_DIR
+from diagnostic import *
+from ASTNode import *
+
+_END = object()
+
+def walk_syntax_tree(tree, indent=0):
+    """
+    非递归地先序遍历语法树，依次产生 (层数, 节点或叶子, 是否为节点结束)。
+    栈上只保存每一层子节点的迭代器，占用空间只与树高有关，不会触发 RecursionError；
+    列表（语句序列等）里的元素与列表所在位置同层。
+    """
+    stack = [(iter((tree,)), indent, None)]
+    push = stack.append
+    while stack:
+        children, depth, owner = stack[-1]
+        child = next(children, _END)
+        if child is _END:
+            stack.pop()
+            if owner is not None:
+                yield depth - 1, owner, True
+        elif isinstance(child, Node):
+            yield depth, child, False
+            push((iter(child), depth + 1, child))
+        elif isinstance(child, list):
+            push((iter(child), depth, None))
+        elif child is not None:
+            yield depth, child, False
+
+def write_syntax_tree(tree, out, indent=0):
+    """
+    把语法树以缩进括号形式逐行写到文件对象 out。
+    与 walk_syntax_tree 相同的显式栈遍历，这里展开写以免每行多一次生成器切换；
+    边遍历边输出，不在内存中拼接整棵树的文本。
+    """
+    write = out.write
+    pads = []  # 缓存各层缩进串
+    stack = [(iter((tree,)), indent, None)]
+    push = stack.append
+    while stack:
+        children, depth, owner = stack[-1]
+        while len(pads) <= depth:
+            pads.append("  " * len(pads))
+        for child in children:
+            if isinstance(child, Node):
+                write(f"{pads[depth]}({child.name}\n")
+                push((iter(child), depth + 1, child))
+                break
+            elif isinstance(child, list):
+                push((iter(child), depth, None))
+                break
+            elif child is not None:
+                write(f"{pads[depth]}{child}\n")
+        else:
+            stack.pop()
+            if owner is not None:
+                write(f"{pads[depth - 1]})\n")
 
 def format_syntax_tree(tree, indent=0):
-    output = ""
-    if isinstance(tree, tuple):
-        node_name = tree[0]
-        output += "  " * indent + f"({node_name}\n"
-        for child in tree[1:]:
-            if child is not None:
-                output += format_syntax_tree(child, indent + 1)
-        output += "  " * indent + ")\n"
-    elif isinstance(tree, str):
-        output += "  " * indent + f"{tree}\n"
-    return output
+    output = io.StringIO()
+    write_syntax_tree(tree, output, indent)
+    return output.getvalue()
+
+def _lineno(p):
+    """产生式左部的行号：取右部第一个有行号的符号（空产生式的子节点行号为 0，跳过）"""
+    for i in range(1, len(p)):
+        child = p[i]
+        if isinstance(child, Node):
+            if child.lineno:
+                return child.lineno
+        else:
+            return p.lineno(i)
+    return 0
+
+def _recording(tokens, record):
+    append = record.append
+    for tok in tokens:
+        append((tok.type, tok.value, tok.lineno))
+        yield tok
 
 class SNLParser:
-    tokens = SNLLexer().tokens  # 继承词法分析器定义的 tokens
+    tokens = SNLLexer.tokens  # 继承词法分析器定义的 tokens
 
-    def __init__(self):
-        self.lexer = SNLLexer()
-        self.parser = yacc.yacc(module=self)
+    def __init__(self, diagnostics=DIAG_NONE, warm_start=False):
+        self.lexer = SNLLexer(diagnostics, warm_start)
+        if warm_start:
+            self.parser = self._load_tables()
+        else:
+            self.parser = yacc.yacc(module=self)
         self.parse_tree = None
+        self.collector = self.lexer.collector
+
+    @classmethod
+    def signature(cls):
+        """文法签名（产生式文档字符串 + tokens），文法变化后缓存的分析表自动失效"""
+        parts = [yacc.__version__, repr(cls.tokens)]
+        for name in sorted(vars(cls)):
+            if name.startswith('p_') and name != 'p_error':
+                parts.append(f"{name}={getattr(cls, name).__doc__}")
+        return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()[:16]
+
+    def _load_tables(self):
+        """
+        热启动：从包目录下的固定缓存位置加载预生成的 LALR 表（ply 会再校验一次签名），
+        不写 parser.out，也不依赖当前工作目录下的 parsetab.py。
+        缓存缺失时生成一次，写入临时文件后原子替换。
+        """
+        path = os.path.join(CACHE_DIR, f"parsetab_{self.signature()}.pickle")
+        quiet = yacc.NullLogger()
+        if os.path.exists(path):
+            try:
+                return yacc.yacc(module=self, debug=False, picklefile=path, errorlog=quiet)
+            except Exception:
+                pass  # 缓存损坏，重新生成
+        import tempfile  # 只有缓存缺失时才需要
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+            os.close(fd)
+            os.remove(tmp_path)
+        except OSError:
+            return yacc.yacc(module=self, debug=False, write_tables=False, errorlog=quiet)
+        parser = yacc.yacc(module=self, debug=False, picklefile=tmp_path, errorlog=quiet)
+        try:
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+        return parser
 
     # Program ::= ProgramHead DeclarePart ProgramBody DOT
     def p_Program(self, p):
         '''Program : ProgramHead DeclarePart ProgramBody DOT'''
-        p[0] = ('Program', p[1], p[2], p[3])
+        p[0] = ProgramNode(p[1], p[2], p[3], lineno=p[1].lineno)
 
     # ProgramHead ::= PROGRAM ProgramName
     def p_ProgramHead(self, p):
         '''ProgramHead : PROGRAM ProgramName'''
-        p[0] = ('ProgramHead', p[2])
+        p[0] = ProgramHeadNode(p[2], lineno=p.lineno(1))
 
     # ProgramName ::= ID
     def p_ProgramName(self, p):
         '''ProgramName : ID'''
-        p[0] = ('ProgramName', p[1])
+        p[0] = ProgramNameNode(p[1], lineno=p.lineno(1))
 
     # DeclarePart ::= TypeDec VarDec ProcDec
     def p_DeclarePart(self, p):
         '''DeclarePart : TypeDec VarDec ProcDec'''
-        p[0] = ('DeclarePart', p[1], p[2], p[3])
+        p[0] = DeclarePartNode(p[1], p[2], p[3], lineno=_lineno(p))
 
     # TypeDec ::= epsilon | TypeDeclaration
     def p_TypeDec_empty(self, p):
         '''TypeDec : '''
-        p[0] = ('TypeDec', None)
+        p[0] = TypeDecNode()
 
     def p_TypeDec_declaration(self, p):
         '''TypeDec : TypeDeclaration'''
-        p[0] = ('TypeDec', p[1])
+        p[0] = TypeDecNode(p[1], lineno=p[1].lineno)
 
     # TypeDeclaration ::= TYPE TypeDecList
     def p_TypeDeclaration(self, p):
         '''TypeDeclaration : TYPE TypeDecList'''
-        p[0] = ('TypeDeclaration', p[2])
+        p[0] = TypeDeclarationNode(p[2], lineno=p.lineno(1))
 
-    # TypeDecList ::= TypeId EQ TypeName SEMI TypeDecMore
-    def p_TypeDecList(self, p):
-        '''TypeDecList : TypeId EQ TypeName SEMI TypeDecMore'''
-        p[0] = ('TypeDecList', p[1], p[3], p[5])
+    # TypeDecList ::= TypeDecItem | TypeDecList TypeDecItem
+    # 列表产生式一律写成左递归并直接构造 Python 列表：LALR 栈深度不随列表长度增长，语法树也不再层层嵌套
+    def p_TypeDecList_item(self, p):
+        '''TypeDecList : TypeDecItem'''
+        p[0] = [p[1]]
 
-    # TypeDecMore ::= epsilon | TypeDecList
-    def p_TypeDecMore_empty(self, p):
-        '''TypeDecMore : '''
-        p[0] = ('TypeDecMore', None)
+    def p_TypeDecList_list(self, p):
+        '''TypeDecList : TypeDecList TypeDecItem'''
+        p[1].append(p[2])
+        p[0] = p[1]
 
-    def p_TypeDecMore_list(self, p):
-        '''TypeDecMore : TypeDecList'''
-        p[0] = ('TypeDecMore', p[1])
+    # TypeDecItem ::= TypeId EQ TypeName SEMI
+    def p_TypeDecItem(self, p):
+        '''TypeDecItem : TypeId EQ TypeName SEMI'''
+        p[0] = TypeDecItemNode(p[1], p[3], lineno=p[1].lineno)
 
     # TypeId ::= ID
     def p_TypeId(self, p):
         '''TypeId : ID'''
-        p[0] = ('TypeId', p[1])
+        p[0] = TypeIdNode(p[1], lineno=p.lineno(1))
 
     # TypeName ::= BaseType | StructureType | ID
     def p_TypeName_base(self, p):
         '''TypeName : BaseType'''
-        p[0] = ('TypeName', p[1])
+        p[0] = TypeNameNode(p[1], lineno=p[1].lineno)
 
     def p_TypeName_structure(self, p):
         '''TypeName : StructureType'''
-        p[0] = ('TypeName', p[1])
+        p[0] = TypeNameNode(p[1], lineno=p[1].lineno)
     
     def p_TypeName_id(self, p):
         '''TypeName : ID'''
-        p[0] = ('TypeName', p[1])
+        p[0] = TypeNameNode(p[1], lineno=p.lineno(1))
 
     # BaseType ::= INTEGER | CHAR
     def p_BaseType(self, p):
         '''BaseType : INTEGER
                     | CHAR'''
-        p[0] = ('BaseType', p[1])
+        p[0] = BaseTypeNode(p[1], lineno=p.lineno(1))
 
     # StructureType ::= ArrayType | RecType
     def p_StructureType(self, p):
         '''StructureType : ArrayType
                          | RecType'''
-        p[0] = ('StructureType', p[1])
+        p[0] = StructureTypeNode(p[1], lineno=p[1].lineno)
 
     # ArrayType ::= ARRAY LMIDPAREN INTC UNDERANGE INTC RMIDPAREN OF BaseType
     def p_ArrayType(self, p):
         '''ArrayType : ARRAY LMIDPAREN INTC UNDERANGE INTC RMIDPAREN OF BaseType'''
-        p[0] = ('ArrayType', p[3], p[5], p[8])
+        p[0] = ArrayTypeNode(p[3], p[5], p[8], lineno=p.lineno(1))
 
     # RecType ::= RECORD FieldDecList END
     def p_RecType(self, p):
         '''RecType : RECORD FieldDecList END'''
-        p[0] = ('RecType', p[2])
-
-    # FieldDecList ::= BaseType IdList SEMI FieldDecMore | ArrayType IdList SEMI FieldDecMore
-    def p_FieldDecList_base(self, p):
-        '''FieldDecList : BaseType IdList SEMI FieldDecMore'''
-        p[0] = ('FieldDecList', p[1], p[2], p[4])
-
-    def p_FieldDecList_array(self, p):
-        '''FieldDecList : ArrayType IdList SEMI FieldDecMore'''
-        p[0] = ('FieldDecList', p[1], p[2], p[4])
-
-    # FieldDecMore ::= epsilon | FieldDecList
-    def p_FieldDecMore_empty(self, p):
-        '''FieldDecMore : '''
-        p[0] = ('FieldDecMore', None)
-
-    def p_FieldDecMore_list(self, p):
-        '''FieldDecMore : FieldDecList'''
-        p[0] = ('FieldDecMore', p[1])
-
-    # IdList ::= ID IdMore
-    def p_IdList(self, p):
-        '''IdList : ID IdMore'''
-        p[0] = ('IdList', p[1], p[2])
-
-    # IdMore ::= epsilon | COMMA IdList
-    def p_IdMore_empty(self, p):
-        '''IdMore : '''
-        p[0] = ('IdMore', None)
-
-    def p_IdMore_list(self, p):
-        '''IdMore : COMMA IdList'''
-        p[0] = ('IdMore', p[2])
+        p[0] = RecTypeNode(p[2], lineno=p.lineno(1))
+
+    # FieldDecList ::= FieldDecItem | FieldDecList FieldDecItem
+    def p_FieldDecList_item(self, p):
+        '''FieldDecList : FieldDecItem'''
+        p[0] = [p[1]]
+
+    def p_FieldDecList_list(self, p):
+        '''FieldDecList : FieldDecList FieldDecItem'''
+        p[1].append(p[2])
+        p[0] = p[1]
+
+    # FieldDecItem ::= BaseType IdList SEMI | ArrayType IdList SEMI
+    def p_FieldDecItem(self, p):
+        '''FieldDecItem : BaseType IdList SEMI
+                        | ArrayType IdList SEMI'''
+        p[0] = FieldDecItemNode(p[1], p[2], lineno=p[1].lineno)
+
+    # IdList ::= ID | IdList COMMA ID
+    def p_IdList_id(self, p):
+        '''IdList : ID'''
+        p[0] = [p[1]]
+
+    def p_IdList_list(self, p):
+        '''IdList : IdList COMMA ID'''
+        p[1].append(p[3])
+        p[0] = p[1]
 
     # VarDec ::= epsilon | VarDeclaration
     def p_VarDec_empty(self, p):
         '''VarDec : '''
-        p[0] = ('VarDec', None)
+        p[0] = VarDecNode()
 
     def p_VarDec_declaration(self, p):
         '''VarDec : VarDeclaration'''
-        p[0] = ('VarDec', p[1])
+        p[0] = VarDecNode(p[1], lineno=p[1].lineno)
 
     # VarDeclaration ::= VAR VarDecList
     def p_VarDeclaration(self, p):
         '''VarDeclaration : VAR VarDecList'''
-        p[0] = ('VarDeclaration', p[2])
-
-    # VarDecList ::= TypeName VarIdList SEMI VarDecMore
-    def p_VarDecList(self, p):
-        '''VarDecList : TypeName VarIdList SEMI VarDecMore'''
-        p[0] = ('VarDecList', p[1], p[2], p[4])
-
-    # VarDecMore ::= epsilon | VarDecList
-    def p_VarDecMore_empty(self, p):
-        '''VarDecMore : '''
-        p[0] = ('VarDecMore', None)
-
-    def p_VarDecMore_list(self, p):
-        '''VarDecMore : VarDecList'''
-        p[0] = ('VarDecMore', p[1])
-
-    # VarIdList ::= ID VarIdMore
-    def p_VarIdList(self, p):
-        '''VarIdList : ID VarIdMore'''
-        p[0] = ('VarIdList', p[1], p[2])
-
-    # VarIdMore ::= epsilon | COMMA VarIdList
-    def p_VarIdMore_empty(self, p):
-        '''VarIdMore : '''
-        p[0] = ('VarIdMore', None)
-
-    def p_VarIdMore_list(self, p):
-        '''VarIdMore : COMMA VarIdList'''
-        p[0] = ('VarIdMore', p[2])
-
-    # ProcDec ::= epsilon | ProcDeclaration
+        p[0] = VarDeclarationNode(p[2], lineno=p.lineno(1))
+
+    # VarDecList ::= VarDecItem | VarDecList VarDecItem
+    def p_VarDecList_item(self, p):
+        '''VarDecList : VarDecItem'''
+        p[0] = [p[1]]
+
+    def p_VarDecList_list(self, p):
+        '''VarDecList : VarDecList VarDecItem'''
+        p[1].append(p[2])
+        p[0] = p[1]
+
+    # VarDecItem ::= TypeName VarIdList SEMI
+    def p_VarDecItem(self, p):
+        '''VarDecItem : TypeName VarIdList SEMI'''
+        p[0] = VarDecItemNode(p[1], p[2], lineno=p[1].lineno)
+
+    # VarIdList ::= ID | VarIdList COMMA ID
+    def p_VarIdList_id(self, p):
+        '''VarIdList : ID'''
+        p[0] = [p[1]]
+
+    def p_VarIdList_list(self, p):
+        '''VarIdList : VarIdList COMMA ID'''
+        p[1].append(p[3])
+        p[0] = p[1]
+
+    # ProcDec ::= epsilon | ProcDecList
     def p_ProcDec_empty(self, p):
         '''ProcDec : '''
-        p[0] = ('ProcDec', None)
+        p[0] = ProcDecNode([])
 
     def p_ProcDec_declaration(self, p):
-        '''ProcDec : ProcDeclaration'''
-        p[0] = ('ProcDec', p[1])
+        '''ProcDec : ProcDecList'''
+        p[0] = ProcDecNode(p[1], lineno=p[1][0].lineno)
 
-    # ProcDeclaration ::= PROCEDURE ProcName LPAREN ParamList RPAREN SEMI ProcDecPart ProcBody ProcDecMore
-    def p_ProcDeclaration(self, p):
-        '''ProcDeclaration : PROCEDURE ProcName LPAREN ParamList RPAREN SEMI ProcDecPart ProcBody ProcDecMore'''
-        p[0] = ('ProcDeclaration', p[2], p[4], p[7], p[8], p[9])
+    # ProcDecList ::= ProcDeclaration | ProcDecList ProcDeclaration
+    def p_ProcDecList_item(self, p):
+        '''ProcDecList : ProcDeclaration'''
+        p[0] = [p[1]]
 
-    # ProcDecMore ::= epsilon | ProcDec
-    def p_ProcDecMore_empty(self, p):
-        '''ProcDecMore : '''
-        p[0] = ('ProcDecMore', None)
+    def p_ProcDecList_list(self, p):
+        '''ProcDecList : ProcDecList ProcDeclaration'''
+        p[1].append(p[2])
+        p[0] = p[1]
 
-    def p_ProcDecMore_proc(self, p):
-        '''ProcDecMore : ProcDec'''
-        p[0] = ('ProcDecMore', p[1])
+    # ProcDeclaration ::= PROCEDURE ProcName LPAREN ParamList RPAREN SEMI ProcDecPart ProcBody
+    def p_ProcDeclaration(self, p):
+        '''ProcDeclaration : PROCEDURE ProcName LPAREN ParamList RPAREN SEMI ProcDecPart ProcBody'''
+        p[0] = ProcDeclarationNode(p[2], p[4], p[7], p[8], lineno=p.lineno(1))
 
     # ProcName ::= ID
     def p_ProcName(self, p):
         '''ProcName : ID'''
-        p[0] = ('ProcName', p[1])
+        p[0] = ProcNameNode(p[1], lineno=p.lineno(1))
 
     # ParamList ::= epsilon | ParamDecList
     def p_ParamList_empty(self, p):
         '''ParamList : '''
-        p[0] = ('ParamList', None)
+        p[0] = []
 
     def p_ParamList_list(self, p):
         '''ParamList : ParamDecList'''
-        p[0] = ('ParamList', p[1])
-
-    # ParamDecList ::= Param ParamMore
-    def p_ParamDecList(self, p):
-        '''ParamDecList : Param ParamMore'''
-        p[0] = ('ParamDecList', p[1], p[2])
+        p[0] = p[1]
 
-    # ParamMore ::= epsilon | SEMI ParamDecList
-    def p_ParamMore_empty(self, p):
-        '''ParamMore : '''
-        p[0] = ('ParamMore', None)
+    # ParamDecList ::= Param | ParamDecList SEMI Param
+    def p_ParamDecList_param(self, p):
+        '''ParamDecList : Param'''
+        p[0] = [p[1]]
 
-    def p_ParamMore_list(self, p):
-        '''ParamMore : SEMI ParamDecList'''
-        p[0] = ('ParamMore', p[2])
+    def p_ParamDecList_list(self, p):
+        '''ParamDecList : ParamDecList SEMI Param'''
+        p[1].append(p[3])
+        p[0] = p[1]
 
     # Param ::= TypeName FormList | VAR TypeName FormList
     def p_Param_type(self, p):
         '''Param : TypeName FormList'''
-        p[0] = ('Param', p[1], p[2])
+        p[0] = ParamNode(None, p[1], p[2], lineno=p[1].lineno)
 
     def p_Param_var(self, p):
         '''Param : VAR TypeName FormList'''
-        p[0] = ('Param', p[1], p[2], p[3])
+        p[0] = ParamNode(p[1], p[2], p[3], lineno=p.lineno(1))
 
-    # FormList ::= ID FidMore
-    def p_FormList(self, p):
-        '''FormList : ID FidMore'''
-        p[0] = ('FormList', p[1], p[2])
+    # FormList ::= ID | FormList COMMA ID
+    def p_FormList_id(self, p):
+        '''FormList : ID'''
+        p[0] = [p[1]]
 
-    # FidMore ::= epsilon | COMMA FormList
-    def p_FidMore_empty(self, p):
-        '''FidMore : '''
-        p[0] = ('FidMore', None)
-
-    def p_FidMore_list(self, p):
-        '''FidMore : COMMA FormList'''
-        p[0] = ('FidMore', p[2])
+    def p_FormList_list(self, p):
+        '''FormList : FormList COMMA ID'''
+        p[1].append(p[3])
+        p[0] = p[1]
 
     # ProcDecPart ::= DeclarePart
     def p_ProcDecPart(self, p):
         '''ProcDecPart : DeclarePart'''
-        p[0] = ('ProcDecPart', p[1])
+        p[0] = ProcDecPartNode(p[1], lineno=p[1].lineno)
 
     # ProcBody ::= ProgramBody
     def p_ProcBody(self, p):
         '''ProcBody : ProgramBody'''
-        p[0] = ('ProcBody', p[1])
+        p[0] = ProcBodyNode(p[1], lineno=p[1].lineno)
 
     # ProgramBody ::= BEGIN StmList END
     def p_ProgramBody(self, p):
         '''ProgramBody : BEGIN StmList END'''
-        p[0] = ('ProgramBody', p[2])
-
-    # StmList ::= Stm StmMore
-    def p_StmList(self, p):
-        '''StmList : Stm StmMore'''
-        p[0] = ('StmList', p[1], p[2])
+        p[0] = ProgramBodyNode(p[2], lineno=p.lineno(1))
 
-    # StmMore ::= epsilon | SEMI StmList
-    def p_StmMore_empty(self, p):
-        '''StmMore : '''
-        p[0] = ('StmMore', None)
+    # StmList ::= Stm | StmList SEMI Stm
+    def p_StmList_stm(self, p):
+        '''StmList : Stm'''
+        p[0] = [p[1]]
 
-    def p_StmMore_list(self, p):
-        '''StmMore : SEMI StmList'''
-        p[0] = ('StmMore', p[2])
+    def p_StmList_list(self, p):
+        '''StmList : StmList SEMI Stm'''
+        p[1].append(p[3])
+        p[0] = p[1]
 
     # Stm ::= ConditionalStm | LoopStm | InputStm | OutputStm | ReturnStm | ID AssCall
     def p_Stm(self, p):
@@ -299,213 +391,231 @@ class SNLParser:
                | ReturnStm
                | ID AssCall'''
         if len(p) == 2:
-            p[0] = ('Stm', p[1])
+            p[0] = StmNode(p[1], lineno=p[1].lineno)
         else:
-            p[0] = ('Stm', p[1], p[2])
+            p[0] = StmNode(p[1], p[2], lineno=p.lineno(1))
 
     # AssCall ::= AssignmentRest | CallStmRest
     def p_AssCall(self, p):
         '''AssCall : AssignmentRest
                    | CallStmRest'''
-        p[0] = ('AssCall', p[1])
+        p[0] = AssCallNode(p[1], lineno=p[1].lineno)
 
     # AssignmentRest ::= VariMore ASSIGN Exp
     def p_AssignmentRest(self, p):
         '''AssignmentRest : VariMore ASSIGN Exp'''
-        p[0] = ('AssignmentRest', p[1], p[3])
+        p[0] = AssignmentRestNode(p[1], p[3], lineno=p[1].lineno)
 
     # ConditionalStm ::= IF RelExp THEN StmList ELSE StmList FI
     def p_ConditionalStm(self, p):
         '''ConditionalStm : IF RelExp THEN StmList ELSE StmList FI'''
-        p[0] = ('ConditionalStm', p[2], p[4], p[6])
+        p[0] = ConditionalStmNode(p[2], p[4], p[6], lineno=p.lineno(1))
 
     # LoopStm ::= WHILE RelExp DO StmList ENDWH
     def p_LoopStm(self, p):
         '''LoopStm : WHILE RelExp DO StmList ENDWH'''
-        p[0] = ('LoopStm', p[2], p[4])
+        p[0] = LoopStmNode(p[2], p[4], lineno=p.lineno(1))
 
     # InputStm ::= READ LPAREN Invar RPAREN
     def p_InputStm(self, p):
         '''InputStm : READ LPAREN Invar RPAREN'''
-        p[0] = ('InputStm', p[3])
+        p[0] = InputStmNode(p[3], lineno=p.lineno(1))
 
     # Invar ::= ID
     def p_Invar(self, p):
         '''Invar : ID'''
-        p[0] = ('Invar', p[1])
+        p[0] = InvarNode(p[1], lineno=p.lineno(1))
 
     # OutputStm ::= WRITE LPAREN Exp RPAREN
     def p_OutputStm(self, p):
         '''OutputStm : WRITE LPAREN Exp RPAREN'''
-        p[0] = ('OutputStm', p[3])
+        p[0] = OutputStmNode(p[3], lineno=p.lineno(1))
 
     # ReturnStm ::= RETURN LPAREN Exp RPAREN
     def p_ReturnStm(self, p):
         '''ReturnStm : RETURN LPAREN Exp RPAREN'''
-        p[0] = ('ReturnStm', p[3])
+        p[0] = ReturnStmNode(p[3], lineno=p.lineno(1))
 
     # CallStmRest ::= LPAREN ActParamList RPAREN
     def p_CallStmRest(self, p):
         '''CallStmRest : LPAREN ActParamList RPAREN'''
-        p[0] = ('CallStmRest', p[2])
+        p[0] = CallStmRestNode(p[2], lineno=p.lineno(1))
 
-    # ActParamList ::= epsilon | Exp ActParamMore
+    # ActParamList ::= epsilon | ActParamSeq
     def p_ActParamList_empty(self, p):
         '''ActParamList : '''
-        p[0] = ('ActParamList', None)
+        p[0] = []
 
     def p_ActParamList_list(self, p):
-        '''ActParamList : Exp ActParamMore'''
-        p[0] = ('ActParamList', p[1], p[2])
+        '''ActParamList : ActParamSeq'''
+        p[0] = p[1]
 
-    # ActParamMore ::= epsilon | COMMA ActParamList
-    def p_ActParamMore_empty(self, p):
-        '''ActParamMore : '''
-        p[0] = ('ActParamMore', None)
+    # ActParamSeq ::= Exp | ActParamSeq COMMA Exp
+    def p_ActParamSeq_exp(self, p):
+        '''ActParamSeq : Exp'''
+        p[0] = [p[1]]
 
-    def p_ActParamMore_list(self, p):
-        '''ActParamMore : COMMA ActParamList'''
-        p[0] = ('ActParamMore', p[2])
+    def p_ActParamSeq_list(self, p):
+        '''ActParamSeq : ActParamSeq COMMA Exp'''
+        p[1].append(p[3])
+        p[0] = p[1]
 
     # RelExp ::= Exp OtherRelE
     def p_RelExp(self, p):
         '''RelExp : Exp OtherRelE'''
-        p[0] = ('RelExp', p[1], p[2])
+        p[0] = RelExpNode(p[1], p[2], lineno=p[1].lineno)
 
     # OtherRelE ::= CmpOp Exp
     def p_OtherRelE(self, p):
         '''OtherRelE : CmpOp Exp'''
-        p[0] = ('OtherRelE', p[1], p[2])
+        p[0] = OtherRelENode(p[1], p[2], lineno=p[1].lineno)
 
     # Exp ::= Term OtherTerm
     def p_Exp(self, p):
         '''Exp : Term OtherTerm'''
-        p[0] = ('Exp', p[1], p[2])
+        p[0] = ExpNode(p[1], p[2], lineno=p[1].lineno)
 
     # OtherTerm ::= epsilon | AddOp Exp
     def p_OtherTerm_empty(self, p):
         '''OtherTerm : '''
-        p[0] = ('OtherTerm', None)
+        p[0] = OtherTermNode()
 
     def p_OtherTerm_list(self, p):
         '''OtherTerm : AddOp Exp'''
-        p[0] = ('OtherTerm', p[1], p[2])
+        p[0] = OtherTermNode(p[1], p[2], lineno=p[1].lineno)
 
     # Term ::= Factor OtherFactor
     def p_Term(self, p):
         '''Term : Factor OtherFactor'''
-        p[0] = ('Term', p[1], p[2])
+        p[0] = TermNode(p[1], p[2], lineno=p[1].lineno)
 
     # OtherFactor ::= epsilon | MultOp Term
     def p_OtherFactor_empty(self, p):
         '''OtherFactor : '''
-        p[0] = ('OtherFactor', None)
+        p[0] = OtherFactorNode()
 
     def p_OtherFactor_list(self, p):
         '''OtherFactor : MultOp Term'''
-        p[0] = ('OtherFactor', p[1], p[2])
+        p[0] = OtherFactorNode(p[1], p[2], lineno=p[1].lineno)
 
     # Factor ::= LPAREN Exp RPAREN | INTC | Variable
     def p_Factor_paren(self, p):
         '''Factor : LPAREN Exp RPAREN'''
-        p[0] = ('Factor', p[2])
+        p[0] = FactorNode(p[2], lineno=p.lineno(1))
 
     def p_Factor_intc(self, p):
         '''Factor : INTC'''
-        p[0] = ('Factor', p[1])
+        p[0] = FactorNode(p[1], lineno=p.lineno(1))
 
     def p_Factor_variable(self, p):
         '''Factor : Variable'''
-        p[0] = ('Factor', p[1])
+        p[0] = FactorNode(p[1], lineno=p[1].lineno)
 
     # Variable ::= ID VariMore
     def p_Variable(self, p):
         '''Variable : ID VariMore'''
-        p[0] = ('Variable', p[1], p[2])
+        p[0] = VariableNode(p[1], p[2], lineno=p.lineno(1))
 
     # VariMore ::= epsilon | LMIDPAREN Exp RMIDPAREN | DOT FieldVar
     def p_VariMore_empty(self, p):
         '''VariMore : '''
-        p[0] = ('VariMore', None)
+        p[0] = VariMoreNode()
 
     def p_VariMore_index(self, p):
         '''VariMore : LMIDPAREN Exp RMIDPAREN'''
-        p[0] = ('VariMore', p[2])
+        p[0] = VariMoreNode(p[2], lineno=p.lineno(1))
 
     def p_VariMore_field(self, p):
         '''VariMore : DOT FieldVar'''
-        p[0] = ('VariMore', p[2])
+        p[0] = VariMoreNode(p[2], lineno=p.lineno(1))
 
     # FieldVar ::= ID FieldVarMore
     def p_FieldVar(self, p):
         '''FieldVar : ID FieldVarMore'''
-        p[0] = ('FieldVar', p[1], p[2])
+        p[0] = FieldVarNode(p[1], p[2], lineno=p.lineno(1))
 
     # FieldVarMore ::= epsilon | LMIDPAREN Exp RMIDPAREN
     def p_FieldVarMore_empty(self, p):
         '''FieldVarMore : '''
-        p[0] = ('FieldVarMore', None)
+        p[0] = FieldVarMoreNode()
 
     def p_FieldVarMore_index(self, p):
         '''FieldVarMore : LMIDPAREN Exp RMIDPAREN'''
-        p[0] = ('FieldVarMore', p[2])
+        p[0] = FieldVarMoreNode(p[2], lineno=p.lineno(1))
 
     # CmpOp ::= LT | EQ
     def p_CmpOp(self, p):
         '''CmpOp : LT
                  | EQ'''
-        p[0] = ('CmpOp', p[1])
+        p[0] = CmpOpNode(p[1], lineno=p.lineno(1))
 
     # AddOp ::= PLUS | MINUS
     def p_AddOp(self, p):
         '''AddOp : PLUS
                  | MINUS'''
-        p[0] = ('AddOp', p[1])
+        p[0] = AddOpNode(p[1], lineno=p.lineno(1))
 
     # MultOp ::= TIMES | OVER
     def p_MultOp(self, p):
         '''MultOp : TIMES
                   | OVER'''
-        p[0] = ('MultOp', p[1])
+        p[0] = MultOpNode(p[1], lineno=p.lineno(1))
 
     # Error rule for syntax errors
     def p_error(self, p):
-        print(f"词法语法错误：在输入中遇到意外的 token '{p.value}' (类型: {p.type})，位于行 {p.lineno}")
-
-    def parse_file(self, file_path):
-        with open(file_path, "r", encoding="utf-8") as f:
-            data = f.read() 
-        tokens = self.lexer.analyze_file(file_path, "../result/token.txt") 
-        '''
-        self.parse_tree = self.parser.parse(tokens, lexer=None)  # 传递字符串
+        if p is None:
+            self.collector.error("syntax", "词法语法错误：源程序意外结束")
+        else:
+            self.collector.error("syntax", f"词法语法错误：在输入中遇到意外的 token '{p.value}' (类型: {p.type})", p.lineno)
+
+    def parse(self, source, dump=None, record=None, collector=None):
+        """
+        分析一段源程序文本。token 由 SNLLexer.iter_tokens 按需产生，
+        经 tokenfunc 交给 ply，缓冲区里始终只有当前的向前看 token。
+        record 为列表时顺带记录每个 token 的 (类型, 值, 行号)，供编译缓存保存。
+        词法和语法错误记录到 collector（DiagnosticCollector），不给出时使用一个新的静默收集器。
+        """
+        self.collector = self.lexer.collector = collector if collector is not None else DiagnosticCollector()
+        tokens = self.lexer.iter_tokens(source, dump)
+        if record is not None:
+            tokens = _recording(tokens, record)
+        # 建树只分配新节点、不产生循环引用，期间暂停分代 GC，免得大程序上反复扫描越来越大的堆
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            self.parse_tree = self.parser.parse(None, lexer=self.lexer.lexer, tokenfunc=partial(next, tokens, None))
+        finally:
+            if gc_enabled:
+                gc.enable()
         return self.parse_tree
-        '''
-        token_iter = iter(tokens)  # 创建 token 迭代器
 
-        def token_func():
-            try:
-                return next(token_iter)
-            except StopIteration:
-                return None
-
-        self.parse_tree = self.parser.parse(None, tokenfunc=token_func) # 传递 tokenfunc
-        tree = format_syntax_tree(self.parse_tree)
+    def parse_file(self, file_path, token_file="../result/token.txt", collector=None):
+        """分析整个文件并写出语法树；诊断和完成提示经由 collector 报告，默认静默"""
+        collector = collector if collector is not None else DiagnosticCollector()
+        with open(file_path, "r", encoding="utf-8") as f:
+            data = f.read()
+        if self.lexer.diagnostics >= DIAG_TOKENS:
+            # token 表随分析进度增量写出
+            with open(token_file, "w", encoding="utf-8") as dump:
+                dump.write(TOKEN_DUMP_HEADER)
+                self.parse(data, dump, collector=collector)
+        else:
+            self.parse(data, collector=collector)
+        collector.report(SEVERITY_NOTE, "lex-done", "词法分析完成！")
         with open("../result/tree.txt", "w", encoding="utf-8") as f:
-            f.write(tree)
+            write_syntax_tree(self.parse_tree, f)
         return self.parse_tree
 
-def print_ast(node, indent=0):
-    if isinstance(node, tuple):
-        print('  ' * indent + node[0])
-        for child in node[1:]:
-            print_ast(child, indent + 1)
-    elif node is not None:
-        print('  ' * indent + str(node))
+def print_ast(node, indent=0, out=None):
+    write = (out or sys.stdout).write
+    for depth, item, closing in walk_syntax_tree(node, indent):
+        if not closing:
+            write('  ' * depth + (item.name if isinstance(item, Node) else str(item)) + '\n')
 
 if __name__ == '__main__':
 
     parser = SNLParser()
-    parse_tree = parser.parse_file("./data/demo.txt")
+    parse_tree = parser.parse_file("./data/demo.txt", collector=DiagnosticCollector(VERBOSE_MESSAGES))
 
     if parse_tree:
         print("\n语法分析成功！")
@@ -6,9 +6,9 @@ _tabversion = '3.10'
 
 _lr_method = 'LALR'
 
-_lr_signature = 'ARRAY ASSIGN BEGIN CHAR CHARC COMMA DO DOT ELSE END ENDWH EQ FI ID IF INTC INTEGER LMIDPAREN LPAREN LT MINUS OF OVER PLUS PROCEDURE PROGRAM READ RECORD RETURN RMIDPAREN RPAREN SEMI THEN TIMES TYPE UNDERANGE VAR WHILE WRITEProgram : ProgramHead DeclarePart ProgramBody DOTProgramHead : PROGRAM ProgramNameProgramName : IDDeclarePart : TypeDec VarDec ProcDecTypeDec : TypeDec : TypeDeclarationTypeDeclaration : TYPE TypeDecListTypeDecList : TypeId EQ TypeName SEMI TypeDecMoreTypeDecMore : TypeDecMore : TypeDecListTypeId : IDTypeName : BaseTypeTypeName : StructureTypeTypeName : IDBaseType : INTEGER\n                    | CHARStructureType : ArrayType\n                         | RecTypeArrayType : ARRAY LMIDPAREN INTC UNDERANGE INTC RMIDPAREN OF BaseTypeRecType : RECORD FieldDecList ENDFieldDecList : BaseType IdList SEMI FieldDecMoreFieldDecList : ArrayType IdList SEMI FieldDecMoreFieldDecMore : FieldDecMore : FieldDecListIdList : ID IdMoreIdMore : IdMore : COMMA IdListVarDec : VarDec : VarDeclarationVarDeclaration : VAR VarDecListVarDecList : TypeName VarIdList SEMI VarDecMoreVarDecMore : VarDecMore : VarDecListVarIdList : ID VarIdMoreVarIdMore : VarIdMore : COMMA VarIdListProcDec : ProcDec : ProcDeclarationProcDeclaration : PROCEDURE ProcName LPAREN ParamList RPAREN SEMI ProcDecPart ProcBody ProcDecMoreProcDecMore : ProcDecMore : ProcDecProcName : IDParamList : ParamList : ParamDecListParamDecList : Param ParamMoreParamMore : ParamMore : SEMI ParamDecListParam : TypeName FormListParam : VAR TypeName FormListFormList : ID FidMoreFidMore : FidMore : COMMA FormListProcDecPart : DeclarePartProcBody : ProgramBodyProgramBody : BEGIN StmList ENDStmList : Stm StmMoreStmMore : StmMore : SEMI StmListStm : ConditionalStm\n               | LoopStm\n               | InputStm\n               | OutputStm\n               | ReturnStm\n               | ID AssCallAssCall : AssignmentRest\n                   | CallStmRestAssignmentRest : VariMore ASSIGN ExpConditionalStm : IF RelExp THEN StmList ELSE StmList FILoopStm : WHILE RelExp DO StmList ENDWHInputStm : READ LPAREN Invar RPARENInvar : IDOutputStm : WRITE LPAREN Exp RPARENReturnStm : RETURN LPAREN Exp RPARENCallStmRest : LPAREN ActParamList RPARENActParamList : ActParamList : Exp ActParamMoreActParamMore : ActParamMore : COMMA ActParamListRelExp : Exp OtherRelEOtherRelE : CmpOp ExpExp : Term OtherTermOtherTerm : OtherTerm : AddOp ExpTerm : Factor OtherFactorOtherFactor : OtherFactor : MultOp TermFactor : LPAREN Exp RPARENFactor : INTCFactor : VariableVariable : ID VariMoreVariMore : VariMore : LMIDPAREN Exp RMIDPARENVariMore : DOT FieldVarFieldVar : ID FieldVarMoreFieldVarMore : FieldVarMore : LMIDPAREN Exp RMIDPARENCmpOp : LT\n                 | EQAddOp : PLUS\n                 | MINUSMultOp : TIMES\n                  | OVER'
+_lr_signature = 'ARRAY ASSIGN BEGIN CHAR CHARC COMMA DO DOT ELSE END ENDWH EQ FI ID IF INTC INTEGER LMIDPAREN LPAREN LT MINUS OF OVER PLUS PROCEDURE PROGRAM READ RECORD RETURN RMIDPAREN RPAREN SEMI THEN TIMES TYPE UNDERANGE VAR WHILE WRITEProgram : ProgramHead DeclarePart ProgramBody DOTProgramHead : PROGRAM ProgramNameProgramName : IDDeclarePart : TypeDec VarDec ProcDecTypeDec : TypeDec : TypeDeclarationTypeDeclaration : TYPE TypeDecListTypeDecList : TypeDecItemTypeDecList : TypeDecList TypeDecItemTypeDecItem : TypeId EQ TypeName SEMITypeId : IDTypeName : BaseTypeTypeName : StructureTypeTypeName : IDBaseType : INTEGER\n                    | CHARStructureType : ArrayType\n                         | RecTypeArrayType : ARRAY LMIDPAREN INTC UNDERANGE INTC RMIDPAREN OF BaseTypeRecType : RECORD FieldDecList ENDFieldDecList : FieldDecItemFieldDecList : FieldDecList FieldDecItemFieldDecItem : BaseType IdList SEMI\n                        | ArrayType IdList SEMIIdList : IDIdList : IdList COMMA IDVarDec : VarDec : VarDeclarationVarDeclaration : VAR VarDecListVarDecList : VarDecItemVarDecList : VarDecList VarDecItemVarDecItem : TypeName VarIdList SEMIVarIdList : IDVarIdList : VarIdList COMMA IDProcDec : ProcDec : ProcDecListProcDecList : ProcDeclarationProcDecList : ProcDecList ProcDeclarationProcDeclaration : PROCEDURE ProcName LPAREN ParamList RPAREN SEMI ProcDecPart ProcBodyProcName : IDParamList : ParamList : ParamDecListParamDecList : ParamParamDecList : ParamDecList SEMI ParamParam : TypeName FormListParam : VAR TypeName FormListFormList : IDFormList : FormList COMMA IDProcDecPart : DeclarePartProcBody : ProgramBodyProgramBody : BEGIN StmList ENDStmList : StmStmList : StmList SEMI StmStm : ConditionalStm\n               | LoopStm\n               | InputStm\n               | OutputStm\n               | ReturnStm\n               | ID AssCallAssCall : AssignmentRest\n                   | CallStmRestAssignmentRest : VariMore ASSIGN ExpConditionalStm : IF RelExp THEN StmList ELSE StmList FILoopStm : WHILE RelExp DO StmList ENDWHInputStm : READ LPAREN Invar RPARENInvar : IDOutputStm : WRITE LPAREN Exp RPARENReturnStm : RETURN LPAREN Exp RPARENCallStmRest : LPAREN ActParamList RPARENActParamList : ActParamList : ActParamSeqActParamSeq : ExpActParamSeq : ActParamSeq COMMA ExpRelExp : Exp OtherRelEOtherRelE : CmpOp ExpExp : Term OtherTermOtherTerm : OtherTerm : AddOp ExpTerm : Factor OtherFactorOtherFactor : OtherFactor : MultOp TermFactor : LPAREN Exp RPARENFactor : INTCFactor : VariableVariable : ID VariMoreVariMore : VariMore : LMIDPAREN Exp RMIDPARENVariMore : DOT FieldVarFieldVar : ID FieldVarMoreFieldVarMore : FieldVarMore : LMIDPAREN Exp RMIDPARENCmpOp : LT\n                 | EQAddOp : PLUS\n                 | MINUSMultOp : TIMES\n                  | OVER'
     
-_lr_action_items = {'PROGRAM':([0,],[3,]),'$end':([1,18,],[0,-1,]),'VAR':([2,5,6,8,9,15,105,114,144,145,152,163,],[-5,14,-6,-2,-3,-7,135,-9,-8,-10,135,-5,]),'PROCEDURE':([2,5,6,8,9,12,13,15,35,47,106,114,136,137,144,145,163,174,175,],[-5,-28,-6,-2,-3,34,-29,-7,-30,-55,-32,-9,-31,-33,-8,-10,-5,34,-54,]),'BEGIN':([2,4,5,6,8,9,12,13,15,32,33,35,47,106,114,136,137,144,145,163,170,171,174,175,177,178,],[-5,11,-28,-6,-2,-3,-37,-29,-7,-4,-38,-30,-55,-32,-9,-31,-33,-8,-10,-5,11,-53,-37,-54,-39,-41,]),'TYPE':([2,8,9,163,],[7,-2,-3,7,]),'ID':([3,7,11,14,27,28,34,36,37,38,39,40,41,42,43,46,49,54,55,56,61,66,67,68,75,76,79,85,87,88,89,91,92,93,95,96,97,100,105,106,108,110,114,118,121,134,135,142,148,152,155,166,176,],[9,17,26,39,64,64,70,72,-12,-13,-14,-15,-16,-17,-18,39,26,64,64,84,64,102,64,64,112,112,64,26,64,-97,-98,64,-99,-100,64,-101,-102,26,39,39,72,-20,17,64,64,154,39,112,26,39,154,154,-19,]),'DOT':([10,26,47,64,],[18,56,-55,56,]),'IF':([11,49,85,100,148,],[27,27,27,27,27,]),'WHILE':([11,49,85,100,148,],[28,28,28,28,28,]),'READ':([11,49,85,100,148,],[29,29,29,29,29,]),'WRITE':([11,49,85,100,148,],[30,30,30,30,30,]),'RETURN':([11,49,85,100,148,],[31,31,31,31,31,]),'INTEGER':([14,45,46,105,106,135,140,143,152,173,],[40,40,40,40,40,40,40,40,40,40,]),'CHAR':([14,45,46,105,106,135,140,143,152,173,],[41,41,41,41,41,41,41,41,41,41,]),'ARRAY':([14,45,46,105,106,135,140,143,152,],[44,44,44,44,44,44,44,44,44,]),'RECORD':([14,46,105,106,135,152,],[45,45,45,45,45,45,]),'EQ':([16,17,58,59,60,62,63,64,83,84,90,94,99,119,120,124,125,126,161,],[46,-11,89,-82,-85,-88,-89,-91,-93,-95,-81,-84,-90,-92,-94,-83,-86,-87,-96,]),'END':([19,20,21,22,23,24,25,48,50,51,52,59,60,62,63,64,74,78,83,84,90,94,99,115,116,119,120,124,125,126,128,129,130,140,143,149,157,158,160,161,169,],[47,-57,-59,-60,-61,-62,-63,-56,-64,-65,-66,-82,-85,-88,-89,-91,110,-58,-93,-95,-81,-84,-90,-67,-74,-92,-94,-83,-86,-87,-70,-72,-73,-23,-23,-69,-21,-24,-22,-96,-68,]),'ELSE':([20,21,22,23,24,25,48,50,51,52,59,60,62,63,64,78,83,84,90,94,99,115,116,119,120,122,124,125,126,128,129,130,149,161,169,],[-57,-59,-60,-61,-62,-63,-56,-64,-65,-66,-82,-85,-88,-89,-91,-58,-93,-95,-81,-84,-90,-67,-74,-92,-94,148,-83,-86,-87,-70,-72,-73,-69,-96,-68,]),'ENDWH':([20,21,22,23,24,25,48,50,51,52,59,60,62,63,64,78,83,84,90,94,99,115,116,119,120,124,125,126,127,128,129,130,149,161,169,],[-57,-59,-60,-61,-62,-63,-56,-64,-65,-66,-82,-85,-88,-89,-91,-58,-93,-95,-81,-84,-90,-67,-74,-92,-94,-83,-86,-87,149,-70,-72,-73,-69,-96,-68,]),'FI':([20,21,22,23,24,25,48,50,51,52,59,60,62,63,64,78,83,84,90,94,99,115,116,119,120,124,125,126,128,129,130,149,161,162,169,],[-57,-59,-60,-61,-62,-63,-56,-64,-65,-66,-82,-85,-88,-89,-91,-58,-93,-95,-81,-84,-90,-67,-74,-92,-94,-83,-86,-87,-70,-72,-73,-69,-96,169,-68,]),'SEMI':([20,21,22,23,24,25,37,38,39,40,41,42,43,50,51,52,59,60,62,63,64,71,72,77,83,84,90,94,99,107,110,111,112,113,115,116,119,120,124,125,126,128,129,130,133,138,141,149,150,153,154,159,161,165,167,169,172,176,],[49,-59,-60,-61,-62,-63,-12,-13,-14,-15,-16,-17,-18,-64,-65,-66,-82,-85,-88,-89,-91,106,-35,114,-93,-95,-81,-84,-90,-34,-20,140,-26,143,-67,-74,-92,-94,-83,-86,-87,-70,-72,-73,152,-36,-25,-69,163,-48,-51,-27,-96,-50,-49,-68,-52,-19,]),'LPAREN':([26,27,28,29,30,31,54,55,61,67,68,69,70,79,87,88,89,91,92,93,95,96,97,118,121,],[54,61,61,66,67,68,61,61,61,61,61,105,-42,61,61,-97,-98,61,-99,-100,61,-101,-102,61,61,]),'ASSIGN':([26,53,83,84,119,120,161,],[-91,79,-93,-95,-92,-94,-96,]),'LMIDPAREN':([26,44,64,84,],[55,73,55,121,]),'INTC':([27,28,54,55,61,67,68,73,79,87,88,89,91,92,93,95,96,97,118,121,139,],[62,62,62,62,62,62,62,109,62,62,-97,-98,62,-99,-100,62,-101,-102,62,62,156,]),'RPAREN':([54,59,60,62,63,64,80,81,83,84,90,94,98,99,101,102,103,104,105,117,118,119,120,124,125,126,131,132,133,146,151,153,154,161,164,165,167,172,],[-75,-82,-85,-88,-89,-91,116,-77,-93,-95,-81,-84,126,-90,128,-71,129,130,-43,-76,-75,-92,-94,-83,-86,-87,150,-44,-46,-78,-45,-48,-51,-96,-47,-50,-49,-52,]),'THEN':([57,59,60,62,63,64,83,84,86,90,94,99,119,120,123,124,125,126,161,],[85,-82,-85,-88,-89,-91,-93,-95,-79,-81,-84,-90,-92,-94,-80,-83,-86,-87,-96,]),'LT':([58,59,60,62,63,64,83,84,90,94,99,119,120,124,125,126,161,],[88,-82,-85,-88,-89,-91,-93,-95,-81,-84,-90,-92,-94,-83,-86,-87,-96,]),'COMMA':([59,60,62,63,64,72,81,83,84,90,94,99,112,119,120,124,125,126,154,161,],[-82,-85,-88,-89,-91,108,118,-93,-95,-81,-84,-90,142,-92,-94,-83,-86,-87,166,-96,]),'RMIDPAREN':([59,60,62,63,64,82,83,84,90,94,99,119,120,124,125,126,147,156,161,],[-82,-85,-88,-89,-91,119,-93,-95,-81,-84,-90,-92,-94,-83,-86,-87,161,168,-96,]),'DO':([59,60,62,63,64,65,83,84,86,90,94,99,119,120,123,124,125,126,161,],[-82,-85,-88,-89,-91,100,-93,-95,-79,-81,-84,-90,-92,-94,-80,-83,-86,-87,-96,]),'PLUS':([59,60,62,63,64,83,84,94,99,119,120,125,126,161,],[92,-85,-88,-89,-91,-93,-95,-84,-90,-92,-94,-86,-87,-96,]),'MINUS':([59,60,62,63,64,83,84,94,99,119,120,125,126,161,],[93,-85,-88,-89,-91,-93,-95,-84,-90,-92,-94,-86,-87,-96,]),'TIMES':([60,62,63,64,83,84,99,119,120,126,161,],[96,-88,-89,-91,-93,-95,-90,-92,-94,-87,-96,]),'OVER':([60,62,63,64,83,84,99,119,120,126,161,],[97,-88,-89,-91,-93,-95,-90,-92,-94,-87,-96,]),'UNDERANGE':([109,],[139,]),'OF':([168,],[173,]),}
+_lr_action_items = {'PROGRAM':([0,],[3,]),'$end':([1,19,],[0,-1,]),'VAR':([2,5,6,8,9,15,16,49,112,121,152,160,],[-5,14,-6,-2,-3,-7,-8,-9,141,-10,141,-5,]),'PROCEDURE':([2,5,6,8,9,12,13,15,16,34,35,37,38,49,51,72,75,113,121,160,170,171,],[-5,-27,-6,-2,-3,36,-28,-7,-8,36,-37,-29,-30,-9,-51,-38,-31,-32,-10,-5,-39,-50,]),'BEGIN':([2,4,5,6,8,9,12,13,15,16,33,34,35,37,38,49,51,72,75,113,121,160,166,167,170,171,],[-5,11,-27,-6,-2,-3,-35,-28,-7,-8,-4,-36,-37,-29,-30,-9,-51,-38,-31,-32,-10,-5,11,-49,-39,-50,]),'TYPE':([2,8,9,160,],[7,-2,-3,7,]),'ID':([3,7,11,14,15,16,28,29,36,37,38,39,40,41,42,43,44,45,46,49,50,52,57,58,59,64,69,70,71,75,81,82,85,92,94,95,96,98,99,100,102,103,104,107,112,113,114,116,121,124,127,140,141,145,149,152,155,162,172,],[9,18,27,42,18,-8,67,67,74,42,-30,77,-12,-13,-14,-15,-16,-17,-18,-9,42,27,67,67,91,67,109,67,67,-31,119,119,67,27,67,-92,-93,67,-94,-95,67,-96,-97,27,42,-32,142,-20,-10,67,67,154,42,157,27,42,154,168,-19,]),'DOT':([10,27,51,67,],[19,59,-51,59,]),'IF':([11,52,92,107,149,],[28,28,28,28,28,]),'WHILE':([11,52,92,107,149,],[29,29,29,29,29,]),'READ':([11,52,92,107,149,],[30,30,30,30,30,]),'WRITE':([11,52,92,107,149,],[31,31,31,31,31,]),'RETURN':([11,52,92,107,149,],[32,32,32,32,32,]),'INTEGER':([14,37,38,48,50,75,79,80,112,113,117,141,144,146,152,169,],[43,43,-30,43,43,-31,43,-21,43,-32,-22,43,-23,-24,43,43,]),'CHAR':([14,37,38,48,50,75,79,80,112,113,117,141,144,146,152,169,],[44,44,-30,44,44,-31,44,-21,44,-32,-22,44,-23,-24,44,44,]),'ARRAY':([14,37,38,48,50,75,79,80,112,113,117,141,144,146,152,],[47,47,-30,47,47,-31,47,-21,47,-32,-22,47,-23,-24,47,]),'RECORD':([14,37,38,50,75,112,113,141,152,],[48,48,-30,48,-31,48,-32,48,48,]),'EQ':([17,18,61,62,63,65,66,67,90,91,97,101,106,125,126,130,131,132,158,],[50,-11,96,-77,-80,-83,-84,-86,-88,-90,-76,-79,-85,-87,-89,-78,-81,-82,-91,]),'END':([20,21,22,23,24,25,26,53,54,55,62,63,65,66,67,79,80,84,90,91,97,101,106,117,122,123,125,126,130,131,132,134,135,136,144,146,150,158,165,],[51,-52,-54,-55,-56,-57,-58,-59,-60,-61,-77,-80,-83,-84,-86,116,-21,-53,-88,-90,-76,-79,-85,-22,-62,-69,-87,-89,-78,-81,-82,-65,-67,-68,-23,-24,-64,-91,-63,]),'SEMI':([20,21,22,23,24,25,26,40,41,42,43,44,45,46,53,54,55,62,63,65,66,67,76,77,83,84,90,91,97,101,106,116,118,119,120,122,123,125,126,128,130,131,132,133,134,135,136,138,139,142,150,151,153,154,157,158,159,161,163,165,168,172,],[52,-52,-54,-55,-56,-57,-58,-12,-13,-14,-15,-16,-17,-18,-59,-60,-61,-77,-80,-83,-84,-86,113,-33,121,-53,-88,-90,-76,-79,-85,-20,144,-25,146,-62,-69,-87,-89,52,-78,-81,-82,52,-65,-67,-68,152,-43,-34,-64,160,-45,-47,-26,-91,52,-44,-46,-63,-48,-19,]),'ELSE':([21,22,23,24,25,26,53,54,55,62,63,65,66,67,84,90,91,97,101,106,122,123,125,126,128,130,131,132,134,135,136,150,158,165,],[-52,-54,-55,-56,-57,-58,-59,-60,-61,-77,-80,-83,-84,-86,-53,-88,-90,-76,-79,-85,-62,-69,-87,-89,149,-78,-81,-82,-65,-67,-68,-64,-91,-63,]),'ENDWH':([21,22,23,24,25,26,53,54,55,62,63,65,66,67,84,90,91,97,101,106,122,123,125,126,130,131,132,133,134,135,136,150,158,165,],[-52,-54,-55,-56,-57,-58,-59,-60,-61,-77,-80,-83,-84,-86,-53,-88,-90,-76,-79,-85,-62,-69,-87,-89,-78,-81,-82,150,-65,-67,-68,-64,-91,-63,]),'FI':([21,22,23,24,25,26,53,54,55,62,63,65,66,67,84,90,91,97,101,106,122,123,125,126,130,131,132,134,135,136,150,158,159,165,],[-52,-54,-55,-56,-57,-58,-59,-60,-61,-77,-80,-83,-84,-86,-53,-88,-90,-76,-79,-85,-62,-69,-87,-89,-78,-81,-82,-65,-67,-68,-64,-91,165,-63,]),'LPAREN':([27,28,29,30,31,32,57,58,64,70,71,73,74,85,94,95,96,98,99,100,102,103,104,124,127,],[57,64,64,69,70,71,64,64,64,64,64,112,-40,64,64,-92,-93,64,-94,-95,64,-96,-97,64,64,]),'ASSIGN':([27,56,90,91,125,126,158,],[-86,85,-88,-90,-87,-89,-91,]),'LMIDPAREN':([27,47,67,91,],[58,78,58,127,]),'INTC':([28,29,57,58,64,70,71,78,85,94,95,96,98,99,100,102,103,104,124,127,143,],[65,65,65,65,65,65,65,115,65,65,-92,-93,65,-94,-95,65,-96,-97,65,65,156,]),'RPAREN':([57,62,63,65,66,67,86,87,88,90,91,97,101,105,106,108,109,110,111,112,125,126,130,131,132,137,138,139,147,153,154,158,161,163,168,],[-70,-77,-80,-83,-84,-86,123,-71,-72,-88,-90,-76,-79,132,-85,134,-66,135,136,-41,-87,-89,-78,-81,-82,151,-42,-43,-73,-45,-47,-91,-44,-46,-48,]),'THEN':([60,62,63,65,66,67,90,91,93,97,101,106,125,126,129,130,131,132,158,],[92,-77,-80,-83,-84,-86,-88,-90,-74,-76,-79,-85,-87,-89,-75,-78,-81,-82,-91,]),'LT':([61,62,63,65,66,67,90,91,97,101,106,125,126,130,131,132,158,],[95,-77,-80,-83,-84,-86,-88,-90,-76,-79,-85,-87,-89,-78,-81,-82,-91,]),'COMMA':([62,63,65,66,67,76,77,87,88,90,91,97,101,106,118,119,120,125,126,130,131,132,142,147,153,154,157,158,163,168,],[-77,-80,-83,-84,-86,114,-33,124,-72,-88,-90,-76,-79,-85,145,-25,145,-87,-89,-78,-81,-82,-34,-73,162,-47,-26,-91,162,-48,]),'RMIDPAREN':([62,63,65,66,67,89,90,91,97,101,106,125,126,130,131,132,148,156,158,],[-77,-80,-83,-84,-86,125,-88,-90,-76,-79,-85,-87,-89,-78,-81,-82,158,164,-91,]),'DO':([62,63,65,66,67,68,90,91,93,97,101,106,125,126,129,130,131,132,158,],[-77,-80,-83,-84,-86,107,-88,-90,-74,-76,-79,-85,-87,-89,-75,-78,-81,-82,-91,]),'PLUS':([62,63,65,66,67,90,91,101,106,125,126,131,132,158,],[99,-80,-83,-84,-86,-88,-90,-79,-85,-87,-89,-81,-82,-91,]),'MINUS':([62,63,65,66,67,90,91,101,106,125,126,131,132,158,],[100,-80,-83,-84,-86,-88,-90,-79,-85,-87,-89,-81,-82,-91,]),'TIMES':([63,65,66,67,90,91,106,125,126,132,158,],[103,-83,-84,-86,-88,-90,-85,-87,-89,-82,-91,]),'OVER':([63,65,66,67,90,91,106,125,126,132,158,],[104,-83,-84,-86,-88,-90,-85,-87,-89,-82,-91,]),'UNDERANGE':([115,],[143,]),'OF':([164,],[169,]),}
 
 _lr_action = {}
 for _k, _v in _lr_action_items.items():
@@ -17,7 +17,7 @@ for _k, _v in _lr_action_items.items():
       _lr_action[_x][_k] = _y
 del _lr_action_items
 
-_lr_goto_items = {'Program':([0,],[1,]),'ProgramHead':([0,],[2,]),'DeclarePart':([2,163,],[4,171,]),'TypeDec':([2,163,],[5,5,]),'TypeDeclaration':([2,163,],[6,6,]),'ProgramName':([3,],[8,]),'ProgramBody':([4,170,],[10,175,]),'VarDec':([5,],[12,]),'VarDeclaration':([5,],[13,]),'TypeDecList':([7,114,],[15,145,]),'TypeId':([7,114,],[16,16,]),'StmList':([11,49,85,100,148,],[19,78,122,127,162,]),'Stm':([11,49,85,100,148,],[20,20,20,20,20,]),'ConditionalStm':([11,49,85,100,148,],[21,21,21,21,21,]),'LoopStm':([11,49,85,100,148,],[22,22,22,22,22,]),'InputStm':([11,49,85,100,148,],[23,23,23,23,23,]),'OutputStm':([11,49,85,100,148,],[24,24,24,24,24,]),'ReturnStm':([11,49,85,100,148,],[25,25,25,25,25,]),'ProcDec':([12,174,],[32,178,]),'ProcDeclaration':([12,174,],[33,33,]),'VarDecList':([14,106,],[35,137,]),'TypeName':([14,46,105,106,135,152,],[36,77,134,36,155,134,]),'BaseType':([14,45,46,105,106,135,140,143,152,173,],[37,75,37,37,37,37,75,75,37,176,]),'StructureType':([14,46,105,106,135,152,],[38,38,38,38,38,38,]),'ArrayType':([14,45,46,105,106,135,140,143,152,],[42,76,42,42,42,42,76,76,42,]),'RecType':([14,46,105,106,135,152,],[43,43,43,43,43,43,]),'StmMore':([20,],[48,]),'AssCall':([26,],[50,]),'AssignmentRest':([26,],[51,]),'CallStmRest':([26,],[52,]),'VariMore':([26,64,],[53,99,]),'RelExp':([27,28,],[57,65,]),'Exp':([27,28,54,55,61,67,68,79,87,91,118,121,],[58,58,81,82,98,103,104,115,123,124,81,147,]),'Term':([27,28,54,55,61,67,68,79,87,91,95,118,121,],[59,59,59,59,59,59,59,59,59,59,125,59,59,]),'Factor':([27,28,54,55,61,67,68,79,87,91,95,118,121,],[60,60,60,60,60,60,60,60,60,60,60,60,60,]),'Variable':([27,28,54,55,61,67,68,79,87,91,95,118,121,],[63,63,63,63,63,63,63,63,63,63,63,63,63,]),'ProcName':([34,],[69,]),'VarIdList':([36,108,],[71,138,]),'FieldDecList':([45,140,143,],[74,158,158,]),'ActParamList':([54,118,],[80,146,]),'FieldVar':([56,],[83,]),'OtherRelE':([58,],[86,]),'CmpOp':([58,],[87,]),'OtherTerm':([59,],[90,]),'AddOp':([59,],[91,]),'OtherFactor':([60,],[94,]),'MultOp':([60,],[95,]),'Invar':([66,],[101,]),'VarIdMore':([72,],[107,]),'IdList':([75,76,142,],[111,113,159,]),'ActParamMore':([81,],[117,]),'FieldVarMore':([84,],[120,]),'ParamList':([105,],[131,]),'ParamDecList':([105,152,],[132,164,]),'Param':([105,152,],[133,133,]),'VarDecMore':([106,],[136,]),'IdMore':([112,],[141,]),'TypeDecMore':([114,],[144,]),'ParamMore':([133,],[151,]),'FormList':([134,155,166,],[153,167,172,]),'FieldDecMore':([140,143,],[157,160,]),'FidMore':([154,],[165,]),'ProcDecPart':([163,],[170,]),'ProcBody':([170,],[174,]),'ProcDecMore':([174,],[177,]),}
+_lr_goto_items = {'Program':([0,],[1,]),'ProgramHead':([0,],[2,]),'DeclarePart':([2,160,],[4,167,]),'TypeDec':([2,160,],[5,5,]),'TypeDeclaration':([2,160,],[6,6,]),'ProgramName':([3,],[8,]),'ProgramBody':([4,166,],[10,171,]),'VarDec':([5,],[12,]),'VarDeclaration':([5,],[13,]),'TypeDecList':([7,],[15,]),'TypeDecItem':([7,15,],[16,49,]),'TypeId':([7,15,],[17,17,]),'StmList':([11,92,107,149,],[20,128,133,159,]),'Stm':([11,52,92,107,149,],[21,84,21,21,21,]),'ConditionalStm':([11,52,92,107,149,],[22,22,22,22,22,]),'LoopStm':([11,52,92,107,149,],[23,23,23,23,23,]),'InputStm':([11,52,92,107,149,],[24,24,24,24,24,]),'OutputStm':([11,52,92,107,149,],[25,25,25,25,25,]),'ReturnStm':([11,52,92,107,149,],[26,26,26,26,26,]),'ProcDec':([12,],[33,]),'ProcDecList':([12,],[34,]),'ProcDeclaration':([12,34,],[35,72,]),'VarDecList':([14,],[37,]),'VarDecItem':([14,37,],[38,75,]),'TypeName':([14,37,50,112,141,152,],[39,39,83,140,155,140,]),'BaseType':([14,37,48,50,79,112,141,152,169,],[40,40,81,40,81,40,40,40,172,]),'StructureType':([14,37,50,112,141,152,],[41,41,41,41,41,41,]),'ArrayType':([14,37,48,50,79,112,141,152,],[45,45,82,45,82,45,45,45,]),'RecType':([14,37,50,112,141,152,],[46,46,46,46,46,46,]),'AssCall':([27,],[53,]),'AssignmentRest':([27,],[54,]),'CallStmRest':([27,],[55,]),'VariMore':([27,67,],[56,106,]),'RelExp':([28,29,],[60,68,]),'Exp':([28,29,57,58,64,70,71,85,94,98,124,127,],[61,61,88,89,105,110,111,122,129,130,147,148,]),'Term':([28,29,57,58,64,70,71,85,94,98,102,124,127,],[62,62,62,62,62,62,62,62,62,62,131,62,62,]),'Factor':([28,29,57,58,64,70,71,85,94,98,102,124,127,],[63,63,63,63,63,63,63,63,63,63,63,63,63,]),'Variable':([28,29,57,58,64,70,71,85,94,98,102,124,127,],[66,66,66,66,66,66,66,66,66,66,66,66,66,]),'ProcName':([36,],[73,]),'VarIdList':([39,],[76,]),'FieldDecList':([48,],[79,]),'FieldDecItem':([48,79,],[80,117,]),'ActParamList':([57,],[86,]),'ActParamSeq':([57,],[87,]),'FieldVar':([59,],[90,]),'OtherRelE':([61,],[93,]),'CmpOp':([61,],[94,]),'OtherTerm':([62,],[97,]),'AddOp':([62,],[98,]),'OtherFactor':([63,],[101,]),'MultOp':([63,],[102,]),'Invar':([69,],[108,]),'IdList':([81,82,],[118,120,]),'FieldVarMore':([91,],[126,]),'ParamList':([112,],[137,]),'ParamDecList':([112,],[138,]),'Param':([112,152,],[139,161,]),'FormList':([140,155,],[153,163,]),'ProcDecPart':([160,],[166,]),'ProcBody':([166,],[170,]),}
 
 _lr_goto = {}
 for _k, _v in _lr_goto_items.items():
@@ -27,106 +27,101 @@ for _k, _v in _lr_goto_items.items():
 del _lr_goto_items
 _lr_productions = [
   ("S' -> Program","S'",1,None,None,None),
-  ('Program -> ProgramHead DeclarePart ProgramBody DOT','Program',4,'p_Program','parser.py',14),
-  ('ProgramHead -> PROGRAM ProgramName','ProgramHead',2,'p_ProgramHead','parser.py',19),
-  ('ProgramName -> ID','ProgramName',1,'p_ProgramName','parser.py',24),
-  ('DeclarePart -> TypeDec VarDec ProcDec','DeclarePart',3,'p_DeclarePart','parser.py',29),
-  ('TypeDec -> <empty>','TypeDec',0,'p_TypeDec_empty','parser.py',34),
-  ('TypeDec -> TypeDeclaration','TypeDec',1,'p_TypeDec_declaration','parser.py',38),
-  ('TypeDeclaration -> TYPE TypeDecList','TypeDeclaration',2,'p_TypeDeclaration','parser.py',43),
-  ('TypeDecList -> TypeId EQ TypeName SEMI TypeDecMore','TypeDecList',5,'p_TypeDecList','parser.py',48),
-  ('TypeDecMore -> <empty>','TypeDecMore',0,'p_TypeDecMore_empty','parser.py',53),
-  ('TypeDecMore -> TypeDecList','TypeDecMore',1,'p_TypeDecMore_list','parser.py',57),
-  ('TypeId -> ID','TypeId',1,'p_TypeId','parser.py',62),
-  ('TypeName -> BaseType','TypeName',1,'p_TypeName_base','parser.py',67),
-  ('TypeName -> StructureType','TypeName',1,'p_TypeName_structure','parser.py',71),
-  ('TypeName -> ID','TypeName',1,'p_TypeName_id','parser.py',75),
-  ('BaseType -> INTEGER','BaseType',1,'p_BaseType','parser.py',80),
-  ('BaseType -> CHAR','BaseType',1,'p_BaseType','parser.py',81),
-  ('StructureType -> ArrayType','StructureType',1,'p_StructureType','parser.py',86),
-  ('StructureType -> RecType','StructureType',1,'p_StructureType','parser.py',87),
-  ('ArrayType -> ARRAY LMIDPAREN INTC UNDERANGE INTC RMIDPAREN OF BaseType','ArrayType',8,'p_ArrayType','parser.py',92),
-  ('RecType -> RECORD FieldDecList END','RecType',3,'p_RecType','parser.py',97),
-  ('FieldDecList -> BaseType IdList SEMI FieldDecMore','FieldDecList',4,'p_FieldDecList_base','parser.py',102),
-  ('FieldDecList -> ArrayType IdList SEMI FieldDecMore','FieldDecList',4,'p_FieldDecList_array','parser.py',106),
-  ('FieldDecMore -> <empty>','FieldDecMore',0,'p_FieldDecMore_empty','parser.py',111),
-  ('FieldDecMore -> FieldDecList','FieldDecMore',1,'p_FieldDecMore_list','parser.py',115),
-  ('IdList -> ID IdMore','IdList',2,'p_IdList','parser.py',120),
-  ('IdMore -> <empty>','IdMore',0,'p_IdMore_empty','parser.py',125),
-  ('IdMore -> COMMA IdList','IdMore',2,'p_IdMore_list','parser.py',129),
-  ('VarDec -> <empty>','VarDec',0,'p_VarDec_empty','parser.py',134),
-  ('VarDec -> VarDeclaration','VarDec',1,'p_VarDec_declaration','parser.py',138),
-  ('VarDeclaration -> VAR VarDecList','VarDeclaration',2,'p_VarDeclaration','parser.py',143),
-  ('VarDecList -> TypeName VarIdList SEMI VarDecMore','VarDecList',4,'p_VarDecList','parser.py',148),
-  ('VarDecMore -> <empty>','VarDecMore',0,'p_VarDecMore_empty','parser.py',153),
-  ('VarDecMore -> VarDecList','VarDecMore',1,'p_VarDecMore_list','parser.py',157),
-  ('VarIdList -> ID VarIdMore','VarIdList',2,'p_VarIdList','parser.py',162),
-  ('VarIdMore -> <empty>','VarIdMore',0,'p_VarIdMore_empty','parser.py',167),
-  ('VarIdMore -> COMMA VarIdList','VarIdMore',2,'p_VarIdMore_list','parser.py',171),
-  ('ProcDec -> <empty>','ProcDec',0,'p_ProcDec_empty','parser.py',176),
-  ('ProcDec -> ProcDeclaration','ProcDec',1,'p_ProcDec_declaration','parser.py',180),
-  ('ProcDeclaration -> PROCEDURE ProcName LPAREN ParamList RPAREN SEMI ProcDecPart ProcBody ProcDecMore','ProcDeclaration',9,'p_ProcDeclaration','parser.py',185),
-  ('ProcDecMore -> <empty>','ProcDecMore',0,'p_ProcDecMore_empty','parser.py',190),
-  ('ProcDecMore -> ProcDec','ProcDecMore',1,'p_ProcDecMore_proc','parser.py',194),
-  ('ProcName -> ID','ProcName',1,'p_ProcName','parser.py',199),
-  ('ParamList -> <empty>','ParamList',0,'p_ParamList_empty','parser.py',204),
-  ('ParamList -> ParamDecList','ParamList',1,'p_ParamList_list','parser.py',208),
-  ('ParamDecList -> Param ParamMore','ParamDecList',2,'p_ParamDecList','parser.py',213),
-  ('ParamMore -> <empty>','ParamMore',0,'p_ParamMore_empty','parser.py',218),
-  ('ParamMore -> SEMI ParamDecList','ParamMore',2,'p_ParamMore_list','parser.py',222),
-  ('Param -> TypeName FormList','Param',2,'p_Param_type','parser.py',227),
-  ('Param -> VAR TypeName FormList','Param',3,'p_Param_var','parser.py',231),
-  ('FormList -> ID FidMore','FormList',2,'p_FormList','parser.py',236),
-  ('FidMore -> <empty>','FidMore',0,'p_FidMore_empty','parser.py',241),
-  ('FidMore -> COMMA FormList','FidMore',2,'p_FidMore_list','parser.py',245),
-  ('ProcDecPart -> DeclarePart','ProcDecPart',1,'p_ProcDecPart','parser.py',250),
-  ('ProcBody -> ProgramBody','ProcBody',1,'p_ProcBody','parser.py',255),
-  ('ProgramBody -> BEGIN StmList END','ProgramBody',3,'p_ProgramBody','parser.py',260),
-  ('StmList -> Stm StmMore','StmList',2,'p_StmList','parser.py',265),
-  ('StmMore -> <empty>','StmMore',0,'p_StmMore_empty','parser.py',270),
-  ('StmMore -> SEMI StmList','StmMore',2,'p_StmMore_list','parser.py',274),
-  ('Stm -> ConditionalStm','Stm',1,'p_Stm','parser.py',279),
-  ('Stm -> LoopStm','Stm',1,'p_Stm','parser.py',280),
-  ('Stm -> InputStm','Stm',1,'p_Stm','parser.py',281),
-  ('Stm -> OutputStm','Stm',1,'p_Stm','parser.py',282),
-  ('Stm -> ReturnStm','Stm',1,'p_Stm','parser.py',283),
-  ('Stm -> ID AssCall','Stm',2,'p_Stm','parser.py',284),
-  ('AssCall -> AssignmentRest','AssCall',1,'p_AssCall','parser.py',292),
-  ('AssCall -> CallStmRest','AssCall',1,'p_AssCall','parser.py',293),
-  ('AssignmentRest -> VariMore ASSIGN Exp','AssignmentRest',3,'p_AssignmentRest','parser.py',298),
-  ('ConditionalStm -> IF RelExp THEN StmList ELSE StmList FI','ConditionalStm',7,'p_ConditionalStm','parser.py',303),
-  ('LoopStm -> WHILE RelExp DO StmList ENDWH','LoopStm',5,'p_LoopStm','parser.py',308),
-  ('InputStm -> READ LPAREN Invar RPAREN','InputStm',4,'p_InputStm','parser.py',313),
-  ('Invar -> ID','Invar',1,'p_Invar','parser.py',318),
-  ('OutputStm -> WRITE LPAREN Exp RPAREN','OutputStm',4,'p_OutputStm','parser.py',323),
-  ('ReturnStm -> RETURN LPAREN Exp RPAREN','ReturnStm',4,'p_ReturnStm','parser.py',328),
-  ('CallStmRest -> LPAREN ActParamList RPAREN','CallStmRest',3,'p_CallStmRest','parser.py',333),
-  ('ActParamList -> <empty>','ActParamList',0,'p_ActParamList_empty','parser.py',338),
-  ('ActParamList -> Exp ActParamMore','ActParamList',2,'p_ActParamList_list','parser.py',342),
-  ('ActParamMore -> <empty>','ActParamMore',0,'p_ActParamMore_empty','parser.py',347),
-  ('ActParamMore -> COMMA ActParamList','ActParamMore',2,'p_ActParamMore_list','parser.py',351),
-  ('RelExp -> Exp OtherRelE','RelExp',2,'p_RelExp','parser.py',356),
-  ('OtherRelE -> CmpOp Exp','OtherRelE',2,'p_OtherRelE','parser.py',361),
-  ('Exp -> Term OtherTerm','Exp',2,'p_Exp','parser.py',366),
-  ('OtherTerm -> <empty>','OtherTerm',0,'p_OtherTerm_empty','parser.py',371),
-  ('OtherTerm -> AddOp Exp','OtherTerm',2,'p_OtherTerm_list','parser.py',375),
-  ('Term -> Factor OtherFactor','Term',2,'p_Term','parser.py',380),
-  ('OtherFactor -> <empty>','OtherFactor',0,'p_OtherFactor_empty','parser.py',385),
-  ('OtherFactor -> MultOp Term','OtherFactor',2,'p_OtherFactor_list','parser.py',389),
-  ('Factor -> LPAREN Exp RPAREN','Factor',3,'p_Factor_paren','parser.py',394),
-  ('Factor -> INTC','Factor',1,'p_Factor_intc','parser.py',398),
-  ('Factor -> Variable','Factor',1,'p_Factor_variable','parser.py',402),
-  ('Variable -> ID VariMore','Variable',2,'p_Variable','parser.py',407),
-  ('VariMore -> <empty>','VariMore',0,'p_VariMore_empty','parser.py',412),
-  ('VariMore -> LMIDPAREN Exp RMIDPAREN','VariMore',3,'p_VariMore_index','parser.py',416),
-  ('VariMore -> DOT FieldVar','VariMore',2,'p_VariMore_field','parser.py',420),
-  ('FieldVar -> ID FieldVarMore','FieldVar',2,'p_FieldVar','parser.py',425),
-  ('FieldVarMore -> <empty>','FieldVarMore',0,'p_FieldVarMore_empty','parser.py',430),
-  ('FieldVarMore -> LMIDPAREN Exp RMIDPAREN','FieldVarMore',3,'p_FieldVarMore_index','parser.py',434),
-  ('CmpOp -> LT','CmpOp',1,'p_CmpOp','parser.py',439),
-  ('CmpOp -> EQ','CmpOp',1,'p_CmpOp','parser.py',440),
-  ('AddOp -> PLUS','AddOp',1,'p_AddOp','parser.py',445),
-  ('AddOp -> MINUS','AddOp',1,'p_AddOp','parser.py',446),
-  ('MultOp -> TIMES','MultOp',1,'p_MultOp','parser.py',451),
-  ('MultOp -> OVER','MultOp',1,'p_MultOp','parser.py',452),
+  ('Program -> ProgramHead DeclarePart ProgramBody DOT','Program',4,'p_Program','parser.py',92),
+  ('ProgramHead -> PROGRAM ProgramName','ProgramHead',2,'p_ProgramHead','parser.py',97),
+  ('ProgramName -> ID','ProgramName',1,'p_ProgramName','parser.py',102),
+  ('DeclarePart -> TypeDec VarDec ProcDec','DeclarePart',3,'p_DeclarePart','parser.py',107),
+  ('TypeDec -> <empty>','TypeDec',0,'p_TypeDec_empty','parser.py',112),
+  ('TypeDec -> TypeDeclaration','TypeDec',1,'p_TypeDec_declaration','parser.py',116),
+  ('TypeDeclaration -> TYPE TypeDecList','TypeDeclaration',2,'p_TypeDeclaration','parser.py',121),
+  ('TypeDecList -> TypeDecItem','TypeDecList',1,'p_TypeDecList_item','parser.py',127),
+  ('TypeDecList -> TypeDecList TypeDecItem','TypeDecList',2,'p_TypeDecList_list','parser.py',131),
+  ('TypeDecItem -> TypeId EQ TypeName SEMI','TypeDecItem',4,'p_TypeDecItem','parser.py',137),
+  ('TypeId -> ID','TypeId',1,'p_TypeId','parser.py',142),
+  ('TypeName -> BaseType','TypeName',1,'p_TypeName_base','parser.py',147),
+  ('TypeName -> StructureType','TypeName',1,'p_TypeName_structure','parser.py',151),
+  ('TypeName -> ID','TypeName',1,'p_TypeName_id','parser.py',155),
+  ('BaseType -> INTEGER','BaseType',1,'p_BaseType','parser.py',160),
+  ('BaseType -> CHAR','BaseType',1,'p_BaseType','parser.py',161),
+  ('StructureType -> ArrayType','StructureType',1,'p_StructureType','parser.py',166),
+  ('StructureType -> RecType','StructureType',1,'p_StructureType','parser.py',167),
+  ('ArrayType -> ARRAY LMIDPAREN INTC UNDERANGE INTC RMIDPAREN OF BaseType','ArrayType',8,'p_ArrayType','parser.py',172),
+  ('RecType -> RECORD FieldDecList END','RecType',3,'p_RecType','parser.py',177),
+  ('FieldDecList -> FieldDecItem','FieldDecList',1,'p_FieldDecList_item','parser.py',182),
+  ('FieldDecList -> FieldDecList FieldDecItem','FieldDecList',2,'p_FieldDecList_list','parser.py',186),
+  ('FieldDecItem -> BaseType IdList SEMI','FieldDecItem',3,'p_FieldDecItem','parser.py',192),
+  ('FieldDecItem -> ArrayType IdList SEMI','FieldDecItem',3,'p_FieldDecItem','parser.py',193),
+  ('IdList -> ID','IdList',1,'p_IdList_id','parser.py',198),
+  ('IdList -> IdList COMMA ID','IdList',3,'p_IdList_list','parser.py',202),
+  ('VarDec -> <empty>','VarDec',0,'p_VarDec_empty','parser.py',208),
+  ('VarDec -> VarDeclaration','VarDec',1,'p_VarDec_declaration','parser.py',212),
+  ('VarDeclaration -> VAR VarDecList','VarDeclaration',2,'p_VarDeclaration','parser.py',217),
+  ('VarDecList -> VarDecItem','VarDecList',1,'p_VarDecList_item','parser.py',222),
+  ('VarDecList -> VarDecList VarDecItem','VarDecList',2,'p_VarDecList_list','parser.py',226),
+  ('VarDecItem -> TypeName VarIdList SEMI','VarDecItem',3,'p_VarDecItem','parser.py',232),
+  ('VarIdList -> ID','VarIdList',1,'p_VarIdList_id','parser.py',237),
+  ('VarIdList -> VarIdList COMMA ID','VarIdList',3,'p_VarIdList_list','parser.py',241),
+  ('ProcDec -> <empty>','ProcDec',0,'p_ProcDec_empty','parser.py',247),
+  ('ProcDec -> ProcDecList','ProcDec',1,'p_ProcDec_declaration','parser.py',251),
+  ('ProcDecList -> ProcDeclaration','ProcDecList',1,'p_ProcDecList_item','parser.py',256),
+  ('ProcDecList -> ProcDecList ProcDeclaration','ProcDecList',2,'p_ProcDecList_list','parser.py',260),
+  ('ProcDeclaration -> PROCEDURE ProcName LPAREN ParamList RPAREN SEMI ProcDecPart ProcBody','ProcDeclaration',8,'p_ProcDeclaration','parser.py',266),
+  ('ProcName -> ID','ProcName',1,'p_ProcName','parser.py',271),
+  ('ParamList -> <empty>','ParamList',0,'p_ParamList_empty','parser.py',276),
+  ('ParamList -> ParamDecList','ParamList',1,'p_ParamList_list','parser.py',280),
+  ('ParamDecList -> Param','ParamDecList',1,'p_ParamDecList_param','parser.py',285),
+  ('ParamDecList -> ParamDecList SEMI Param','ParamDecList',3,'p_ParamDecList_list','parser.py',289),
+  ('Param -> TypeName FormList','Param',2,'p_Param_type','parser.py',295),
+  ('Param -> VAR TypeName FormList','Param',3,'p_Param_var','parser.py',299),
+  ('FormList -> ID','FormList',1,'p_FormList_id','parser.py',304),
+  ('FormList -> FormList COMMA ID','FormList',3,'p_FormList_list','parser.py',308),
+  ('ProcDecPart -> DeclarePart','ProcDecPart',1,'p_ProcDecPart','parser.py',314),
+  ('ProcBody -> ProgramBody','ProcBody',1,'p_ProcBody','parser.py',319),
+  ('ProgramBody -> BEGIN StmList END','ProgramBody',3,'p_ProgramBody','parser.py',324),
+  ('StmList -> Stm','StmList',1,'p_StmList_stm','parser.py',329),
+  ('StmList -> StmList SEMI Stm','StmList',3,'p_StmList_list','parser.py',333),
+  ('Stm -> ConditionalStm','Stm',1,'p_Stm','parser.py',339),
+  ('Stm -> LoopStm','Stm',1,'p_Stm','parser.py',340),
+  ('Stm -> InputStm','Stm',1,'p_Stm','parser.py',341),
+  ('Stm -> OutputStm','Stm',1,'p_Stm','parser.py',342),
+  ('Stm -> ReturnStm','Stm',1,'p_Stm','parser.py',343),
+  ('Stm -> ID AssCall','Stm',2,'p_Stm','parser.py',344),
+  ('AssCall -> AssignmentRest','AssCall',1,'p_AssCall','parser.py',352),
+  ('AssCall -> CallStmRest','AssCall',1,'p_AssCall','parser.py',353),
+  ('AssignmentRest -> VariMore ASSIGN Exp','AssignmentRest',3,'p_AssignmentRest','parser.py',358),
+  ('ConditionalStm -> IF RelExp THEN StmList ELSE StmList FI','ConditionalStm',7,'p_ConditionalStm','parser.py',363),
+  ('LoopStm -> WHILE RelExp DO StmList ENDWH','LoopStm',5,'p_LoopStm','parser.py',368),
+  ('InputStm -> READ LPAREN Invar RPAREN','InputStm',4,'p_InputStm','parser.py',373),
+  ('Invar -> ID','Invar',1,'p_Invar','parser.py',378),
+  ('OutputStm -> WRITE LPAREN Exp RPAREN','OutputStm',4,'p_OutputStm','parser.py',383),
+  ('ReturnStm -> RETURN LPAREN Exp RPAREN','ReturnStm',4,'p_ReturnStm','parser.py',388),
+  ('CallStmRest -> LPAREN ActParamList RPAREN','CallStmRest',3,'p_CallStmRest','parser.py',393),
+  ('ActParamList -> <empty>','ActParamList',0,'p_ActParamList_empty','parser.py',398),
+  ('ActParamList -> ActParamSeq','ActParamList',1,'p_ActParamList_list','parser.py',402),
+  ('ActParamSeq -> Exp','ActParamSeq',1,'p_ActParamSeq_exp','parser.py',407),
+  ('ActParamSeq -> ActParamSeq COMMA Exp','ActParamSeq',3,'p_ActParamSeq_list','parser.py',411),
+  ('RelExp -> Exp OtherRelE','RelExp',2,'p_RelExp','parser.py',417),
+  ('OtherRelE -> CmpOp Exp','OtherRelE',2,'p_OtherRelE','parser.py',422),
+  ('Exp -> Term OtherTerm','Exp',2,'p_Exp','parser.py',427),
+  ('OtherTerm -> <empty>','OtherTerm',0,'p_OtherTerm_empty','parser.py',432),
+  ('OtherTerm -> AddOp Exp','OtherTerm',2,'p_OtherTerm_list','parser.py',436),
+  ('Term -> Factor OtherFactor','Term',2,'p_Term','parser.py',441),
+  ('OtherFactor -> <empty>','OtherFactor',0,'p_OtherFactor_empty','parser.py',446),
+  ('OtherFactor -> MultOp Term','OtherFactor',2,'p_OtherFactor_list','parser.py',450),
+  ('Factor -> LPAREN Exp RPAREN','Factor',3,'p_Factor_paren','parser.py',455),
+  ('Factor -> INTC','Factor',1,'p_Factor_intc','parser.py',459),
+  ('Factor -> Variable','Factor',1,'p_Factor_variable','parser.py',463),
+  ('Variable -> ID VariMore','Variable',2,'p_Variable','parser.py',468),
+  ('VariMore -> <empty>','VariMore',0,'p_VariMore_empty','parser.py',473),
+  ('VariMore -> LMIDPAREN Exp RMIDPAREN','VariMore',3,'p_VariMore_index','parser.py',477),
+  ('VariMore -> DOT FieldVar','VariMore',2,'p_VariMore_field','parser.py',481),
+  ('FieldVar -> ID FieldVarMore','FieldVar',2,'p_FieldVar','parser.py',486),
+  ('FieldVarMore -> <empty>','FieldVarMore',0,'p_FieldVarMore_empty','parser.py',491),
+  ('FieldVarMore -> LMIDPAREN Exp RMIDPAREN','FieldVarMore',3,'p_FieldVarMore_index','parser.py',495),
+  ('CmpOp -> LT','CmpOp',1,'p_CmpOp','parser.py',500),
+  ('CmpOp -> EQ','CmpOp',1,'p_CmpOp','parser.py',501),
+  ('AddOp -> PLUS','AddOp',1,'p_AddOp','parser.py',506),
+  ('AddOp -> MINUS','AddOp',1,'p_AddOp','parser.py',507),
+  ('MultOp -> TIMES','MultOp',1,'p_MultOp','parser.py',512),
+  ('MultOp -> OVER','MultOp',1,'p_MultOp','parser.py',513),
 ]
@@ -1,36 +1,96 @@
 import sys
 sys.path.append("../")
 from parser import *
-
-class SymbolTable:
-    def __init__(self, name, parent=None):
-        self.name = name          # 作用域名称（如全局、过程名）
-        self.parent = parent      # 父作用域
-        self.symbols = {}         # 符号表内容 {name: (type, category)}
-        self.children = []        # 子作用域（用于嵌套）
-
-    def add_symbol(self, name, symbol_type, category='variable'):
-        if name in self.symbols:
-            return False  # 重复定义
-        self.symbols[name] = (symbol_type, category)
+from diagnostic import *
+
+class Scope:
+    """一个作用域的撤销日志：按定义顺序记录本作用域引入的名字，以及下一个可分配的偏移"""
+    __slots__ = ('name', 'level', 'log', 'offset')
+
+    def __init__(self, name, level):
+        self.name = name      # 作用域名称（如全局、过程名）
+        self.level = level    # 嵌套层数，全局为 0
+        self.log = []         # 本作用域定义的名字，退出时据此撤销
+        self.offset = 0
+
+class ScopedTable:
+    """
+    按名字散列的作用域表：每个名字对应一个绑定栈，栈顶是最内层的定义，元素为 (作用域层数, 值)。
+    查找只看栈顶，与嵌套深度无关；退出作用域时按撤销日志弹出本层引入的绑定。
+    """
+    def __init__(self, name="global"):
+        self.bindings = {}
+        self.scopes = [Scope(name, 0)]
+
+    @property
+    def scope(self):
+        return self.scopes[-1]
+
+    def enter(self, name):
+        self.scopes.append(Scope(name, len(self.scopes)))
+
+    def exit(self):
+        scope = self.scopes.pop()
+        bindings = self.bindings
+        for name in scope.log:
+            stack = bindings[name]
+            stack.pop()
+            if not stack:
+                del bindings[name]
+        return scope
+
+    def define(self, name, value):
+        """在当前作用域定义 name，本层已有同名定义时返回 False"""
+        level = len(self.scopes) - 1
+        stack = self.bindings.get(name)
+        if stack is None:
+            self.bindings[name] = [(level, value)]
+        elif stack[-1][0] == level:
+            return False
+        else:
+            stack.append((level, value))
+        self.scopes[-1].log.append(name)
         return True
 
+    def defined_here(self, name):
+        stack = self.bindings.get(name)
+        return stack is not None and stack[-1][0] == len(self.scopes) - 1
+
     def lookup(self, name):
-        current = self
-        while current:
-            if name in current.symbols:
-                return current.symbols[name]
-            current = current.parent
+        stack = self.bindings.get(name)
+        if stack:
+            return stack[-1][1]
         return None  # 未找到
 
+    def local_items(self):
+        """当前作用域的 (名字, 值)，按定义顺序"""
+        bindings = self.bindings
+        return [(name, bindings[name][-1][1]) for name in self.scopes[-1].log]
+
+class SymbolTable(ScopedTable):
+    """符号表：值为 (type, offset, category)，offset 在各自作用域内连续分配"""
+    def add_symbol(self, name, symbol_type, category='variable'):
+        scope = self.scopes[-1]
+        if not self.define(name, (symbol_type, scope.offset, category)):
+            return None, None, None  # 重复定义
+        #print(symbol_type)
+        if isinstance(symbol_type, RecType) or isinstance(symbol_type, ArrayType) or isinstance(symbol_type, ProcType):
+            length = symbol_type.size
+        else:
+            length = 1
+        offset = scope.offset
+        scope.offset += length
+        return name, length, offset
+
 class ProcType:
     """表示过程的类型，存储形参信息（类型和传递方式）"""
     def __init__(self):
         self.params = []  # 形参列表，每个元素为 (参数类型, 是否引用传递)
+        self.size = 0
 
-    def add_param(self, param_type):
+    def add_param(self, param_type, is_ref):
         """添加形参到参数列表"""
-        self.params.append((param_type))
+        self.params.append((param_type, is_ref))
 
     def __repr__(self):
         params_str = ", ".join(
@@ -48,6 +108,17 @@ class RecType:
             fields: 一个字典，键是字段名（字符串），值是字段的类型（可以是 "INTEGER", "CHAR", 或 ArrayType 的实例）。
         """
         self.fields = fields
+        self.offset = {}
+        self.size = 0
+        #print(self.fields)
+        for name, type in self.fields.items():
+            self.offset[name] = self.size
+            if type == "integer":
+                self.size += 1
+            elif type == "char":
+                self.size += 1
+            else:
+                self.size += type.size      
 
     def __str__(self):
         fields_str = ", ".join([f"{name}: {type}" for name, type in self.fields.items()])
@@ -61,7 +132,7 @@ class ArrayType:
         self.lower_bound = lower_bound
         self.upper_bound = upper_bound
         self.element_type = element_type
-
+        self.size = upper_bound - lower_bound + 1
     def __str__(self):
         return f"ARRAY [{self.lower_bound}..{self.upper_bound}] OF {self.element_type}"
 
@@ -69,627 +140,523 @@ class ArrayType:
         return f"ArrayType(lower_bound={self.lower_bound}, upper_bound={self.upper_bound}, element_type='{self.element_type}')"
     
     
+def _ignore(*args):
+    return None
+
 class SemanticAnalyzer:
-    def __init__(self):
-        self.current_scope = SymbolTable("global")
-        self.scope_stack = [self.current_scope]  # 作用域堆栈
-        self.type_table = {}       # 类型表，记录用户定义类型
-        self.errors = []           # 收集错误信息
+    """
+    语义分析器：一次遍历语法树完成类型检查，并通过可选的 emitter 同步生成中间代码。
+    emitter 需提供 emit(op, arg1, arg2, result) -> 下标、new_temp()、patch_result(下标, 结果)、
+    drop_last() 和 write(文件名)，Quad.QuadEmitter 即是一例；为 None 时只做检查。
+    错误记录到 diagnostics（DiagnosticCollector），默认不向标准输出打印任何内容。
+    """
+    def __init__(self, emitter=None, diagnostics=None):
+        self.symbols = SymbolTable("global")  # 变量、参数、过程
+        self.types = ScopedTable("global")     # 类型表，记录用户定义类型
+        self.diagnostics = diagnostics if diagnostics is not None else DiagnosticCollector()
+        self.flag = True
+        self.emitter = emitter
+        if emitter is None:
+            # 只做检查：不生成任何四元式，也不分配临时变量名
+            self.emit_quad = _ignore
+            self.generate_temp_var = _ignore
+            self.patch_result = _ignore
+            self.drop_last_quad = _ignore
+        else:
+            self.emit_quad = emitter.emit
+            self.generate_temp_var = emitter.new_temp
+            self.patch_result = emitter.patch_result
+            self.drop_last_quad = emitter.drop_last
+
+    @property
+    def errors(self):
+        # 与以前的错误列表格式一致的文本，每条记录按产生它的阶段标注
+        return [d.format(STAGE_LABELS.get(d.code, "语义错误")) for d in self.diagnostics.errors]
+
+    @property
+    def quadruples(self):
+        return self.emitter.quadruples if self.emitter is not None else None
 
     def lookup_type_table(self, name):
-        return self.type_table.get(name, None)
+        return self.types.lookup(name)
 
     def enter_scope(self, name):
-        new_scope = SymbolTable(name, parent=self.current_scope)
-        self.current_scope.children.append(new_scope)
-        self.scope_stack.append(new_scope)
-        self.current_scope = new_scope
+        self.symbols.enter(name)
+        self.types.enter(name)
 
     def exit_scope(self):
-        # 退出作用域时打印符号表
-        print(f"\n退出作用域 '{self.current_scope.name}'，符号表内容：")
-        for name, (type_, category) in self.current_scope.symbols.items():
-            print(f"  {name}: 类型={type_}, 类别={category}")
-        self.scope_stack.pop()
-        self.current_scope = self.scope_stack[-1]
-
-    def analyze(self, ast):
+        if self.diagnostics.dump_symbols:
+            self.diagnostics.symbol_table(f"退出作用域 '{self.symbols.scope.name}'，符号表内容：", self.symbols.local_items())
+        self.symbols.exit()
+        self.types.exit()
+
+    def analyze(self, ast, quad_file="../result/中间代码.txt"):
         if ast is None:
             return
         self.visit(ast)
-        # 打印所有错误
-        if self.errors:
-            print("\n语义错误列表：")
-            for error in self.errors:
-                print(error)
-
-    def error(self, message, lineno=None):
-        err_msg = f"语义错误: {message}"
-        if lineno:
-            err_msg += f" (行号: {lineno})"
-        self.errors.append(err_msg)
+        if not self.diagnostics.errors:
+            if self.diagnostics.dump_symbols:
+                self.diagnostics.symbol_table("全局符号表内容：", self.symbols.local_items())
+            if quad_file and self.emitter is not None:
+                self.emitter.write(quad_file)
+
+    def error(self, code, message, lineno=None):
+        self.diagnostics.error(code, message, lineno, self.symbols.scope.name)
 
     def visit(self, node):
-        if isinstance(node, tuple):
-            node_type = node[0]
-            method_name = f'visit_{node_type}'
-            if hasattr(self, method_name):
-                getattr(self, method_name)(node)
-            else:
-                self.error(f"未知的节点类型: {node_type}")
-        elif isinstance(node, list):
-            for child in node:
-                self.visit(child)
-        elif node is not None:
-            pass  # 忽略基础类型（如字符串、数字）
+        if node is None:
+            return
+        method = self.VISITORS[node.kind]
+        if method is None:
+            self.error("unknown-node", f"未知的节点类型: {node.name}", node.lineno)
+        else:
+            method(self, node)
 
     # ----------- 处理所有节点类型 -----------
     def visit_Program(self, node):
-        _, program_head, declare_part, program_body = node
-        self.visit(program_head)
-        self.visit(declare_part)
-        self.visit(program_body)
-        print(self.current_scope.symbols)
+        self.visit(node.head)
+        self.visit(node.declare)
+        self.emit_quad("label", "here", None, None)
+        self.visit(node.body)
 
     # program_head
     def visit_ProgramHead(self, node):
-        _, program_name = node
-        self.visit(program_name)
+        self.visit(node.program_name)
 
     def visit_ProgramName(self, node):
         pass  # 程序名无需处理
 
     # DeclarePart
     def visit_DeclarePart(self, node):
-        _, type_dec, var_dec, proc_dec = node
-        self.visit(type_dec)  # 处理类型声明
-        #print(self.type_table)
-        self.visit(var_dec)   # 处理变量声明
-        #print(self.current_scope.symbols)
-        self.visit(proc_dec)  # 处理过程声明
+        self.visit(node.type_dec)  # 处理类型声明
+        self.visit(node.var_dec)   # 处理变量声明
+        if self.flag:
+            self.emit_quad("Go", "here", None, None)
+            self.flag = False
+        self.visit(node.proc_dec)  # 处理过程声明
 
     def _resolve_type(self, type_name_node):
-
-        if type_name_node and len(type_name_node) == 2 and type_name_node[0] == 'TypeName':
-            type_name_content = type_name_node[1]
-            if isinstance(type_name_content, str):
-                # Rule 14: TypeName -> ID
-                if not self.lookup_type_table(type_name_content):
-                    self.error(f"类型 '{type_name_content}' 未定义")
-                return self.lookup_type_table(type_name_content)
-                
-            elif isinstance(type_name_content, tuple) and len(type_name_content) == 2:
-                tag = type_name_content[0]
-                if tag == 'BaseType':
-                    # Rule 12: TypeName -> BaseType
-                    return self.analyze_base_type(type_name_content)
-                elif tag == 'StructureType':
-                    # Rule 13: TypeName -> StructureType
-                    return self.analyze_structure_type(type_name_content)
+        type_name_content = type_name_node.type
+        if isinstance(type_name_content, str):
+            # Rule 14: TypeName -> ID
+            type_ = self.lookup_type_table(type_name_content)
+            if not type_:
+                self.error("undefined-type", f"类型 '{type_name_content}' 未定义", type_name_node.lineno)
+            return type_
+        elif type_name_content.kind == BaseTypeNode.kind:
+            # Rule 12: TypeName -> BaseType
+            return self.analyze_base_type(type_name_content)
+        elif type_name_content.kind == StructureTypeNode.kind:
+            # Rule 13: TypeName -> StructureType
+            return self.analyze_structure_type(type_name_content.type)
         return None
 
     def analyze_base_type(self, base_type_node):
         """
         解析 BaseType 节点并返回其具体的类型字符串。
         """
-        if base_type_node and len(base_type_node) == 2 and base_type_node[0] == 'BaseType':
-            return base_type_node[1]
-        return None
+        return base_type_node.type
 
-    def analyze_structure_type(self, structure_type_node):
+    def analyze_structure_type(self, structure_content):
         """
-        解析 StructureType 节点并返回其具体的结构类型信息。
+        解析 ArrayType / RecType 节点并返回其具体的结构类型信息。
         """
-        if structure_type_node and len(structure_type_node) == 2 and structure_type_node[0] == 'StructureType':
-            structure_content = structure_type_node[1]
-            if isinstance(structure_content, tuple) and len(structure_content) > 0 and structure_content[0] == 'ArrayType':
-                lower_bound = structure_content[1]
-                upper_bound = structure_content[2]
-                element_type = self.analyze_base_type(structure_content[3])
-                if element_type:
-                    try:
-                        lower_bound = int(lower_bound)
-                        upper_bound = int(upper_bound)
-                        return ArrayType(lower_bound, upper_bound, element_type)
-                    except ValueError:
-                        print(f"警告: 数组边界不是整数: {lower_bound}, {upper_bound}")
-                        return None
-            elif isinstance(structure_content, tuple) and len(structure_content) == 2 and structure_content[0] == 'RecType' :
-                fields = self.parse_dec_list(structure_content[1])
-                #print(fields)
-                if fields is not None:
-                    return RecType(fields)
-            return None
-    def parse_dec_list(self, field_dec_list_node):
+        if structure_content.kind == ArrayTypeNode.kind:
+            lower_bound = structure_content.low
+            upper_bound = structure_content.high
+            element_type = self.analyze_base_type(structure_content.base)
+            if element_type:
+                if lower_bound > upper_bound:
+                    self.error("array-bounds", 'lower bound must be less than upper bound', structure_content.lineno)
+                return ArrayType(lower_bound, upper_bound, element_type)
+        elif structure_content.kind == RecTypeNode.kind:
+            fields = self.parse_dec_list(structure_content.field_list)
+            if fields is not None:
+                return RecType(fields)
+        return None
+
+    def parse_dec_list(self, field_dec_list):
         """
         Returns:
             dict: 字段字典，键是字段名，值是字段类型。
-                如果解析失败，返回 None。
         """
-        if not field_dec_list_node or not isinstance(field_dec_list_node, tuple) or len(field_dec_list_node) == 0 or field_dec_list_node[0] != 'FieldDecList':
-            return {}
-
         fields = {}
-        current_node = field_dec_list_node
-        #print(field_dec_list_node)
-
-        while current_node and isinstance(current_node, tuple) and len(current_node) > 0 and current_node[0] == 'FieldDecList':
-            # Rule 21: FieldDecList -> BaseType IdList SEMI FieldDecMore
-            # Rule 22: FieldDecList -> ArrayType IdList SEMI FieldDecMore
-            if len(current_node) == 4:
-                type_node = current_node[1]
-                id_list_node = current_node[2]  # 注意这里索引是 2，因为 SEMI 是索引 2
-                field_dec_more_node = current_node[3]
-
-                field_type = None
-                if type_node[0] == 'BaseType':
-                    field_type = self.analyze_base_type(type_node)
-                elif type_node[0] == 'ArrayType':
-                    # 需要将 ArrayType 节点包装成 TypeName 的形式传递给 analyze_type_name
-                    field_type = self.analyze_type_name(('TypeName', ('StructureType', type_node)))
-
-                if field_type:
-                    ids = self.parse_id_list(id_list_node)
-                    if ids:
-                        for id_name in ids:
-                            fields[id_name] = field_type
-
-                    # 处理 FieldDecMore
-                    if field_dec_more_node and isinstance(field_dec_more_node, tuple) and len(field_dec_more_node) > 0:
-                        if field_dec_more_node[0] == 'FieldDecList':
-                            # Rule 24: FieldDecMore -> FieldDecList
-                            more_fields = self.parse_dec_list(field_dec_more_node)
-                            if more_fields:
-                                fields.update(more_fields)
-                        elif field_dec_more_node[0] == 'empty':
-                            # Rule 23: FieldDecMore -> <empty>
-                            break
-            break # 处理完当前的 FieldDecList 就退出，FieldDecMore 会处理后续的
-
+        for item in field_dec_list:
+            # FieldDecItem -> BaseType IdList SEMI | ArrayType IdList SEMI
+            type_node = item.type
+            if type_node.kind == BaseTypeNode.kind:
+                field_type = self.analyze_base_type(type_node)
+            else:
+                field_type = self.analyze_structure_type(type_node)
+            if field_type:
+                for id_name in item.ids:
+                    fields[id_name] = field_type
         return fields
-    def parse_id_list(self, id_list_node):
-        """
-        解析 IdList, VarIdlist 节点并返回标识符列表。
-        Returns:
-            list: 标识符名称列表。
-                如果解析失败，返回 None。
-        """
-        if not id_list_node or not isinstance(id_list_node, tuple) or len(id_list_node) == 0:
-            return
-
-        ids = []
-        if len(id_list_node) == 3:
-            # Rule 25: IdList -> ID IdMore
-            if isinstance(id_list_node[1], str):
-                ids.append(id_list_node[1])
-                id_more_node = id_list_node[2] # 这里应该是 id_list_node[1] 才是 ID，id_list_node[2] 是 IdMore
-                if isinstance(id_more_node, tuple):
-                    ids.extend(self.parse_id_more(id_more_node))
-        return ids
-
-    def parse_id_more(self, id_more_node):
-        """
-        解析 IdMore, VarIDMore 节点并返回标识符列表。
-        Returns:
-            list: 标识符名称列表。
-        """
-        ids = []
-        if not id_more_node or not isinstance(id_more_node, tuple) or len(id_more_node) == 0:
-            return
-        if len(id_more_node) == 2 and id_more_node[1] != None:
-            ids.extend(self.parse_id_list(id_more_node[1]))
-        return ids
     '''
     TypeDeclaration
     '''
     def visit_TypeDec(self, node):
-        _, type_decl = node
-        if type_decl is not None:
-            self.visit(type_decl)
+        self.visit(node.declaration)
 
     def visit_TypeDeclaration(self, node):
-        _, type_dec_list = node
-        self.visit(type_dec_list)
-
-    def visit_TypeDecList(self, node):
-        _, type_id, type_name, type_dec_more = node
-        type_id_name = type_id[1]
-        if type_id_name in self.type_table:
-            self.error(f"类型 '{type_id_name}' 重复定义")
+        for item in node.dec_list:
+            self.visit_TypeDecItem(item)
+
+    def visit_TypeDecItem(self, node):
+        type_id_name = node.type_id.id
+        if self.types.defined_here(type_id_name):
+            self.error("duplicate-type", f"类型 '{type_id_name}' 重复定义", node.lineno)
         else:
-            self.type_table[type_id_name] = self._resolve_type(type_name)
-        self.visit(type_dec_more)
-    
-    def visit_TypeDecMore(self, node):
-        _, type_dec_list = node
-        if type_dec_list:
-            self.visit(type_dec_list)
+            self.types.define(type_id_name, self._resolve_type(node.type_name))
 
     '''
     VarDeclaration
     '''
     def visit_VarDec(self, node):
-        _, var_decl = node
-        if var_decl is not None:
-            self.visit(var_decl)
+        self.visit(node.declaration)
 
     def visit_VarDeclaration(self, node):
-        _, var_dec_list = node
-        self.visit(var_dec_list)
+        for item in node.dec_list:
+            self.visit_VarDecItem(item)
 
-    def visit_VarDecList(self, node):
-        _, type_node, var_id_list, var_dec_more = node
-        var_type = self._resolve_type(type_node)
+    def visit_VarDecItem(self, node):
+        var_type = self._resolve_type(node.type_name)
         if var_type:
-            ids = self.parse_id_list(var_id_list)
-            if ids:
-                for id_name in ids:
-                    if not self.current_scope.add_symbol(id_name, var_type):
-                        self.error(f"Variable {id_name} already defined in this scope")
-
-        self.visit(var_dec_more)
-    
-    def visit_VarDecMore(self, node):
-        _, var_dec_list = node
-        if var_dec_list:
-            self.visit(var_dec_list)
+            for id_name in node.ids:
+                name, length, offset = self.symbols.add_symbol(id_name, var_type) 
+                if not name:
+                    self.error("duplicate-var", f"Variable {id_name} already defined in this scope", node.lineno)
+                else:
+                    self.emit_quad('DECLARE', offset, length, name)
     '''
     procedure declaration
     '''
     def visit_ProcDec(self, node):
-        _, proc_dec = node
-        if proc_dec:
-            self.visit(proc_dec)
+        for proc in node.procs:
+            self.visit_ProcDeclaration(proc)
 
     def visit_ProcDeclaration(self, node):
-        _, proc_name_node, param_list_node, proc_dec_part, proc_body, proc_dec_more = node
-        proc_name = proc_name_node[1]
+        proc_name = node.proc_name.id
+        proc_index = self.emit_quad('PROCEDURE', proc_name, None, None)
         
-        if self.current_scope.lookup(proc_name):
-            self.error(f"过程 '{proc_name}' 重复定义")
+        if self.symbols.lookup(proc_name):
+            self.error("duplicate-proc", f"过程 '{proc_name}' 重复定义", node.lineno)
             return
         Proc = ProcType()
+        # 先在外层作用域登记过程名（ProcType 不占空间），形参随后补进 Proc；
+        # 这样形参的绑定压在过程名之上，同名时形参优先
+        self.symbols.add_symbol(proc_name, Proc, 'PROCEDURE')
         
         self.enter_scope(proc_name)
         
         # 处理参数列表
-        self.visit(param_list_node)
-        for i in self.current_scope.symbols:
-            Proc.add_param(self.current_scope.symbols[i][0])
-        self.current_scope.parent.add_symbol(proc_name, Proc, 'PROCEDURE')
-        print(self.current_scope.symbols)
-        print(self.current_scope.parent.symbols)
+        for param in node.params:
+            self.visit_Param(param)
+        for name, (param_type, offset, category) in self.symbols.local_items():
+            Proc.add_param(param_type[0], param_type[1])
+        self.patch_result(proc_index, len(Proc.params))
         
         # 处理过程内的声明部分
-        self.visit(proc_dec_part)
-        #print(self.type_table)
+        self.visit(node.dec_part)
         
         # 处理过程体
-        self.visit(proc_body)
+        self.visit(node.body)
         
         # 退出过程作用域
         self.exit_scope()
-        
-        # 处理后续过程声明
-        self.visit(proc_dec_more)
-
-    def visit_ProcDecMore(self, node):
-        _, proc_dec = node
-        if proc_dec is not None:
-            self.visit(proc_dec)
-
-    def visit_ParamList(self, node):
-        _, param_dec_list = node
-        if param_dec_list:
-            self.visit(param_dec_list)
-
-    def visit_ParamDecList(self, node):
-        _, param, param_more = node
-        self.visit(param)
-        self.visit(param_more)
+        self.emit_quad('ENDPROCEDURE', None, None, None)
 
     def visit_Param(self, node):
         # 解析参数模式（值传递/引用传递）
-        is_ref = False
-        if node[0] == 'Param' and len(node) == 4:  # VAR TypeName FormList
-            is_ref = True
-            type_node = node[2]
-            form_list = node[3]
-        else:  # TypeName FormList
-            type_node = node[1]
-            form_list = node[2]
-        
-        # 解析类型并附加到子节点
-        param_type = self._resolve_type(type_node)
+        is_ref = node.var is not None  # VAR TypeName FormList
+        param_type = self._resolve_type(node.type_name)
         if param_type:
-            # 将类型信息附加到FormList节点
-            new_form_node = (form_list[0], form_list[1], form_list[2], param_type, is_ref)
-            self.visit(new_form_node)
-
-
-    def visit_ParamMore(self, node):
-        _, param_dec = node
-        if param_dec:
-            self.visit(param_dec)
-
-    def visit_FormList(self, node):
-        # 从节点结构获取附加信息
-        _, param_id, fid_more, param_type, is_ref = node
-
-        param_name = param_id
-        
-        # 添加参数到符号表
-        full_type = ("var " if is_ref else "") + str(param_type)
-        if not self.current_scope.add_symbol(param_name, full_type, category='param'):
-            self.error(f"参数 '{param_name}' 重复定义")
-        
-        # 处理后续参数（传递附加信息）
-        if fid_more and fid_more[1]:
-            new_fid_node = (fid_more[0], fid_more[1], param_type, is_ref)
-            self.visit(new_fid_node)
-
-    def visit_FidMore(self, node):
-        if len(node) > 2:  # 携带附加信息的节点
-            _, form_list, param_type, is_ref = node
-            new_form_node = (form_list[0], form_list[1], form_list[2], param_type, is_ref)
-            self.visit(new_form_node)
+            self._add_params(node.forms, param_type, is_ref, node.lineno)
+
+    def _add_params(self, form_list, param_type, is_ref, lineno):
+        """把 FormList 中的每个形参加入符号表"""
+        full_type = (param_type, is_ref)
+        for param_name in form_list:
+            # 添加参数到符号表
+            name, length, offset = self.symbols.add_symbol(param_name, full_type, category='param')
+            if not name:
+                self.error("duplicate-param", f"参数 '{param_name}' 重复定义", lineno)
+            else:
+                self.emit_quad("get", is_ref, length, param_name)
 
     def visit_ProcDecPart(self, node):
-        _, dec_part = node
-        if dec_part:
-            self.visit(dec_part)
+        self.visit(node.declare)
     
     '''
     programbody IMP
     '''
     def visit_ProcBody(self, node):
-        _, pro_body = node
-        if pro_body:
-            self.visit(pro_body)
+        self.visit(node.body)
     
     def visit_ProgramBody(self, node):
-        _, stm_list = node  # 结构为 ('ProgramBody', StmList)
-        self.visit(stm_list)
+        self._visit_stms(node.stm_list)
 
-    def visit_StmList(self, node):
-        _, stm, stm_more = node  # 结构为 ('StmList', Stm, StmMore)
-        self.visit(stm)
-        self.visit(stm_more)
-    
-    def visit_StmMore(self, node):
-        if node[1] is not None:  # 结构为 ('StmMore', StmList)
-            self.visit(node[1])
+    def _visit_stms(self, stm_list):
+        # 语句序列是扁平列表，逐条访问，递归深度与语句条数无关
+        visit = self.visit
+        for stm in stm_list:
+            visit(stm)
         
     def visit_Stm(self, node):
-        if len(node) == 3:
-            # 结构为 ('Stm', 'ID', AssCall)，例如 x := 10 或 proc(a, b)
-            var_name = node[1]  # ID 名称
-            ass_call_node = node[2]  # AssCall 节点
-            self._handle_id_asscall(var_name, ass_call_node[1])
+        if node.ass_call is not None:
+            # ID AssCall，例如 x := 10 或 proc(a, b)
+            self._handle_id_asscall(node.stm, node.ass_call.rest, node.lineno)
         else:
-            self.visit(node[1])
+            self.visit(node.stm)
 
-    def _handle_id_asscall(self, var_name, ass_call_node):
+    def _handle_id_asscall(self, var_name, ass_call_node, lineno):
         """处理 ID AssCall 结构（赋值或过程调用）"""
-        if ass_call_node[0] == "AssignmentRest":
-            self._handle_assignment(var_name, ass_call_node)
-        elif ass_call_node[0] == "CallStmRest":
-            self._handle_procedure_call(var_name, ass_call_node)
+        if ass_call_node.kind == AssignmentRestNode.kind:
+            self._handle_assignment(var_name, ass_call_node, lineno)
         else:
-            self.error(f"未知的 AssCall 类型: {ass_call_node[0]}")
-
-    def _handle_assignment(self, var_name, assignment_node):
-        """处理赋值语句：ID AssignmentRest"""
-        # 结构为 ('AssignmentRest', VariMore, 'ASSIGN', Exp)
-        _, var_more, exp = assignment_node
-        curr_type = self._get_expression_type(("Variable", var_name, var_more))
-        exp_type = self._get_expression_type(exp)
-        #print(var_name, curr_type, exp_type)
+            self._handle_procedure_call(var_name, ass_call_node, lineno)
+
+    def _handle_assignment(self, var_name, assignment_node, lineno):
+        var_more = assignment_node.vari_more
+        curr_type, var_location = self._get_variable_value(VariableNode(var_name, var_more, lineno=lineno))
+        # 左部带下标或域名时，去掉取值的 load，改为通过地址写回
+        flag = var_more.access is not None
+        if flag and var_location is not None:
+            self.drop_last_quad()
+        exp_type, exp_value = self._get_expression_value(assignment_node.exp)
+
         if curr_type != exp_type:
-            self.error(f"类型不匹配：无法将 {exp_type} 赋值给 {curr_type}")
-
-    def _handle_procedure_call(self, proc_name, call_node):
-        """处理过程调用：ID CallStmRest"""
-        # 结构为 ('CallStmRest', ActParamList)
-        _, act_param_list = call_node
-        # 检查过程是否声明
-        proc_info = self.current_scope.lookup(proc_name)
-        if not proc_info or proc_info[1] != 'PROCEDURE':
-            self.error(f"过程 '{proc_name}' 未声明")
+            self.error("assign-type", f" 类型不匹配：无法将  {exp_type}  赋值给  {curr_type}", lineno)
+        if flag:
+            self.emit_quad(':=:', exp_value, None, var_location)
+        else:
+            self.emit_quad(':=', exp_value, None, var_location)
+
+    def _handle_procedure_call(self, proc_name, call_node, lineno):
+        proc_info = self.symbols.lookup(proc_name)
+        #print(proc_info)
+        if not proc_info or proc_info[2] != 'PROCEDURE':
+            self.error("undeclared-proc", f" 过程  '{proc_name}'  未声明 ", lineno)
             return
-        # 获取过程的形式参数
+
         formal_params = self._get_formal_parameters(proc_name)
-        # 检查实际参数与形式参数的匹配
-        actual_params = self._parse_act_param_list(act_param_list)
-        
+        actual_params = self._parse_act_param_list_for_quad(call_node.params)
+
         if len(formal_params) != len(actual_params):
-            self.error(f"参数数量不匹配：预期 {len(formal_params)}，实际 {len(actual_params)}")
+            self.error("arg-count", f" 参数数量不匹配：预期  {len(formal_params)} ，实际  {len(actual_params)}", lineno)
         else:
-            for formal, actual in zip(formal_params, actual_params):
+            for i, (formal, actual) in enumerate(zip(formal_params, actual_params)):
                 if formal[0] != actual[0]:
-                    self.error(f"参数类型不匹配：预期 {formal[0]}，实际 {actual[0]}")
-        
+                    self.error("arg-type", f" 参数类型不匹配：预期  {formal[0]} ，实际  {actual[0]}", lineno)
+                self.emit_quad('param', actual[1], None, formal[1]) # 传递参数值或地址
+
+        self.emit_quad('call', proc_name, None, None)
+
+    def _parse_act_param_list_for_quad(self, act_param_list):
+        actual_params = []
+        for exp in act_param_list:
+            param_type, param_value = self._get_expression_value(exp)
+            actual_params.append((param_type, param_value))
+        return actual_params
     
     def _get_formal_parameters(self, proc_name):
         """从符号表中获取过程的形参列表"""
         proc = None
-        proc = self.current_scope.lookup(proc_name)[0]
+        proc = self.symbols.lookup(proc_name)[0]
         if not proc:
             return []
         return proc.params
 
-    def _parse_act_param_list(self, act_param_list_node):
-        """解析实际参数列表，返回参数类型列表"""
-        actual_params = []
-        if act_param_list_node[1] is None:
-            return actual_params  # 无参数
-        current_node = act_param_list_node
-        while current_node:
-            Exp = current_node[1]
-            More = current_node[2]
-            param_type = self._get_expression_type(Exp)
-            actual_params.append(param_type)
-            current_node = More[1]
-
-        return actual_params
-
     def visit_ConditionalStm(self, node):
-        _, rel_exp, stm_list1, stm_list2 = node
-        rel_exp_type = self._get_expression_type(rel_exp)
-        if rel_exp_type != 'BOOLEAN':
-            self.error("条件表达式必须为布尔值")
+        #print(rel_exp, "i love you")
+        rel_type, condition_result = self._get_expression_value(node.cond)
+        if rel_type != 'BOOLEAN':
+            self.error("if-condition", " 条件表达式必须为布尔值 ", node.lineno)
             return None
-        self.visit(stm_list1)
-        self.visit(stm_list2)
+
+        self.emit_quad('THEN', condition_result, None, None)
+        self._visit_stms(node.then_stms)
+        self.emit_quad('ELSE', None, None, None)
+        self._visit_stms(node.else_stms)
+        self.emit_quad('ENDIF', None, None, None) # 生成 end 标签四元式
 
     def visit_LoopStm(self, node):
-        _, rel_exp, stm_list = node  # 结构为 ('LoopStm', RelExp, StmList)
-        # 检查条件表达式是否为布尔类型
-        rel_exp_type = self._get_expression_type(rel_exp)
-        if rel_exp_type != 'BOOLEAN':
-            self.error("循环条件必须是布尔类型")
-        self.visit(stm_list)
+        self.emit_quad('WHILE', None, None, None)
+        rel_type, condition_result = self._get_expression_value(node.cond)
+        if rel_type != 'BOOLEAN':
+            self.error("while-condition", " 循环条件必须是布尔类型 ", node.lineno)
+            return
+        self.emit_quad('DO', condition_result, None, None)
+        self._visit_stms(node.stm_list)
+        self.emit_quad('ENDWHILE', None, None, None) # 生成循环结束标签四元式
 
     def visit_InputStm(self, node):
-        _, invar = node  # 结构为 ('InputStm', Invar)
-        var_name = invar[1]
-        if not self.current_scope.lookup(var_name):
-            self.error(f"输入变量 '{var_name}' 未声明")
+        var_name = node.invar.id
+        self.emit_quad('IN', var_name, None, None)
+        if not self.symbols.lookup(var_name):
+            self.error("undeclared-input", f"输入变量 '{var_name}' 未声明", node.lineno)
 
     def visit_OutputStm(self, node):
-        _, exp = node  # 结构为 ('OutputStm', Exp)
-        self._get_expression_type(exp)  # 仅检查表达式合法性
+        _, value = self._get_expression_value(node.exp)  # 仅检查表达式合法性
+        self.emit_quad('OUT', value, None, None)
 
     def visit_ReturnStm(self, node):
-        _, exp = node  # 结构为 ('ReturnStm', Exp)
-        self._get_expression_type(exp)  # 根据需求检查返回类型
+        _, value = self._get_expression_value(node.exp)  # 根据需求检查返回类型
+        self.emit_quad('RETURN', value, None, None)
     
     # 在SemanticAnalyzer类中添加以下方法
 
     def visit_RelExp(self, node):
-        _, exp, other_rel_e = node
-        exp_type = self._get_expression_type(exp)
-        cmp_op, cmp_exp = other_rel_e[1], other_rel_e[2]
-        cmp_exp_type = self._get_expression_type(cmp_exp)
-        
-        # 比较操作要求两边类型相同且可比较
+        exp_type, value1 = self._get_expression_value(node.exp)
+        cmp_op, cmp_exp = node.other.op, node.other.exp
+        cmp_exp_type, value2 = self._get_expression_value(cmp_exp)
+
         if exp_type != cmp_exp_type:
-            self.error(f"比较操作类型不匹配: {exp_type} 和 {cmp_exp_type}")
-        return 'BOOLEAN'  # 比较表达式始终返回布尔类型
+            self.error("compare-type", f" 比较操作类型不匹配 : {exp_type}  和  {cmp_exp_type}", node.lineno)
+        result = self.generate_temp_var()
+        self.emit_quad(cmp_op.op, value1, value2, result)
+        return 'BOOLEAN', result # 返回类型和存储结果的临时变量
 
     def visit_Exp(self, node):
-        _, term, other_term = node
-        term_type = self._get_expression_type(term)
-        
-        if other_term[1] is None:  # 没有加减操作
-            return term_type
-        
-        add_op, exp = other_term[1], other_term[2]
-        exp_type = self._get_expression_type(exp)
-        
-        # 检查加减操作类型兼容性
+        term_type, term_value = self._get_expression_value(node.term)
+
+        add_op, exp = node.other.op, node.other.exp
+        if add_op is None:
+            return term_type, term_value
+
+        exp_type, exp_value = self._get_expression_value(exp)
+
         if term_type not in ['integer', 'char'] or exp_type not in ['integer', 'char']:
-            self.error(f"不支持的操作类型: {term_type} {add_op} {exp_type}")
+            self.error("operand-type", f" 不支持的操作类型 : {term_type} {add_op.op} {exp_type}", node.lineno)
             if exp_type != term_type:
-                self.error("操作类型不匹配")
-            return None
-        return term_type  # 假设结果类型与term相同（实际可能需要类型提升）
-
+                self.error("operand-type", " 操作类型不匹配 ", node.lineno)
+            return None, None # 或者抛出异常
+        result = self.generate_temp_var()
+        self.emit_quad(add_op.op, term_value, exp_value, result)
+        return term_type, result
+    
     def visit_Term(self, node):
-        _, factor, other_factor = node
-        factor_type = self._get_expression_type(factor)
-        
-        if other_factor[1] is None:  # 没有乘除操作
-            return factor_type
-        
-        mult_op, term = other_factor[1], other_factor[2]
-        term_type = self._get_expression_type(term)
-        
-        # 检查乘除操作类型兼容性
-        if factor_type not in ['integer', 'char'] or term_type not in ['integer', 'char']:
-            self.error(f"不支持的操作类型: {factor_type} {mult_op} {term_type}")
-            return None
+        factor_type, factor_value = self._get_expression_value(node.factor)
+
+        mult_op, term = node.other.op, node.other.term
+        if mult_op is None:
+            return factor_type, factor_value
 
+        term_type, term_value = self._get_expression_value(term)
+
+        if factor_type not in ['integer', 'char'] or term_type not in ['integer', 'char']:
+            self.error("operand-type", f" 不支持的操作类型 : {factor_type} {mult_op.op} {term_type}", node.lineno)
+            return None, None
         if factor_type != term_type:
-                self.error("操作类型不匹配")
-        return factor_type  # 假设结果类型与factor相同
+            self.error("operand-type", " 操作类型不匹配 ", node.lineno)
+        result = self.generate_temp_var()
+        self.emit_quad(mult_op.op, factor_value, term_value, result)
+        return factor_type, result
 
     def visit_Factor(self, node):
-        if isinstance(node[1], tuple):
-            return self._get_expression_type(node[1])
+        if isinstance(node.value, Node):
+            return self._get_expression_value(node.value)
         else:
-            return "integer"
-    def _get_variable_type(self, variable_node):
-        _, var_id, var_more = variable_node
+            tmp = self.generate_temp_var()
+            self.emit_quad(":=", node.value, None, tmp)
+            return "integer", tmp # 返回类型和值
+
+    def visit_Variable(self, node):
+        return self._get_variable_value(node)
+
+    def _get_variable_value(self, variable_node):
+        var_id = variable_node.id
         # 查找变量基础类型
-        var_info = self.current_scope.lookup(var_id)
+        var_info = self.symbols.lookup(var_id)
         if not var_info:
-            self.error(f"未定义的变量: {var_id}")
-            return None
-        base_type = var_info[0]
+            self.error("undefined-var", f"未定义的变量: {var_id}", variable_node.lineno)
+            return None, None
+        if isinstance(var_info[0], tuple):
+            base_type = var_info[0][0]
+        else:
+            base_type = var_info[0]
         # 处理数组下标或结构体访问
         current_type = base_type
-        current_more = var_more
+        access = variable_node.more.access
+        flag = False
         
-        while current_more and current_more[1] is not None:
-            #print(var_id, current_more)
-            if current_more[1][0] == 'Exp':  # 数组访问
+        while access is not None:
+            flag = True
+            if access.kind == ExpNode.kind:  # 数组访问
                 if not isinstance(current_type, ArrayType):
-                    self.error(f"{var_id} 不是数组类型")
-                    return None
-                index_type = self._get_expression_type(current_more[1])
+                    self.error("not-array", f"{var_id} 不是数组类型", variable_node.lineno)
+                    return None, None
+                index_type, value = self._get_expression_value(access)
                 if index_type != 'integer':
-                    self.error("数组下标必须为整数")
+                    self.error("index-type", "数组下标必须为整数", variable_node.lineno)
+                cons_pos = self.generate_temp_var()
+                off_set = self.generate_temp_var()
+                value_pos = self.generate_temp_var()
+                pos = self.generate_temp_var()
+                self.emit_quad(":=", 4, None, cons_pos)
+                self.emit_quad("-", value, current_type.lower_bound, pos)
+                self.emit_quad("*", pos, cons_pos, off_set)
+                self.emit_quad("[]", var_id, off_set, value_pos)
+                var_id = value_pos
                 current_type = current_type.element_type
-                current_more = None
+                access = None
                 
             else: 
                 if not isinstance(current_type, RecType):
-                    self.error(f"{var_id} 不是记录类型")
-                    return None
-                field_name = current_more[1][1]  # FieldVar的ID
+                    self.error("not-record", f"{var_id} 不是记录类型", variable_node.lineno)
+                    return None, None
+                field_name = access.id  # FieldVar的ID
+                #print(current_type.fields)
                 if field_name not in current_type.fields:
-                    self.error(f"字段 {field_name} 不存在于记录中")
-                    return None
+                    self.error("no-such-field", f"字段 {field_name} 不存在于记录中", variable_node.lineno)
+                    return None, None
+                cons_pos = self.generate_temp_var()
+                off_set = self.generate_temp_var()
+                value_pos = self.generate_temp_var()
+                self.emit_quad(":=", 4, None, cons_pos)
+                self.emit_quad(":=", current_type.offset[field_name], None, off_set)
+                self.emit_quad("*", off_set, cons_pos, off_set)
+                self.emit_quad("[]", var_id, off_set, value_pos)
                 current_type = current_type.fields[field_name]
-                current_more = current_more[1][2]
-        
-        return current_type
+                var_id = value_pos
+                access = access.more.exp
+        if flag:
+            self.emit_quad("load", value_pos, None, value_pos)
+
+        return current_type, var_id
 
     def visit_CmpOp(self, node):
-        return node[1]  # 返回操作符类型（LT/EQ）用于错误信息
+        return node.op  # 返回操作符类型（LT/EQ）用于错误信息
 
     def visit_AddOp(self, node):
-        return node[1]  # 返回操作符类型（PLUS/MINUS）
+        return node.op  # 返回操作符类型（PLUS/MINUS）
 
     def visit_MultOp(self, node):
-        return node[1]  # 返回操作符类型（TIMES/OVER）
-
-    def _get_expression_type(self, exp_node):
-        """递归获取表达式类型"""
-        if isinstance(exp_node, tuple):
-            if exp_node[0] == 'RelExp':
-                return self.visit_RelExp(exp_node)
-            elif exp_node[0] == 'Exp':
-                return self.visit_Exp(exp_node)
-            elif exp_node[0] == 'Term':
-                return self.visit_Term(exp_node)
-            elif exp_node[0] == 'Factor':
-                return self.visit_Factor(exp_node)
-            elif exp_node[0] == 'Variable':
-                return self._get_variable_type(exp_node)
-            elif exp_node[0] in ['INTC', 'ID']:
-                return self.visit_Factor(('Factor', exp_node))
-        return None
+        return node.op  # 返回操作符类型（TIMES/OVER）
+
+    def _get_expression_value(self, exp_node):
+        """ 递归获取表达式的类型和值 """
+        if exp_node is None:
+            return None, None
+        method = self.EXPRESSIONS[exp_node.kind]
+        if method is None:
+            return None, None
+        return method(self, exp_node)
+
+SemanticAnalyzer.VISITORS = build_dispatch(SemanticAnalyzer)
+# 表达式求值的分派表：只有这些节点会产生 (类型, 值)
+SemanticAnalyzer.EXPRESSIONS = [None] * len(NODE_TYPES)
+for _cls in (RelExpNode, ExpNode, TermNode, FactorNode, VariableNode):
+    SemanticAnalyzer.EXPRESSIONS[_cls.kind] = getattr(SemanticAnalyzer, 'visit_' + _cls.name)
 
 if __name__ == '__main__':
     parser = SNLParser()
-    parse_tree = parser.parse_file("./data/demo.txt")
+    parse_tree = parser.parse_file("./data/demo.txt", collector=DiagnosticCollector(VERBOSE_MESSAGES))
 
     if parse_tree:
         print("\n语法分析成功！")
-        semantic_analyzer = SemanticAnalyzer()
+        semantic_analyzer = SemanticAnalyzer(diagnostics=DiagnosticCollector(VERBOSE_SYMBOLS))
         semantic_analyzer.analyze(parse_tree)
         print("\n语义分析完成！")
     else:
-        print("\n语法分析失败！")
\ No newline at end of file
+        print("\n语法分析失败！")
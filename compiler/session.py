@@ -0,0 +1,141 @@
+import sys
+sys.path.append("../")
+import os
+from lexer import *
+from parser import *
+from Quad import *
+from semantic import *
+from ConstantFolder import *
+from ValueNumbering import *
+from LoopOptimizer import *
+from DeadCodeEliminator import *
+from MIPSGenerator import *
+from diagnostic import *
+
+class CompileResult:
+    """一次编译得到的全部产物"""
+    def __init__(self, tree=None, quadruples=None, optimized_quads=None, mips=None, errors=None, tokens=None,
+                 diagnostics=None, peephole=None):
+        self.tokens = tokens                    # (类型, 值, 行号) 列表，只在启用缓存时记录
+        self.tree = tree                        # 语法树
+        self.quadruples = quadruples            # 语义分析生成的四元式
+        self.optimized_quads = optimized_quads  # 优化后的四元式
+        self.mips = mips                        # 目标代码文本
+        self.errors = errors or []              # 语法/语义错误
+        self.diagnostics = diagnostics or []    # 各阶段产生的 Diagnostic 记录（含警告）
+        self.peephole = peephole                # 窥孔优化每种模式删去的指令条数，未优化时为 None
+        self.cached = False                     # 是否直接取自编译缓存
+
+    @property
+    def ok(self):
+        return not self.errors and self.mips is not None
+
+
+def syntax_errors(collector):
+    """语法分析失败时的错误列表：词法和语法错误按各自的阶段标注"""
+    return [d.format(STAGE_LABELS.get(d.code, "语法错误")) for d in collector.errors] or ["语法分析失败"]
+
+
+class CompilerSession:
+    """
+    编译会话：词法分析器、LALR 分析表和配置只构建一次，之后可以用 compile() 编译任意多个源程序。
+    语义分析器、常量折叠器和目标代码生成器每次编译都重新创建，不同源程序之间不共享任何状态。
+    diagnostics 控制转储文件，verbosity 控制终端输出（默认 VERBOSE_SILENT，不打印任何内容）。
+    """
+    def __init__(self, diagnostics=DIAG_NONE, result_dir=None, warm_start=True, optimize=True, cache=None,
+                 verbosity=VERBOSE_SILENT):
+        self.diagnostics = diagnostics
+        self.verbosity = verbosity
+        self.result_dir = result_dir  # 为 None 时只在内存中返回结果，不写任何文件
+        self.optimize = optimize
+        self.cache = cache            # 可选的 CompileCache
+        self.parser = SNLParser(diagnostics, warm_start)
+
+    def options(self):
+        """影响编译产物的选项，作为编译缓存键的一部分"""
+        return {"optimize": self.optimize}
+
+    def _result_path(self, result_dir, name, level=DIAG_NONE):
+        if result_dir is None or self.diagnostics < level:
+            return None
+        return os.path.join(result_dir, name)
+
+    def compile(self, source, result_dir=None):
+        """编译一段源程序文本，返回 CompileResult。result_dir 可覆盖会话的默认输出目录"""
+        result_dir = result_dir or self.result_dir
+        if self.cache is None or self._result_path(result_dir, "token.txt", DIAG_TOKENS):
+            # 命中缓存时只能写出 target.mips，要求转储 token 表、语法树和四元式时不使用缓存
+            return self._compile(source, result_dir)
+
+        key = self.cache.key(source, self.options())
+        artifacts = self.cache.get(key)
+        if artifacts is not None:
+            # 命中：跳过所有阶段，直接返回缓存的目标代码
+            result = CompileResult(**artifacts)
+            result.cached = True
+            mips_file = self._result_path(result_dir, "target.mips")
+            if mips_file:
+                with open(mips_file, "w") as f:
+                    f.write(result.mips)
+            return result
+        result = self._compile(source, result_dir, tokens=[])
+        if result.ok:
+            self.cache.put(key, {
+                "tokens": result.tokens,
+                "tree": result.tree,
+                "quadruples": result.quadruples,
+                "optimized_quads": result.optimized_quads,
+                "mips": result.mips,
+                "diagnostics": result.diagnostics,
+                "peephole": result.peephole,
+            })
+        return result
+
+    def _compile(self, source, result_dir, tokens=None):
+        collector = DiagnosticCollector(self.verbosity)
+        token_file = self._result_path(result_dir, "token.txt", DIAG_TOKENS)
+        if token_file:
+            with open(token_file, "w", encoding="utf-8") as dump:
+                dump.write(TOKEN_DUMP_HEADER)
+                tree = self.parser.parse(source, dump, tokens, collector)
+        else:
+            tree = self.parser.parse(source, record=tokens, collector=collector)
+        if tree is None:
+            return CompileResult(errors=syntax_errors(collector), tokens=tokens, diagnostics=collector.records)
+        tree_file = self._result_path(result_dir, "tree.txt", DIAG_ALL)
+        if tree_file:
+            with open(tree_file, "w", encoding="utf-8") as f:
+                write_syntax_tree(tree, f)
+
+        analyzer = SemanticAnalyzer(QuadEmitter(), collector)
+        analyzer.analyze(tree, self._result_path(result_dir, "中间代码.txt", DIAG_ALL))
+        if analyzer.errors:
+            return CompileResult(tree, analyzer.quadruples, errors=analyzer.errors, tokens=tokens,
+                                 diagnostics=collector.records)
+
+        optimized_quads = analyzer.quadruples
+        if self.optimize:
+            folder = ConstantFolder(analyzer.quadruples, collector)
+            optimized_quads = folder.fold_constants(None)
+            optimized_quads = ValueNumbering(optimized_quads).eliminate(None)
+            optimized_quads = LoopOptimizer(optimized_quads).optimize(None)
+            optimized_quads = DeadCodeEliminator(optimized_quads).eliminate(self._result_path(result_dir, "中间代码优化.txt", DIAG_ALL))
+        generator = MIPSGenerator(optimized_quads, collector, peephole=self.optimize, allocate=self.optimize)
+        mips = generator.generate(self._result_path(result_dir, "target.mips"))
+        return CompileResult(tree, analyzer.quadruples, optimized_quads, mips, tokens=tokens,
+                             diagnostics=collector.records,
+                             peephole=generator.peephole.stats if generator.peephole else None)
+
+    def check(self, source):
+        """只做语法和语义检查，不生成四元式和目标代码，也不使用编译缓存"""
+        collector = DiagnosticCollector(self.verbosity)
+        tree = self.parser.parse(source, collector=collector)
+        if tree is None:
+            return CompileResult(errors=syntax_errors(collector), diagnostics=collector.records)
+        analyzer = SemanticAnalyzer(diagnostics=collector)
+        analyzer.analyze(tree)
+        return CompileResult(tree, errors=analyzer.errors, diagnostics=collector.records)
+
+    def compile_file(self, src_file, result_dir=None):
+        with open(src_file, "r", encoding="utf-8") as f:
+            return self.compile(f.read(), result_dir)
@@ -0,0 +1,33 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COMPILER_DIR = os.path.join(ROOT, "compiler")
+DATA_DIR = os.path.join(ROOT, "data")
+PROGRAM_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "programs")
+sys.path.insert(0, COMPILER_DIR)
+
+import pytest
+from session import CompilerSession
+from MIPSSimulator import run_program
+
+
+@pytest.fixture(scope="session")
+def sessions():
+    """不优化 (O0) 与优化 (O1) 两个编译会话，分析表只构建一次"""
+    return {0: CompilerSession(optimize=False), 1: CompilerSession(optimize=True)}
+
+
+@pytest.fixture(scope="session")
+def run_snl(sessions):
+    """编译一段 SNL 源程序并在模拟器中运行，返回 RunResult"""
+    def run(source, stdin=(), optimize=1):
+        result = sessions[optimize].compile(source)
+        assert result.ok, result.errors
+        return run_program(result.mips, stdin)
+    return run
+
+
+def read_program(name):
+    with open(os.path.join(PROGRAM_DIR, name), encoding="utf-8") as f:
+        return f.read()
@@ -0,0 +1,85 @@
+"""生成随机的嵌套过程 SNL 程序，用于比较 O0 与 O1 的运行结果"""
+import random
+
+
+class RandomProgram:
+    """
+    depth 层嵌套过程，每层有值形参和引用形参、局部变量、循环（计数器有界）、条件、数组访问和过程调用。
+    引用实参可以是任何可见的变量，所以引用形参之间、引用形参与外层变量之间会互为别名。
+    """
+    def __init__(self, seed, depth=4):
+        self.rnd = random.Random(seed)
+        self.depth = depth
+        self.counters = 0
+
+    def expr(self, names, level=0):
+        rnd = self.rnd
+        if level > 1 or rnd.random() < 0.4:
+            return rnd.choice(names + [str(rnd.randint(0, 9))])
+        return f"({self.expr(names, level + 1)} {rnd.choice('+-*')} {self.expr(names, level + 1)})"
+
+    def statements(self, names, procs, count, loops=0):
+        rnd = self.rnd
+        targets = [name for name in names if not name.startswith('k')]
+        out = []
+        for _ in range(count):
+            kind = rnd.random()
+            target = rnd.choice(targets)
+            if kind < 0.35:
+                out.append(f"{target} := {self.expr(names)}")
+            elif kind < 0.45:
+                out.append(f"ga[{rnd.randint(1, 5)}] := {self.expr(names)}")
+            elif kind < 0.55:
+                out.append(f"{target} := ga[{rnd.randint(1, 5)}] + {self.expr(names)}")
+            elif kind < 0.7:
+                out.append(f"write({self.expr(names)})")
+            elif kind < 0.8 and procs:
+                name, params = rnd.choice(procs)
+                args = [self.expr(names) if param == 'v' else rnd.choice(targets) for param in params]
+                out.append(f"{name}({', '.join(args)})")
+            elif kind < 0.9 and loops < 2:
+                self.counters += 1
+                counter = f"k{self.counters}"
+                body = self.statements(names + [counter], procs, rnd.randint(1, 4), loops + 1)
+                out.append(f"{counter} := 0")
+                out.append(f"while {counter} < {rnd.randint(1, 3)} do "
+                           + "; ".join(body + [f"{counter} := {counter} + 1"]) + " endwh")
+            else:
+                then = self.statements(names, procs, 1, loops)
+                other = self.statements(names, procs, 1, loops)
+                out.append(f"if {self.expr(names)} < {self.expr(names)} then {'; '.join(then)} "
+                           f"else {'; '.join(other)} fi")
+        return out
+
+    def procedure(self, level, outer, procs):
+        rnd = self.rnd
+        name = f"p{level}"
+        params = [rnd.choice('vr') for _ in range(rnd.randint(1, 2))]
+        formals = [f"a{level}_{i}" for i in range(len(params))]
+        local = [f"l{level}_{i}" for i in range(2)]
+        names = outer + formals + local
+        first = self.counters
+        nested = []
+        if level < self.depth and rnd.random() < 0.8:
+            text, proc = self.procedure(level + 1, names, procs)
+            nested.append(text)
+            procs = procs + [proc]
+        body = [f"{var} := {rnd.randint(0, 5)}" for var in local] + \
+            self.statements(names, procs, rnd.randint(2, 6))
+        counters = [f"k{n}" for n in range(first + 1, self.counters + 1)]
+        lines = [f"procedure {name}(" + "; ".join(("var " if param == 'r' else "") + f"integer {formal}"
+                                                  for param, formal in zip(params, formals)) + ");",
+                 "var " + " ".join(f"integer {var};" for var in local + counters)]
+        lines += nested
+        lines.append("begin " + "; ".join(body) + " end")
+        return "\n".join(lines), (name, params)
+
+    def source(self):
+        names = ["g1", "g2", "g3"]
+        text, proc = self.procedure(1, names, [])
+        first = self.counters
+        body = ["g1 := 1", "g2 := 2", "g3 := 3"] + self.statements(names, [proc], 5) + \
+            [f"write({name})" for name in names]
+        counters = [f"k{n}" for n in range(first + 1, self.counters + 1)]
+        return "\n".join(["program fuzz", "var integer " + ", ".join(names + counters) + ";",
+                          "    array [1..5] of integer ga;", text, "begin " + "; ".join(body) + " end."])
@@ -0,0 +1,20 @@
+"""batch 的源文件收集和输出目录规划"""
+import os
+from batch import collect_sources, plan_outputs
+
+
+def test_plan_outputs_name_collisions(tmp_path):
+    out = str(tmp_path / "out")
+    jobs = plan_outputs(["a/demo.txt", "b/demo.snl", "c/demo.txt", "demo_2.txt"], out)
+    names = [os.path.basename(directory) for _, directory in jobs]
+    assert names == ["demo", "demo_2", "demo_3", "demo_2_2"]
+    assert len(set(names)) == len(names)
+    assert [src for src, _ in jobs] == ["a/demo.txt", "b/demo.snl", "c/demo.txt", "demo_2.txt"]
+
+
+def test_collect_sources(tmp_path):
+    for name in ("b.txt", "a.snl", "notes.md"):
+        (tmp_path / name).write_text("program p begin end.")
+    directory = str(tmp_path)
+    sources = collect_sources([directory, os.path.join(directory, "*.txt")])
+    assert [os.path.basename(path) for path in sources] == ["a.snl", "b.txt"]
@@ -0,0 +1,73 @@
+"""CompileCache 的命中、LRU 淘汰和损坏条目"""
+import os
+import time
+from cache import CompileCache
+from session import CompilerSession
+
+SOURCE = "program p var integer x; begin x := 1; write(x) end."
+
+
+def test_hit_and_miss(tmp_path):
+    cache = CompileCache(str(tmp_path))
+    key = cache.key(SOURCE, {"optimize": True})
+    assert cache.get(key) is None
+    cache.put(key, {"mips": "nop"})
+    assert cache.get(key) == {"mips": "nop"}
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.key(SOURCE, {"optimize": False}) != key
+
+
+def test_session_uses_cache(tmp_path):
+    session = CompilerSession(cache=CompileCache(str(tmp_path)))
+    first = session.compile(SOURCE)
+    second = session.compile(SOURCE)
+    assert not first.cached and second.cached
+    assert second.mips == first.mips
+
+
+def test_lru_eviction(tmp_path):
+    payload = "x" * 1000
+    cache = CompileCache(str(tmp_path), max_bytes=3500)
+    keys = [cache.key(f"program {n}") for n in range(3)]
+    for n, key in enumerate(keys):
+        cache.put(key, {"mips": payload})
+        os.utime(cache._path(key), (time.time() - 100 + n, time.time() - 100 + n))
+    assert cache.get(keys[0]) is not None  # 刷新最近使用时间，keys[1] 变成最旧的
+    cache.put(cache.key("program 3"), {"mips": payload})
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None
+    assert cache._size <= cache.max_bytes
+
+
+def test_corrupt_entry_is_dropped(tmp_path):
+    cache = CompileCache(str(tmp_path))
+    key = cache.key(SOURCE)
+    cache.put(key, {"mips": "nop"})
+    with open(cache._path(key), "wb") as f:
+        f.write(b"not a pickle")
+    assert cache.get(key) is None
+    assert not os.path.exists(cache._path(key))
+    cache.put(key, {"mips": "nop"})
+    assert cache.get(key) == {"mips": "nop"}
+
+
+def test_size_limit_with_several_writers(tmp_path):
+    # 模拟 batch 的多个工作进程：各自的 CompileCache 共用一个目录
+    payload = "x" * 1000
+    caches = [CompileCache(str(tmp_path), max_bytes=20000) for _ in range(4)]
+    for n in range(80):
+        cache = caches[n % len(caches)]
+        cache.put(cache.key(f"program {n}"), {"mips": payload})
+    on_disk = caches[0]._scan_size()
+    assert on_disk <= 20000 * (1 + len(caches) * CompileCache.RESCAN_FRACTION)
+
+
+def test_dumps_bypass_cache(tmp_path):
+    from lexer import DIAG_ALL
+    session = CompilerSession(DIAG_ALL, cache=CompileCache(str(tmp_path / "cache")))
+    for run in ("a", "b"):
+        out = tmp_path / run
+        out.mkdir()
+        result = session.compile(SOURCE, str(out))
+        assert not result.cached
+        assert {"token.txt", "tree.txt", "target.mips"} <= set(os.listdir(out))
@@ -0,0 +1,54 @@
+import os
+
+from parser import SNLParser
+from diagnostic import DiagnosticCollector, VERBOSE_MESSAGES
+from conftest import DATA_DIR
+
+SOURCE = """program p
+var integer a;
+begin
+  a := 1 $;
+  write(b)
+end.
+"""
+
+
+def test_errors_labelled_by_stage(sessions):
+    result = sessions[0].check(SOURCE)
+    assert any(e.startswith("词法错误: 非法字符") for e in result.errors), result.errors
+    assert any(e.startswith("语义错误") for e in result.errors), result.errors
+
+
+def test_compile_is_silent(sessions, capsys):
+    sessions[1].compile(SOURCE)
+    with open(os.path.join(DATA_DIR, "demo.txt"), encoding="utf-8") as f:
+        sessions[1].compile(f.read())
+    assert capsys.readouterr().out == ""
+
+
+def test_parse_file_reports_through_collector(tmp_path, capsys):
+    src = tmp_path / "demo.txt"
+    with open(os.path.join(DATA_DIR, "demo.txt"), encoding="utf-8") as f:
+        src.write_text(f.read(), encoding="utf-8")
+    parser = SNLParser()
+    result_dir = tmp_path / "result"
+    result_dir.mkdir()
+    cwd = os.getcwd()
+    os.chdir(tmp_path / "result")  # parse_file 把语法树写到 ../result/tree.txt
+    try:
+        assert parser.parse_file(str(src)) is not None
+        assert capsys.readouterr().out == ""
+        collector = DiagnosticCollector(VERBOSE_MESSAGES)
+        parser.parse_file(str(src), collector=collector)
+    finally:
+        os.chdir(cwd)
+    assert [d.code for d in collector] == ["lex-done"]
+    assert capsys.readouterr().out == "提示: 词法分析完成！\n"
+
+
+def test_syntax_errors_reach_result(sessions):
+    source = "program p var integer x;\nbegin\n  x := ;\n  write(x)\nend."
+    for result in (sessions[1].compile(source), sessions[1].check(source)):
+        assert not result.ok
+        assert result.errors[0].startswith("语法错误: ")
+        assert "';'" in result.errors[0] and "(行号: 3)" in result.errors[0]
@@ -0,0 +1,17 @@
+"""随机程序在 O0 与 O1 下的输出必须相同（优化不能改变程序的行为）"""
+import pytest
+from MIPSSimulator import run_program
+from random_programs import RandomProgram
+
+SEEDS = range(60)
+MAX_STEPS = 2000000
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_optimized_output_matches(sessions, seed):
+    source = RandomProgram(seed).source()
+    plain = sessions[0].compile(source)
+    assert plain.ok, plain.errors
+    expected = run_program(plain.mips, max_steps=MAX_STEPS)
+    optimized = run_program(sessions[1].compile(source).mips, max_steps=MAX_STEPS)
+    assert (optimized.status, optimized.output) == (expected.status, expected.output)
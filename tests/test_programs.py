@@ -0,0 +1,52 @@
+"""data/ 中的程序和回归程序在 O0、O1 下编译后在模拟器中运行，输出与预期相同"""
+import os
+import pytest
+from conftest import DATA_DIR, read_program
+
+# 程序 -> (输入, 预期输出的整数)
+DATA_CASES = {
+    "1-array.txt": ("", [0, 1, 2, 3, 4, 5]),
+    "2-record.txt": ("3 4", [4, 5, 9]),
+    "3-parallel.txt": ("5 15 7", [15, 5, 17]),
+    "4-interact.txt": ("5", [15, 5, 15]),
+    "6-expression.txt": ("", [15, 7]),
+    "7-bubbleSort.txt": ("5 3 1 4 5 2", [1, 2, 3, 4, 5]),
+    "8-factorial.txt": ("5", [120]),
+    "9-constOpt.txt": ("", []),
+    "demo.txt": ("5 3 1 4 5 2", [1, 2, 3, 4, 5]),
+}
+
+# tests/programs/ 中的回归程序 -> (输入, 预期输出的整数)
+REGRESSION_CASES = {
+    "hoist-call.snl": ("", [3, 0, 14, 0, 39, 0]),    # 循环中有过程调用时不外提（$t 寄存器会被改写）
+    "hoist-alias.snl": ("", [6, 9, 12]),             # 引用形参可能是循环中被赋值的变量的别名
+    "dce-alias.snl": ("", [6, 6]),                   # 通过引用形参赋值后读外层变量，赋值不是死代码
+    "many-procedures.snl": ("", list(range(0, 110, 10))),  # write 读取的变量用完即释放寄存器
+    "register-pressure.snl": ("", [928, 927, 924]),  # 临时变量超过 $t 寄存器个数时溢出到栈帧
+    "read-alias.snl": ("42", [42]),                  # 读入引用形参后不再使用外层变量的旧常量
+}
+
+
+@pytest.mark.parametrize("optimize", [0, 1])
+@pytest.mark.parametrize("name", sorted(DATA_CASES))
+def test_data_program(run_snl, name, optimize):
+    stdin, expected = DATA_CASES[name]
+    with open(os.path.join(DATA_DIR, name), encoding="utf-8") as f:
+        run = run_snl(f.read(), stdin, optimize)
+    assert run.ok, run.error
+    assert run.values() == expected
+
+
+@pytest.mark.parametrize("optimize", [0, 1])
+@pytest.mark.parametrize("name", sorted(REGRESSION_CASES))
+def test_regression_program(run_snl, name, optimize):
+    stdin, expected = REGRESSION_CASES[name]
+    run = run_snl(read_program(name), stdin, optimize)
+    assert run.ok, run.error
+    assert run.values() == expected
+
+
+def test_optimization_reduces_steps(run_snl):
+    with open(os.path.join(DATA_DIR, "7-bubbleSort.txt"), encoding="utf-8") as f:
+        source = f.read()
+    assert run_snl(source, "5 3 1 4 5 2", 1).steps < run_snl(source, "5 3 1 4 5 2", 0).steps
@@ -0,0 +1,56 @@
+"""MIPSSimulator 与 Instruction.parse / render"""
+from Instruction import parse, render
+from MIPSSimulator import (MIPSSimulator, run_program, STATUS_EXIT, STATUS_END, STATUS_ERROR,
+                           STATUS_STEP_LIMIT)
+
+HEADER = '.data\nnewline:\n.asciiz "\\n"\n.text\n.globl main\nmain:\n'
+
+
+def test_render_round_trip(sessions):
+    result = sessions[1].compile("program p var integer x; begin read(x); write(x * 2) end.")
+    assert render(parse(result.mips)) == result.mips
+
+
+def test_arithmetic_and_syscalls():
+    run = run_program(HEADER + "li $v0, 5\nsyscall\nmove $t0, $v0\nli $t1, -7\ndiv $t1, $t0\nmflo $a0\n"
+                      "li $v0, 1\nsyscall\nli $v0, 4\nla $a0, newline\nsyscall\nli $v0, 10\nsyscall", "2")
+    assert run.status == STATUS_EXIT
+    assert run.output == "-3\n"
+    assert run.steps == 13
+
+
+def test_stack_memory():
+    run = run_program(HEADER + "li $sp, 0x7FFFFFFC\nli $t0, 42\nsw $t0, -8($sp)\nlw $a0, -8($sp)\n"
+                      "li $v0, 1\nsyscall")
+    assert run.status == STATUS_END
+    assert run.values() == [42]
+
+
+def test_errors():
+    assert run_program(HEADER + "li $t0, 0\nlw $t1, 0($t0)").status == STATUS_ERROR
+    assert run_program(HEADER + "li $t0, 1\nli $t1, 0\ndiv $t0, $t1").status == STATUS_ERROR
+    assert run_program(HEADER + "li $v0, 5\nsyscall").status == STATUS_ERROR
+    assert run_program(HEADER + "loop:\nj loop", max_steps=100).status == STATUS_STEP_LIMIT
+
+
+def test_write_to_zero_is_discarded():
+    run = run_program(HEADER + "li $zero, 5\nmove $a0, $zero\nli $v0, 1\nsyscall")
+    assert run.values() == [0]
+
+
+def test_profile_counts_every_instruction():
+    simulator = MIPSSimulator(HEADER + "li $t0, 3\nloop:\naddi $t0, $t0, -1\nbeqz $t0, done\nj loop\ndone:\nli $v0, 10\nsyscall")
+    run = simulator.run(profile=True)
+    assert run.profile == {"li": 2, "addi": 3, "beqz": 3, "j": 2, "syscall": 1}
+    assert sum(run.profile.values()) == run.steps
+
+
+def test_hand_written_program():
+    # MARS 风格：标号与指令在同一行、制表符缩进、字符串中的 #
+    program = ('.data\nnewline: .asciiz "\\n"\nhash:\t.asciiz "#"  # 注释\n.text\n.globl main\n'
+               'main:\tli\t$t0, 3\nloop: move $a0, $t0\n\tli $v0, 1\n\tsyscall\n'
+               '\tli $v0, 4\n\tla $a0, hash\n\tsyscall\n\tla $a0, newline\n\tsyscall\n'
+               '\taddi $t0, $t0, -1\n\tbeqz $t0, done\n\tj loop\ndone: li $v0, 10\n\tsyscall\n')
+    run = run_program(program)
+    assert run.status == STATUS_EXIT
+    assert run.output == "3#\n2#\n1#\n"